@@ -0,0 +1,307 @@
+import numpy as np
+import pandas as pd
+from RollingStatistics import WindowReturns, RollingSharpeRatio, RollingInformationRatio
+from Instrumentation import DisabledProfiler
+from SeriesCache import SeriesCache
+
+class BatchInformationRatio():
+    """
+    Synopsis: Class to compute the bare and risk-adjusted information ratios (IRs) of many funds against a benchmark at once.
+    ---------
+
+    All funds are processed as one (dates x funds) numpy array, so the returns, Sharpe ratios and IRs of the whole
+    universe are obtained in a single broadcast pass instead of one dataframe column after the other.
+
+    A list of windows (e.g., [21, 63, 92, 126, 252]) is evaluated in the same pass: all windows are stacked into one
+    array and share its cumulative sums, and every result array gains a leading axis for the windows, i.e., the IRs
+    are returned as a (windows x dates x funds) tensor.
+
+    Properties:
+    -----------
+    self.FundLabels: list of str, ticker symbols of the funds (columns of all (dates x funds) arrays)
+    self.BenchmarkLabel: str, ticker symbol of the benchmark
+    self.Window: int or list of int, number of time steps used to evaluate the IRs
+    self.Windows: list of int, the window(s) as a list (one entry for every slice along the leading window axis)
+    self.Returns / self.BenchmarkReturns: numpy arrays, (dates x funds) / (dates,) returns over Window steps (None, if the
+                                          intermediates are not kept)
+    self.SharpeRatios / self.BenchmarkSharpeRatios: numpy arrays, (dates x funds) / (dates,) Sharpe ratios (None, if the
+                                                    intermediates are not kept)
+    self.IR: numpy array, (dates x funds) information ratios based on bare returns
+    self.IRA: numpy array, (dates x funds) information ratios based on risk-adjusted returns
+
+    Methods:
+    --------
+    __init__: computes all of the above from the close prices
+    FromSeries: alternative constructor that starts from precomputed returns and Sharpe ratios
+    InformationRatios: method to compute the IRs from the returns and Sharpe ratios
+    FromDataFrame: alternative constructor that reads the close prices from a dataframe with <Symbol>_Close columns
+    ToDataFrame: method to assemble the results as columns labeled like the ones of the class InformationRatio
+    """
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 Prices = None,
+                 BenchmarkPrices = None,
+                 FundLabels = None,
+                 BenchmarkLabel = '^DJI',
+                 Window = 50,
+                 RiskFreeRate = 0.01,
+                 PeriodsPerYear = 365,
+                 Intermediates = True,
+                 DType = None,
+                 Cache = None,
+                 Profiler = None):
+        """
+        Synopsis: Compute the returns, Sharpe ratios and information ratios of all funds.
+        ---------
+
+        Parameters:
+        -----------
+        Prices: array-like, (dates x funds) close prices of the funds (forward filled onto a common date grid)
+        BenchmarkPrices: array-like, (dates,) close prices of the benchmark on the same date grid
+        FundLabels: list of str, ticker symbols of the columns of Prices (defaults to their column index)
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Window: int or list of int, number of time steps to use to evaluate the information ratio
+        RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+        PeriodsPerYear: int or float, number of time steps per year of the date grid (365 for calendar days, 252 for business
+                        days), scaling the risk-free rate to the window
+        Intermediates: boolean, toggle to keep the returns and Sharpe ratios (otherwise, each is released as soon as
+                       the IRs based on it are computed, which lowers the peak memory)
+        DType: str, numpy data type the IRs are stored with (they are computed in float64, which is kept by default; 'float32'
+               halves their size)
+        Cache: SeriesCache instance, shared with other computations on the same data, so that the returns and Sharpe
+               ratios of the benchmark are computed only once (a new cache by default)
+        Profiler: Instrumentation.Profiler instance to record the stages 'returns', 'sharpe' and 'ir' (no recording by default)
+
+        Returns:
+        --------
+        Nothing, but initializes the (dates x funds) result arrays self.IR and self.IRA, or the (windows x dates x funds)
+        result tensors, if Window is a list
+        """
+
+        Prices = np.asarray(Prices, dtype = float)
+        if Prices.ndim == 1:
+            Prices = Prices[:, np.newaxis]
+
+        self.FundLabels = list(FundLabels) if FundLabels is not None else [str(j) for j in range(Prices.shape[1])]
+        self.BenchmarkLabel = BenchmarkLabel
+        self.Window = Window
+        self.Windows = [Window] if np.ndim(Window) == 0 else list(Window)
+
+        if Profiler is None:
+            Profiler = DisabledProfiler
+        if Cache is None:
+            Cache = SeriesCache()
+
+        # returns of the funds and the benchmark (for a list of windows: dates x windows [x funds]); the series of the
+        # benchmark come from the cache, shared by all IR computations on the same data
+        with Profiler.Stage('returns') as Stage:
+            self.Returns = WindowReturns(Prices, Window)
+            self.BenchmarkReturns = Cache.Returns(BenchmarkPrices, BenchmarkLabel, Window)
+            Stage.Shape(self.Returns)
+
+        # Sharpe ratios (risk-adjusted returns) of the funds and the benchmark
+        with Profiler.Stage('sharpe') as Stage:
+            self.SharpeRatios = RollingSharpeRatio(self.Returns, Window, RiskFreeRate, PeriodsPerYear)
+            self.BenchmarkSharpeRatios = Cache.SharpeRatios(BenchmarkPrices, BenchmarkLabel, Window, RiskFreeRate, PeriodsPerYear = PeriodsPerYear)
+            Stage.Shape(self.SharpeRatios)
+
+        self.InformationRatios(Intermediates = Intermediates, DType = DType, Profiler = Profiler)
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromSeries(cls,
+                   Returns = None,
+                   SharpeRatios = None,
+                   BenchmarkReturns = None,
+                   BenchmarkSharpeRatios = None,
+                   FundLabels = None,
+                   BenchmarkLabel = '^DJI',
+                   Window = 50,
+                   Intermediates = True,
+                   DType = None,
+                   Profiler = None):
+        """
+        Synopsis: Compute the information ratios from precomputed returns and Sharpe ratios (e.g., shared by several benchmarks).
+        ---------
+
+        Parameters:
+        -----------
+        Returns / SharpeRatios: numpy arrays, (dates x funds) returns and Sharpe ratios of the funds (dates x windows x funds
+                                for a list of windows, as returned by RollingStatistics.WindowReturns)
+        BenchmarkReturns / BenchmarkSharpeRatios: numpy arrays, (dates,) returns and Sharpe ratios of the benchmark
+                                                  ((dates x windows) for a list of windows)
+        FundLabels / BenchmarkLabel / Window / Intermediates / DType / Profiler: see __init__
+
+        Returns:
+        --------
+        BatchInformationRatio instance
+        """
+
+        Instance = cls.__new__(cls)
+        Instance.FundLabels = list(FundLabels)
+        Instance.BenchmarkLabel = BenchmarkLabel
+        Instance.Window = Window
+        Instance.Windows = [Window] if np.ndim(Window) == 0 else list(Window)
+        Instance.Returns = Returns
+        Instance.SharpeRatios = SharpeRatios
+        Instance.BenchmarkReturns = BenchmarkReturns
+        Instance.BenchmarkSharpeRatios = BenchmarkSharpeRatios
+
+        Instance.InformationRatios(Intermediates = Intermediates,
+                                   DType = DType,
+                                   Profiler = Profiler if Profiler is not None else DisabledProfiler)
+
+        return Instance
+
+###########################################
+###########################################
+
+    def InformationRatios(self, Intermediates = True, DType = None, Profiler = DisabledProfiler):
+        """
+        Synopsis: Compute self.IR and self.IRA from the returns and Sharpe ratios of the funds and the benchmark.
+        ---------
+
+        Parameters:
+        -----------
+        Intermediates / DType / Profiler: see __init__
+
+        Returns:
+        --------
+        Nothing, but initializes self.IR and self.IRA (and moves the axis of the windows to the front)
+        """
+
+        # the benchmark is broadcast against all funds
+        with Profiler.Stage('ir') as Stage, np.errstate(invalid = 'ignore'):
+            self.IR = RollingInformationRatio(self.Returns - self.BenchmarkReturns[..., np.newaxis], self.Window)
+            if not Intermediates:
+                self.Returns = self.BenchmarkReturns = None
+            self.IRA = RollingInformationRatio(self.SharpeRatios - self.BenchmarkSharpeRatios[..., np.newaxis], self.Window)
+            if not Intermediates:
+                self.SharpeRatios = self.BenchmarkSharpeRatios = None
+            if DType is not None:
+                self.IR = self.IR.astype(DType, copy = False)
+                self.IRA = self.IRA.astype(DType, copy = False)
+            Stage.Shape(self.IR)
+
+        # move the axis of the windows to the front: (windows x dates x funds)
+        if np.ndim(self.Window) != 0:
+            for Attribute in ['Returns', 'BenchmarkReturns', 'SharpeRatios', 'BenchmarkSharpeRatios', 'IR', 'IRA']:
+                if getattr(self, Attribute) is not None:
+                    setattr(self, Attribute, np.ascontiguousarray(np.moveaxis(getattr(self, Attribute), 1, 0)))
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromDataFrame(cls,
+                      TickerDf = None,
+                      SymbolList = ['GADGX','^DJI'],
+                      BenchmarkLabel = '^DJI',
+                      Window = 50,
+                      RiskFreeRate = 0.01,
+                      PeriodsPerYear = 365,
+                      Intermediates = True,
+                      DType = None,
+                      Cache = None,
+                      Profiler = None):
+        """
+        Synopsis: Compute the information ratios from the <Symbol>_Close columns of a dataframe.
+        ---------
+
+        Parameters:
+        -----------
+        TickerDf: pandas dataframe expected to contain the columns <Symbol>_Close of all symbols and the benchmark
+        SymbolList: list of str, ticker symbols in dataframe TickerDf (the benchmark, if contained, is skipped)
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Window: int or list of int, number of time steps to use to evaluate the information ratio
+        RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+        PeriodsPerYear: int or float, number of time steps per year of the date grid
+        Intermediates: boolean, toggle to keep the returns and Sharpe ratios
+        DType: str, numpy data type the IRs are stored with (float64 by default)
+        Cache: SeriesCache instance for the series of the benchmark (a new cache by default)
+        Profiler: Instrumentation.Profiler instance to record the stages (no recording by default)
+
+        Returns:
+        --------
+        BatchInformationRatio instance
+        """
+
+        FundLabels = []
+        for ThisTicker in SymbolList:
+            if ThisTicker == BenchmarkLabel:
+                continue
+            if ThisTicker + '_Close' not in TickerDf.columns:
+                print('No close prices available for ' + ThisTicker)
+                continue
+            FundLabels.append(ThisTicker)
+
+        return cls(Prices = TickerDf[[j + '_Close' for j in FundLabels]].to_numpy(dtype = float),
+                   BenchmarkPrices = TickerDf[BenchmarkLabel + '_Close'].to_numpy(dtype = float),
+                   FundLabels = FundLabels,
+                   BenchmarkLabel = BenchmarkLabel,
+                   Window = Window,
+                   RiskFreeRate = RiskFreeRate,
+                   PeriodsPerYear = PeriodsPerYear,
+                   Intermediates = Intermediates,
+                   DType = DType,
+                   Cache = Cache,
+                   Profiler = Profiler)
+
+###########################################
+###########################################
+
+    def ToDataFrame(self, Index = None, Intermediates = True):
+        """
+        Synopsis: Assemble the results as a dataframe with the column labels used by the class InformationRatio.
+        ---------
+
+        Parameters:
+        -----------
+        Index: pandas index for the rows of the dataframe (defaults to a range index)
+        Intermediates: boolean, toggle to include the returns (<Symbol>_Close_R_<Window>) and Sharpe ratios
+                       (<Symbol>_Close_SR_<Window>) besides the IRs (only possible, if they were kept)
+
+        Returns:
+        --------
+        ResultDf: pandas dataframe, with columns labeled <InvestmentLabel>_<BenchmarkLabel>_<IR_label>_<Window>,
+                  ordered as they are added by InformationRatio (bare IRs first, then risk-adjusted IRs; window by window)
+        """
+
+        BenchmarkPrefix = self.BenchmarkLabel + '_Close'
+        Columns = {}
+        Intermediates = Intermediates and self.Returns is not None
+
+        for k, ThisWindow in enumerate(self.Windows):
+
+            Suffix = '_' + str(ThisWindow)
+
+            # select the slice of this window, if there is a window axis
+            if np.ndim(self.Window) == 0:
+                Slice = lambda Array: Array
+            else:
+                Slice = lambda Array: Array[k]
+
+            # bare IRs, preceded by the returns they are based on
+            for j, ThisTicker in enumerate(self.FundLabels):
+                if Intermediates:
+                    Columns[ThisTicker + '_Close_R' + Suffix] = Slice(self.Returns)[:, j]
+                    Columns[BenchmarkPrefix + '_R' + Suffix] = Slice(self.BenchmarkReturns)
+                Columns[ThisTicker + '_' + self.BenchmarkLabel + '_IR' + Suffix] = Slice(self.IR)[:, j]
+
+            # risk-adjusted IRs, preceded by the Sharpe ratios they are based on
+            for j, ThisTicker in enumerate(self.FundLabels):
+                if Intermediates:
+                    Columns[ThisTicker + '_Close_SR' + Suffix] = Slice(self.SharpeRatios)[:, j]
+                    Columns[BenchmarkPrefix + '_SR' + Suffix] = Slice(self.BenchmarkSharpeRatios)
+                Columns[ThisTicker + '_' + self.BenchmarkLabel + '_IRA' + Suffix] = Slice(self.IRA)[:, j]
+
+        return pd.DataFrame(Columns, index = Index)
@@ -0,0 +1,322 @@
+"""
+Benchmark suite:
+----------------
+* generate a synthetic fund universe (see SyntheticUniverse) of configurable size, history and reporting patterns
+* time (wall and CPU time) and memory-profile (peak of traced allocations) every stage of the pipeline:
+  load, merge, returns, sharpe, ir (arrays), ir_parallel (arrays, sharded across processes), ir_dataframe
+  (InformationRatio), plots
+* optionally, compare the peak memory of the standard and the lean-memory pipeline (close prices only, no intermediate
+  columns, float32), as recorded by Instrumentation.Profiler
+* write the results as machine-readable .json, so that the numbers can be compared between commits
+
+Example:
+    python BenchmarkSuite.py --funds 1000 --days 5000 --output benchmark_results.json
+    python BenchmarkSuite.py --funds 20000 --stages ir ir_parallel --workers 8
+"""
+
+import argparse
+import datetime as dt
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+
+# all stages in the order of the pipeline
+Stages = ['load', 'merge', 'returns', 'sharpe', 'ir', 'ir_parallel', 'ir_dataframe', 'plots']
+
+###########################################
+###########################################
+
+def MeasureStage(Name, Function, Repeat = 3):
+    """
+    Synopsis: Time and memory-profile one stage.
+    ---------
+
+    Parameters:
+    -----------
+    Name: str, name of the stage
+    Function: callable without arguments that runs the stage and returns its result
+    Repeat: int, number of timed runs (the memory is measured in one additional run, since tracing slows it down)
+
+    Returns:
+    --------
+    Result: the return value of Function
+    Record: dict with the wall and CPU times of this process (best and mean over the runs, in s), the peak of the traced memory
+            (in MB) and the shape of the result (rows/columns, if it has a shape)
+    """
+
+    WallTimes = []
+    CPUTimes = []
+    for Run in range(max(1, Repeat)):
+        WallStart, CPUStart = time.perf_counter(), time.process_time()
+        Result = Function()
+        WallTimes.append(time.perf_counter() - WallStart)
+        CPUTimes.append(time.process_time() - CPUStart)
+
+    tracemalloc.start()
+    Function()
+    PeakMemory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    Shape = getattr(Result, 'shape', None)
+    Record = {'Stage': Name,
+              'WallTimeBest': min(WallTimes),
+              'WallTimeMean': float(np.mean(WallTimes)),
+              'CPUTimeBest': min(CPUTimes),
+              'PeakMemoryMB': PeakMemory / 2**20,
+              'Rows': int(Shape[0]) if Shape is not None and len(Shape) > 0 else None,
+              'Columns': int(Shape[1]) if Shape is not None and len(Shape) > 1 else None,
+              'Runs': len(WallTimes)}
+
+    return Result, Record
+
+###########################################
+###########################################
+
+def RunBenchmarks(NumberOfFunds = 100,
+                  NumberOfDays = 5000,
+                  MissingDayFraction = 0.02,
+                  IrregularFraction = 0.1,
+                  Window = 92,
+                  RiskFreeRate = 0.01,
+                  Repeat = 3,
+                  SelectedStages = Stages,
+                  PlotFunds = 8,
+                  LeanComparison = False,
+                  Workers = None,
+                  Seed = 0):
+    """
+    Synopsis: Generate a synthetic universe and measure the selected stages of the pipeline on it.
+    ---------
+
+    Parameters:
+    -----------
+    NumberOfFunds / NumberOfDays / MissingDayFraction / IrregularFraction / Seed: configuration of the universe
+    Window / RiskFreeRate: configuration of the information ratios
+    Repeat: int, number of timed runs per stage
+    SelectedStages: list of str, stages to measure (the stages required by them are run once, neither timed nor reported;
+                    the other stages are skipped)
+    PlotFunds: int, number of funds plotted in the 'plots' stage
+    LeanComparison: boolean, toggle to compare the standard and the lean-memory pipeline (see CompareLean)
+    Workers: int, number of processes of the 'ir_parallel' stage (defaults to the number of processors; the peak memory
+             of that stage does not include the workers)
+
+    Returns:
+    --------
+    Results: dict with the configuration, the environment and one record per stage (see MeasureStage)
+    """
+
+    # imported here, so that the suite can be pointed at any checkout via sys.path
+    from SyntheticUniverse import SyntheticUniverse
+    from DataExtractionAndPreprocessing import DataExtractionAndPreprocessing as DataEx
+    from RollingStatistics import WindowReturns, RollingSharpeRatio
+    from BatchInformationRatio import BatchInformationRatio
+    from ParallelInformationRatio import ParallelInformationRatio
+    from InformationRatio import InformationRatio
+
+    Configuration = {'NumberOfFunds': NumberOfFunds, 'NumberOfDays': NumberOfDays,
+                     'MissingDayFraction': MissingDayFraction, 'IrregularFraction': IrregularFraction,
+                     'Window': Window, 'RiskFreeRate': RiskFreeRate, 'Repeat': Repeat, 'Seed': Seed,
+                     'Workers': Workers if Workers is not None else os.cpu_count()}
+    Records = []
+
+    def Measure(Name, Function):
+        # a stage only required by a selected one runs once, without timing and memory tracing
+        if Name not in SelectedStages:
+            return Function()
+        Result, Record = MeasureStage(Name, Function, Repeat = Repeat)
+        Records.append(Record)
+        print('{:<14s} wall {:9.4f} s  cpu {:9.4f} s  peak {:9.1f} MB'.format(Name, Record['WallTimeBest'], Record['CPUTimeBest'], Record['PeakMemoryMB']))
+        return Result
+
+    Universe = SyntheticUniverse(NumberOfFunds = NumberOfFunds,
+                                 NumberOfDays = NumberOfDays,
+                                 MissingDayFraction = MissingDayFraction,
+                                 IrregularFraction = IrregularFraction,
+                                 Seed = Seed)
+    Funds = Universe.SymbolList[:-1]
+    StartDate, EndDate = Universe.Dates[0], Universe.Dates[-1]
+
+    with tempfile.TemporaryDirectory() as Directory:
+
+        Universe.WriteCsv(os.path.join(Directory, 'fund_details'))
+
+        # instance without download, reading the synthetic .csv files as its cache
+        DataExInstance = DataEx.__new__(DataEx)
+        DataExInstance.CacheDirectory = os.path.join(Directory, 'fund_details')
+
+        # load and merge are required by all stages
+        # load: parse the .csv files of all tickers
+        TickerDfs = Measure('load', lambda: [DataExInstance.LoadCachedTickerData(j) for j in Universe.SymbolList])
+
+        # merge: align all tickers on the calendar-daily date grid
+        DatesDf = pd.DataFrame({'Date': pd.date_range(start = StartDate, end = EndDate)})
+        AllData = Measure('merge', lambda: DataExInstance.MergeDfs([DatesDf] + TickerDfs))
+
+        Prices = AllData[[j + '_Close' for j in Funds]].to_numpy(dtype = float)
+        BenchmarkPrices = AllData[Universe.BenchmarkLabel + '_Close'].to_numpy(dtype = float)
+
+        # the risk-free rate is scaled with the dates per year of the calendar of the merge (as in CompareLean)
+        PeriodsPerYear = DataExInstance.CalendarPeriodsPerYear(AllData['Date'])
+        if 'returns' in SelectedStages or 'sharpe' in SelectedStages:
+            Returns = Measure('returns', lambda: WindowReturns(Prices, Window))
+        if 'sharpe' in SelectedStages:
+            Measure('sharpe', lambda: RollingSharpeRatio(Returns, Window, RiskFreeRate, PeriodsPerYear))
+        if 'ir' in SelectedStages:
+            Measure('ir', lambda: BatchInformationRatio(Prices, BenchmarkPrices, Funds, Universe.BenchmarkLabel, Window, RiskFreeRate, PeriodsPerYear).IR)
+        if 'ir_parallel' in SelectedStages:
+            BenchmarkReturns = WindowReturns(BenchmarkPrices, Window)
+            BenchmarkSharpeRatios = RollingSharpeRatio(BenchmarkReturns, Window, RiskFreeRate, PeriodsPerYear)
+            Measure('ir_parallel', lambda: ParallelInformationRatio(Prices, BenchmarkReturns, BenchmarkSharpeRatios, Funds, Universe.BenchmarkLabel,
+                                                                    Window, RiskFreeRate, PeriodsPerYear, Intermediates = False, MaxWorkers = Workers).IR)
+        if 'ir_dataframe' in SelectedStages or 'plots' in SelectedStages:
+            IRInstance = Measure('ir_dataframe', lambda: InformationRatio(Universe.SymbolList, Universe.BenchmarkLabel, Window, RiskFreeRate, AllData,
+                                                                          PeriodsPerYear = PeriodsPerYear))
+
+        if 'plots' in SelectedStages:
+            from InformationRatioPlots import InformationRatioPlots
+            Measure('plots', lambda: InformationRatioPlots(AllData = IRInstance.AllData,
+                                                           SymbolList = Funds[:PlotFunds],
+                                                           BenchmarkLabel = Universe.BenchmarkLabel,
+                                                           Window = Window,
+                                                           PlotDirectory = os.path.join(Directory, 'plots'),
+                                                           SummaryPlots = True,
+                                                           UseCache = False))
+
+        Comparison = CompareLean(Universe, os.path.join(Directory, 'fund_details'), Window, RiskFreeRate) if LeanComparison else None
+
+    return {'Timestamp': dt.datetime.now().isoformat(timespec = 'seconds'),
+            'Commit': GitCommit(),
+            'Environment': {'Python': platform.python_version(),
+                            'NumPy': np.__version__,
+                            'Pandas': pd.__version__,
+                            'Machine': platform.machine(),
+                            'Processors': os.cpu_count()},
+            'Configuration': Configuration,
+            'Stages': Records,
+            'LeanComparison': Comparison}
+
+###########################################
+###########################################
+
+def CompareLean(Universe, CacheDirectory, Window = 92, RiskFreeRate = 0.01, DType = 'float32'):
+    """
+    Synopsis: Profile the data extraction and the IRs in the standard and the lean-memory mode.
+    ---------
+
+    Parameters:
+    -----------
+    Universe: SyntheticUniverse instance, whose .csv files are stored in CacheDirectory
+    CacheDirectory: str, directory with the .csv files
+    Window / RiskFreeRate: configuration of the information ratios
+    DType: str, data type of the lean-memory mode
+
+    Returns:
+    --------
+    Comparison: dict with the profiler summaries of both modes ('Standard', 'Lean'; per stage) and the ratio of the
+                peak memory and of the size of the final dataframe of the lean to the standard mode
+    """
+
+    from DataExtractionAndPreprocessing import DataExtractionAndPreprocessing as DataEx
+    from InformationRatio import InformationRatio
+    from Instrumentation import Profiler
+
+    Summaries = {}
+    for Mode, Lean in [('Standard', False), ('Lean', True)]:
+
+        ProfilerInstance = Profiler()
+        # the enclosing stage records the peak memory of the whole run
+        with ProfilerInstance.Stage('pipeline') as Stage:
+            DataExInstance = DataEx(StartDate = Universe.Dates[0],
+                                    SymbolList = Universe.SymbolList,
+                                    EndDate = Universe.Dates[-1],
+                                    Offline = True,
+                                    CacheDirectory = CacheDirectory,
+                                    Fields = ['Close', 'Adj Close'] if Lean else None,
+                                    DType = DType if Lean else None,
+                                    Profiler = ProfilerInstance)
+            IRInstance = InformationRatio(SymbolList = Universe.SymbolList,
+                                          BenchmarkLabel = Universe.BenchmarkLabel,
+                                          Window = Window,
+                                          RiskFreeRate = RiskFreeRate,
+                                          AllData = DataExInstance.AllData,
+                                          Lean = Lean,
+                                          DType = DType if Lean else None,
+                                          PeriodsPerYear = DataExInstance.PeriodsPerYear,
+                                          Profiler = ProfilerInstance)
+            del DataExInstance
+            Stage.Shape(IRInstance.AllData)
+        del IRInstance
+
+        Summary = ProfilerInstance.Summary().drop(index = 'fetch_ticker', errors = 'ignore')
+        Summaries[Mode] = {Name: {Key: (None if pd.isna(Value) else float(Value)) for Key, Value in Row.items()}
+                           for Name, Row in Summary.iterrows()}
+        print(Mode + ':')
+        print(Summary)
+
+    Comparison = {'Standard': Summaries['Standard'],
+                  'Lean': Summaries['Lean'],
+                  'PeakMemoryRatio': Summaries['Lean']['pipeline']['PeakMemoryMB'] / Summaries['Standard']['pipeline']['PeakMemoryMB'],
+                  'ResultRatio': Summaries['Lean']['pipeline']['ResultMB'] / Summaries['Standard']['pipeline']['ResultMB']}
+    print('lean/standard: peak memory {:.3f}, size of the dataframe {:.3f}'.format(Comparison['PeakMemoryRatio'], Comparison['ResultRatio']))
+
+    return Comparison
+
+###########################################
+###########################################
+
+def GitCommit():
+    """
+    Synopsis: Return the hash of the checked-out git commit (None, if it cannot be determined).
+    ---------
+    """
+
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output = True, text = True,
+                              cwd = os.path.dirname(os.path.abspath(__file__)), check = True).stdout.strip()
+    except Exception:
+        return None
+
+###########################################
+###########################################
+
+if __name__ == "__main__":
+
+    Parser = argparse.ArgumentParser(description = 'Benchmark the stages of the information ratio pipeline on a synthetic fund universe.')
+    Parser.add_argument('--funds', type = int, default = 100, help = 'number of funds')
+    Parser.add_argument('--days', type = int, default = 5000, help = 'number of business days of the history')
+    Parser.add_argument('--missing', type = float, default = 0.02, help = 'fraction of missing days of regularly reporting funds')
+    Parser.add_argument('--irregular', type = float, default = 0.1, help = 'fraction of irregularly reporting funds')
+    Parser.add_argument('--window', type = int, default = 92, help = 'window of the information ratios')
+    Parser.add_argument('--repeat', type = int, default = 3, help = 'number of timed runs per stage')
+    Parser.add_argument('--stages', nargs = '+', default = Stages, choices = Stages, help = 'stages to measure')
+    Parser.add_argument('--plot-funds', type = int, default = 8, help = 'number of funds plotted in the plots stage')
+    Parser.add_argument('--lean-comparison', action = 'store_true', help = 'compare the peak memory of the standard and the lean-memory pipeline')
+    Parser.add_argument('--workers', type = int, default = None, help = 'number of processes of the ir_parallel stage (default: one per processor)')
+    Parser.add_argument('--seed', type = int, default = 0, help = 'seed of the synthetic universe')
+    Parser.add_argument('--output', default = 'benchmark_results.json', help = 'file the .json results are written to')
+    Arguments = Parser.parse_args()
+
+    Results = RunBenchmarks(NumberOfFunds = Arguments.funds,
+                            NumberOfDays = Arguments.days,
+                            MissingDayFraction = Arguments.missing,
+                            IrregularFraction = Arguments.irregular,
+                            Window = Arguments.window,
+                            Repeat = Arguments.repeat,
+                            SelectedStages = Arguments.stages,
+                            PlotFunds = Arguments.plot_funds,
+                            LeanComparison = Arguments.lean_comparison,
+                            Workers = Arguments.workers,
+                            Seed = Arguments.seed)
+
+    with open(Arguments.output, 'w') as OutputFile:
+        json.dump(Results, OutputFile, indent = 1)
+
+    print('results written to ' + Arguments.output)
+    sys.exit(0)
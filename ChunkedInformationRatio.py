@@ -0,0 +1,320 @@
+import numpy as np
+from RollingStatistics import WindowReturns, WindowMoments, BroadcastWindows, ForwardFill
+from FeatureStore import FeatureStore
+from Instrumentation import DisabledProfiler
+
+class ChunkedInformationRatio():
+    """
+    Synopsis: Class to compute the information ratios (IRs) of many funds out of core, streaming the prices in date blocks.
+    ---------
+
+    The (dates x funds) prices are read block by block (e.g., from the memory map of a FeatureStore), and the IRs of every
+    block are written to a FeatureStore on disk before the next block is read. Thus, the memory used is bounded by the
+    size of a block (plus the carried state), not by the length of the history.
+
+    Between blocks, the state of the computation is carried:
+    * the prices of the last max(Window) dates (the reference prices of the returns)
+    * for every rolling moment (Sharpe ratios, bare and risk-adjusted IRs), the prefix sums (count, sum, sum of squares)
+      of the last max(Window) dates; the prefix sums of a block continue the carried ones, i.e., they are accumulated
+      in the same order as the cumulative sums of RollingStatistics over the full history
+    * the last IRs, for forward filling
+    so that the results are identical (bit for bit) to the ones of BatchInformationRatio on the full history, whatever
+    the size of the blocks.
+
+    Properties:
+    -----------
+    self.FundLabels: list of str, ticker symbols of the funds
+    self.BenchmarkLabel: str, ticker symbol of the benchmark
+    self.Window / self.Windows: int or list of int / list of int, window(s) of the IRs
+    self.Steps: int, number of dates processed so far
+    self.Store: FeatureStore instance with the fields '<BenchmarkLabel>_IR_<Window>' and '<BenchmarkLabel>_IRA_<Window>'
+                of the funds (None, if no directory is given)
+
+    Methods:
+    --------
+    __init__: process all dates of the prices block by block and write the IRs to a FeatureStore
+    FromFeatureStore: alternative constructor that streams the prices of a FeatureStore
+    Reset: method to clear the carried state
+    Update: method to process the next block of dates and return its IRs
+    """
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 Prices = None,
+                 BenchmarkPrices = None,
+                 FundLabels = None,
+                 BenchmarkLabel = '^DJI',
+                 Window = 50,
+                 RiskFreeRate = 0.01,
+                 PeriodsPerYear = 365,
+                 Dates = None,
+                 Columns = None,
+                 ChunkSize = 4096,
+                 Directory = 'ir_store',
+                 DType = None,
+                 Profiler = None):
+        """
+        Synopsis: Compute the IRs of all funds block by block and write them to the FeatureStore in Directory.
+        ---------
+
+        Parameters:
+        -----------
+        Prices: array-like, (dates x funds) close prices, read ChunkSize rows at a time (e.g., a numpy memory map);
+                None to set up an empty state for Update
+        BenchmarkPrices: array-like, (dates,) close prices of the benchmark
+        FundLabels: list of str, ticker symbols of the funds
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Window: int or list of int, number of time steps to use to evaluate the information ratio
+        RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+        PeriodsPerYear: int or float, number of time steps per year of the date grid (365 for calendar days, 252 for business
+                        days), scaling the risk-free rate to the window
+        Dates: array-like, (dates,) dates of the rows (defaults to a daily range from 1970-01-01)
+        Columns: list of int, columns of Prices holding the funds (defaults to all columns)
+        ChunkSize: int, number of dates per block
+        Directory: str, directory of the FeatureStore the IRs are written to (None: the IRs are not written)
+        DType: str, numpy data type the IRs are stored with (float64 by default; they are computed in float64 anyway)
+        Profiler: Instrumentation.Profiler instance to record the stage 'ir_chunked' (no recording by default)
+
+        Returns:
+        --------
+        Nothing, but initializes self.Store
+        <files>: Index.json, Dates.npy and one .npy file per IR field in Directory
+        """
+
+        if Profiler is None:
+            Profiler = DisabledProfiler
+
+        self.FundLabels = list(FundLabels)
+        self.BenchmarkLabel = BenchmarkLabel
+        self.Window = Window
+        self.Windows = [Window] if np.ndim(Window) == 0 else list(Window)
+        self.RiskFreeRate = RiskFreeRate
+        self.PeriodsPerYear = PeriodsPerYear
+        self.Store = None
+        self.Reset()
+
+        if Prices is None or Directory is None:
+            return
+
+        NumberOfDates = len(BenchmarkPrices)
+        if Dates is None:
+            Dates = np.arange(NumberOfDates).astype('datetime64[D]')
+
+        with Profiler.Stage('ir_chunked') as Stage:
+
+            # IR fields of the funds, filled block by block
+            self.Store = FeatureStore(Directory)
+            self.Store.Write(Dates = Dates, Tickers = self.FundLabels, Fields = {}, DType = DType or 'float64')
+            IRLabels = [self.BenchmarkLabel + '_IR_' + str(j) for j in self.Windows]
+            IRALabels = [self.BenchmarkLabel + '_IRA_' + str(j) for j in self.Windows]
+            Fields = self.Store.AllocateFields(IRLabels + IRALabels)
+
+            for First in range(0, NumberOfDates, ChunkSize):
+                Rows = slice(First, min(First + ChunkSize, NumberOfDates))
+                Block = np.asarray(Prices[Rows], dtype = float)
+                IR, IRA = self.Update(Block if Columns is None else Block[:, Columns], BenchmarkPrices[Rows])
+                for k in range(len(self.Windows)):
+                    Fields[IRLabels[k]][Rows] = IR[k] if np.ndim(Window) != 0 else IR
+                    Fields[IRALabels[k]][Rows] = IRA[k] if np.ndim(Window) != 0 else IRA
+
+            for Values in Fields.values():
+                Values.flush()
+            Fields = None
+
+            Stage.Shape(self.Store.Dates)
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromFeatureStore(cls,
+                         Store = None,
+                         Funds = None,
+                         BenchmarkLabel = '^DJI',
+                         Field = 'Close',
+                         Window = 50,
+                         RiskFreeRate = 0.01,
+                         PeriodsPerYear = 365,
+                         ChunkSize = 4096,
+                         Directory = 'ir_store',
+                         DType = None,
+                         Profiler = None):
+        """
+        Synopsis: Compute the IRs from the prices of a FeatureStore, reading them block by block from its memory map.
+        ---------
+
+        Parameters:
+        -----------
+        Store: FeatureStore instance (or its directory) with the prices of the funds and the benchmark
+        Funds: list of str, ticker symbols of the funds (defaults to all tickers of the store except the benchmark)
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Field: str, price field of the store (e.g., 'Close')
+        Window / RiskFreeRate / PeriodsPerYear / ChunkSize / Directory / DType / Profiler: see __init__
+
+        Returns:
+        --------
+        ChunkedInformationRatio instance
+        """
+
+        if isinstance(Store, str):
+            Store = FeatureStore(Store)
+        if Funds is None:
+            Funds = [j for j in Store.Tickers if j != BenchmarkLabel]
+
+        # a view on the memory map of all tickers; only the rows of a block are read at a time
+        Dates, Tickers, Data = Store.Load(Fields = [Field])
+
+        return cls(Prices = Data[Field],
+                   BenchmarkPrices = Data[Field][:, Tickers.index(BenchmarkLabel)],
+                   FundLabels = Funds,
+                   BenchmarkLabel = BenchmarkLabel,
+                   Window = Window,
+                   RiskFreeRate = RiskFreeRate,
+                   PeriodsPerYear = PeriodsPerYear,
+                   Dates = Dates,
+                   Columns = [Tickers.index(j) for j in Funds],
+                   ChunkSize = ChunkSize,
+                   Directory = Directory,
+                   DType = DType,
+                   Profiler = Profiler)
+
+###########################################
+###########################################
+
+    def Reset(self):
+        """
+        Synopsis: Clear the carried state (no dates processed).
+        ---------
+        """
+
+        self.Steps = 0
+        # prices of the last max(Window) dates, funds and benchmark (last column)
+        self.PriceTail = None
+        # prefix sums of the last max(Window) dates per rolling moment: 'Sharpe', 'IR' and 'IRA'
+        self.PrefixTails = {}
+        # last (forward filled) IRs
+        self.LastIR = None
+        self.LastIRA = None
+
+        return
+
+###########################################
+###########################################
+
+    def Update(self, Prices, BenchmarkPrices):
+        """
+        Synopsis: Process the next block of dates and return its IRs.
+        ---------
+
+        Parameters:
+        -----------
+        Prices: array-like, (block x funds) close prices of the funds
+        BenchmarkPrices: array-like, (block,) close prices of the benchmark
+
+        Returns:
+        --------
+        IR / IRA: numpy arrays, (block x funds) bare and risk-adjusted IRs ((windows x block x funds) for a list of windows)
+        """
+
+        # the benchmark is processed as an additional (last) column
+        Prices = np.column_stack([np.asarray(Prices, dtype = float), np.asarray(BenchmarkPrices, dtype = float)])
+        NumberOfRows = Prices.shape[0]
+
+        # returns of the block, referring to the carried prices
+        Extended = Prices if self.PriceTail is None else np.concatenate([self.PriceTail, Prices])
+        Returns = WindowReturns(Extended, self.Window)[Extended.shape[0] - NumberOfRows:]
+        self.PriceTail = Extended[-max(self.Windows):]
+
+        # Sharpe ratios (full windows, population standard deviation)
+        RiskFreeRateWindow = self.RiskFreeRate * ( self.PeriodsPerYear / BroadcastWindows(self.Window, Returns.ndim) )
+        Mean, Std = self.Moments('Sharpe', Returns, MinPeriods = BroadcastWindows(self.Window, Returns.ndim), Ddof = 0)
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            SharpeRatios = (Mean - RiskFreeRateWindow) / Std
+
+        # the benchmark is broadcast against all funds
+        with np.errstate(invalid = 'ignore'):
+            IR = self.InformationRatios('IR', Returns[..., :-1] - Returns[..., -1:])
+            IRA = self.InformationRatios('IRA', SharpeRatios[..., :-1] - SharpeRatios[..., -1:])
+
+        self.Steps += NumberOfRows
+
+        # windows x block x funds for a list of windows, as in BatchInformationRatio
+        if np.ndim(self.Window) != 0:
+            IR = np.moveaxis(IR, 1, 0)
+            IRA = np.moveaxis(IRA, 1, 0)
+
+        return IR, IRA
+
+###########################################
+###########################################
+
+    def InformationRatios(self, Name, Alphas):
+        """
+        Synopsis: Rolling IRs of a block of excess returns, forward filled with the carried last IRs (see RollingInformationRatio).
+        ---------
+        """
+
+        Mean, Std = self.Moments(Name, Alphas, MinPeriods = 0, Ddof = 1)
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            IR = ForwardFill(Mean / Std)
+
+        Last = 'Last' + Name
+        if getattr(self, Last) is not None:
+            IR = np.where(np.isnan(IR), getattr(self, Last), IR)
+        if IR.shape[0] > 0:
+            setattr(self, Last, IR[-1].copy())
+
+        return IR
+
+###########################################
+###########################################
+
+    def Moments(self, Name, Values, MinPeriods = None, Ddof = 0):
+        """
+        Synopsis: Rolling mean and standard deviation of a block, continuing the carried prefix sums of Name (see RollingMoments).
+        ---------
+
+        Parameters:
+        -----------
+        Name: str, name of the rolling moment (key of its carried prefix sums)
+        Values: numpy array, (block x funds) or (block x windows x funds) values
+        MinPeriods / Ddof: see RollingStatistics.RollingMoments
+
+        Returns:
+        --------
+        Mean / Std: numpy arrays of the same shape as Values
+        """
+
+        # missing values contribute neither to the sums nor to the counts
+        Finite = np.isfinite(Values)
+        Clean = np.where(Finite, Values, 0.0)
+
+        Tails = self.PrefixTails.get(Name, [np.zeros((0,) + Values.shape[1:])] * 3)
+        Sums = []
+        NewTails = []
+        for Tail, Quantity in zip(Tails, [Finite.astype(float), Clean, Clean * Clean]):
+
+            # prefix sums of the block, accumulated onto the last carried one
+            Start = Tail[-1:] if Tail.shape[0] > 0 else np.zeros((1,) + Values.shape[1:])
+            Prefix = np.cumsum(np.concatenate([Start, Quantity]), axis = 0)[1:]
+            Extended = np.concatenate([Tail, Prefix])
+
+            # window sums: differences to the prefix sums Window rows before (from the Window-th date of the history on)
+            Sum = Prefix.copy()
+            for j, ThisWindow in enumerate(self.Windows):
+                Index = (slice(None), j) if np.ndim(self.Window) != 0 else (slice(None),)
+                Begin = max(0, ThisWindow - self.Steps)
+                if Begin < Values.shape[0]:
+                    Sum[(slice(Begin, None),) + Index[1:]] -= Extended[(slice(Tail.shape[0] + Begin - ThisWindow, Tail.shape[0] + Values.shape[0] - ThisWindow),) + Index[1:]]
+            Sums.append(Sum)
+
+            # carry the prefix sums of the last max(Window) dates
+            NewTails.append(Extended[-max(self.Windows):].copy())
+
+        self.PrefixTails[Name] = NewTails
+
+        return WindowMoments(Sums[0], Sums[1], Sums[2], MinPeriods = MinPeriods, Ddof = Ddof)
@@ -1,8 +1,12 @@
 
 import datetime as dt
+import json
 import pandas as pd 
 import os
-import pandas_datareader.data as web 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from DataSources import YahooDataSource
+from Instrumentation import DisabledProfiler
 
 class DataExtractionAndPreprocessing():
     """
@@ -12,19 +16,74 @@ class DataExtractionAndPreprocessing():
     Properties:
     -----------
     self.AllData: pandas dataframe that contains all the funds data required 
+    self.CacheDirectory: str, directory with the local price cache (one <Symbol>.csv file per ticker)
+    self.DataSource: object with a method GetData(Ticker, StartDate, EndDate), see module DataSources (Yahoo finance by default)
+    self.MaxWorkers: int, maximum number of tickers that are downloaded concurrently
+    self.Retries / self.RetryDelay: int / float, number of attempts per download and delay (in s) before the first retry (doubled for every further retry)
+    self.FailedDownloads: list of dict, report of the failed downloads with the keys 'Ticker', 'StartDate', 'EndDate', 'Attempts' and 'Error'
+    self.EmptyRangeDays: int, number of business days a range after the cached data may span without data (holidays, data not
+                         yet published) before an empty answer of the data source counts as a failed download
+    self.Fields: list of str, OHLCV fields kept in self.AllData (e.g., ['Close', 'Adj Close']; None keeps all of them)
+    self.DType: str, numpy data type of the fields in self.AllData (e.g., 'float32' to halve its size; None keeps float64)
+    self.Calendar: str, date grid of self.AllData: 'daily' (calendar days), 'business' (business days, without self.Holidays)
+                   or 'observed' (union of the dates observed for any ticker)
+    self.Holidays: list of dates, exchange holidays left out of the 'business' calendar
+    self.PeriodsPerYear: int, number of dates per year of the calendar (365 'daily', 252 'business', estimated from the
+                         dates of self.AllData for 'observed'), scaling the risk-free rate of the Sharpe ratios to the window
+    self.ReportingFrequencies: dict of str -> str, pandas frequency (e.g., 'W-FRI', 'M') of tickers reporting irregularly,
+                               whose data is resampled to it (last value of every period) before the alignment
+    self.Profiler: Instrumentation.Profiler instance, recording the stages 'fetch', 'fetch_ticker' (per ticker) and 'merge'
 
     Methods:
     --------
 
     __init__: initialization method; downloads the required data and puts it into self.AllData
     fetch_data: method to fill self.AllData with ticker dataframe
+    GetTickerData: method to get the data of a single ticker from the local cache, downloading only the missing dates
+    DownloadTickerData: method to download the data of a single ticker from the data source (with retries)
+    LoadCachedTickerData: method to read the data of a single ticker from the local cache
+    LoadCoverage / SaveCoverage: methods to read / write the date range already requested for a single ticker
+    ExtendCoverage: method to extend the requested date range by an adjacent range
+    CalendarDates: method to return the dates of the calendar between two dates
+    CalendarPeriodsPerYear: method to return the number of dates per year of the calendar
+    Resample: method to resample the data of a ticker to its reporting frequency
     MergeDfs: helper function to merge a list of dataframes into a single one
     AddColumnPrefix: helper function to prefix column of a dataframe with a string
     """
 
+    # default directory of the local price cache
+    CacheDirectory = 'fund_details'
+    # defaults of the download stage
+    DataSource = None
+    MaxWorkers = 8
+    Retries = 3
+    RetryDelay = 1.0
+    EmptyRangeDays = 5
+    # defaults of the preprocessing stage
+    Fields = None
+    DType = None
+    Calendar = 'daily'
+    Holidays = None
+    ReportingFrequencies = None
+    Profiler = DisabledProfiler
+
     def __init__(self, 
                  StartDate = '2017-01-01',
-                 SymbolList = ['GADGX','^DJI']):
+                 SymbolList = ['GADGX','^DJI'],
+                 EndDate = None,
+                 UseCache = True,
+                 Offline = False,
+                 CacheDirectory = 'fund_details',
+                 DataSource = None,
+                 MaxWorkers = 8,
+                 Retries = 3,
+                 RetryDelay = 1.0,
+                 Fields = None,
+                 DType = None,
+                 Calendar = 'daily',
+                 Holidays = None,
+                 ReportingFrequencies = None,
+                 Profiler = None):
         """
         Synopsis: Fetches ticker data and populate self.AllData with a dataframe
         ---------
@@ -33,6 +92,24 @@ class DataExtractionAndPreprocessing():
         -----------
         SymbolList: list of str, containing the Symbols of the historical data to fetch
         StartDate: str, the YYYY-DD-MM starting date of the data analysis 
+        EndDate: str, the YYYY-MM-DD final date of the data analysis (defaults to today)
+        UseCache: boolean, toggle to read the data stored in CacheDirectory and download only the missing dates
+        Offline: boolean, toggle to build self.AllData from the data stored in CacheDirectory alone (no download)
+        CacheDirectory: str, directory with the local price cache
+        DataSource: object with a method GetData(Ticker, StartDate, EndDate), e.g., DataSources.CsvDataSource (defaults to Yahoo finance)
+        MaxWorkers: int, maximum number of tickers that are downloaded concurrently
+        Retries: int, number of attempts per download
+        RetryDelay: float, delay in seconds before the first retry (doubled for every further retry)
+        Fields: list of str, OHLCV fields to keep in self.AllData, e.g., ['Close', 'Adj Close'] (all fields by default;
+                the cache always keeps all of them)
+        DType: str, numpy data type of the fields in self.AllData, e.g., 'float32' (float64 by default)
+        Calendar: str, date grid of self.AllData: 'daily' (all calendar days, the default), 'business' (Monday to Friday
+                  without Holidays, so that a window counts trading days) or 'observed' (union of the dates observed for
+                  any ticker)
+        Holidays: list of dates, exchange holidays left out of the 'business' calendar
+        ReportingFrequencies: dict of str -> str, pandas frequency of tickers reporting irregularly, e.g.,
+                              {'0P00000UWV.F': 'W-FRI'}; their data is resampled to it before the alignment
+        Profiler: Instrumentation.Profiler instance to record the stages (no recording by default)
 
 
         Returns:
@@ -40,9 +117,28 @@ class DataExtractionAndPreprocessing():
         Nothing, but initializes data in self.AllData
 
         """
+        self.CacheDirectory = CacheDirectory
+        self.DataSource = DataSource
+        self.MaxWorkers = MaxWorkers
+        self.Retries = Retries
+        self.RetryDelay = RetryDelay
+        self.Fields = Fields
+        self.DType = DType
+        self.Calendar = Calendar
+        self.Holidays = Holidays
+        self.ReportingFrequencies = ReportingFrequencies
+        self.FailedDownloads = []
+        self.Profiler = Profiler if Profiler is not None else DisabledProfiler
+
+        if EndDate is None:
+            EndDate = dt.datetime.today().strftime('%Y-%m-%d')
+
         self.AllData = self.fetch_data(tickers = SymbolList,
                                        StartDate = StartDate,
-                                       EndDate = dt.datetime.today().strftime('%Y-%m-%d') )
+                                       EndDate = EndDate,
+                                       UseCache = UseCache,
+                                       Offline = Offline)
+        self.PeriodsPerYear = self.CalendarPeriodsPerYear(self.AllData['Date'] if 'Date' in self.AllData.columns else None)
 
         return
 
@@ -52,7 +148,9 @@ class DataExtractionAndPreprocessing():
     def fetch_data(self, 
                    tickers = None, 
                    StartDate = dt.datetime(2017,5,11), 
-                   EndDate = dt.datetime(2021,1,4)):
+                   EndDate = dt.datetime(2021,1,4),
+                   UseCache = True,
+                   Offline = False):
         """
         Synopsis: Fetches ticker data and returns it as a merged dataframe with OHLCV column labels prefixed by the symbol name.
         ---------
@@ -62,11 +160,14 @@ class DataExtractionAndPreprocessing():
         tickers: list of str, the ticker symbols of the desired funds 
         StartDate: datetime variable, the starting date of the data analysis
         EndDate: datetime variable, the final date of the data analysis
+        UseCache: boolean, toggle to read the data stored in the cache directory and download only the missing dates
+        Offline: boolean, toggle to use the data stored in the cache directory alone (tickers without stored data are skipped)
 
         Returns:
         --------
         self.MergeDfs(ListOfTickerDfs): pandas dataframe containing all downloaded data in columns labeled <Symbol>_Open/_High/...
-        <files>: saves one .csv file for every element in the tickers list om the 'fund_details/' directory.
+        <files>: saves (or updates) one .csv file for every element in the tickers list in the cache directory ('fund_details/' by default).
+        self.FailedDownloads: list of dict, report of the downloads that failed after all retries (these tickers are skipped)
         
         References:
         -----------
@@ -81,43 +182,392 @@ class DataExtractionAndPreprocessing():
 
 
         """
-        # workaround for current issues with pandas datareader
-        import yfinance as yf
-        yf.pdr_override()
-
         # if the output directory does not exist, create it
-        if not os.path.exists('fund_details'):
-            os.makedirs('fund_details')
+        if not os.path.exists(self.CacheDirectory):
+            os.makedirs(self.CacheDirectory)
 
-        # initialize dataframe with all the dates required 
-        DatesDf = pd.DataFrame()
-        DatesDf['Date'] = pd.date_range(start=StartDate,end=EndDate)
+        # initialize dataframe with all the dates required (for the 'observed' calendar, the dates come with the tickers)
+        Dates = self.CalendarDates(StartDate, EndDate)
 
         # initializes list with all dates considered
         ListOfTickerDfs = [] 
-        ListOfTickerDfs.append(DatesDf)
+        if Dates is not None:
+            DatesDf = pd.DataFrame()
+            DatesDf['Date'] = Dates
+            ListOfTickerDfs.append(DatesDf)
+
+        if self.DataSource is None:
+            self.DataSource = YahooDataSource()
+        self.FailedDownloads = []
+
+        def GetTicker(ticker):
+            with self.Profiler.Stage('fetch_ticker', Ticker = ticker) as Stage:
+                df = self.GetTickerData(ticker = ticker,
+                                        StartDate = StartDate,
+                                        EndDate = EndDate,
+                                        UseCache = UseCache,
+                                        Offline = Offline)
+                Stage.Shape(df)
+            return df
+
+        # get the tickers concurrently, since the time is dominated by the latency of the data source
+        # (the results keep the order of the tickers)
+        with self.Profiler.Stage('fetch') as Stage:
+            with ThreadPoolExecutor(max_workers = max(1, min(self.MaxWorkers, len(tickers)))) as Pool:
+                TickerDfs = list(Pool.map(GetTicker, tickers))
+            Stage.Shape(TickerDfs)
+
+        for ticker, df in zip(tickers, TickerDfs):
+
+            # if no data is available, continue with the next ticker
+            if df is None or df.empty:
+                continue
 
-        for ticker in tickers:
+            # keep the selected fields only, with the selected data type (before the merge, where the memory peaks)
+            if self.Fields is not None:
+                df = df[[j for j in df.columns if j.split('_')[-1] in self.Fields]]
+            if self.DType is not None:
+                df = df.astype(self.DType)
 
-            print("fetching historical data for "+ ticker)
-            
-            try:
-                # workaround for pandas interface to yahoo finance
-                df = web.get_data_yahoo(ticker, data_source='yahoo', start=StartDate, end=EndDate)
+            # irregularly reporting tickers are resampled to their reporting frequency
+            if self.ReportingFrequencies is not None and ticker in self.ReportingFrequencies:
+                df = self.Resample(df, self.ReportingFrequencies[ticker]).loc[:pd.Timestamp(EndDate)]
 
-                # pandas interface stopped working
-                #df=web.DataReader(ticker, 'yahoo', StartDate, EndDate) # read the data from 'yahoo finance' 
-                self.AddColumnPrefix(df,ticker) # add ticker label as prefix to data
-                ListOfTickerDfs.append(df) # append to list of dfs
-                df.to_csv('fund_details/{}.csv'.format(ticker)) # save downloaded data for later
+            ListOfTickerDfs.append(df) # append to list of dfs
 
-            except: # if the above fails, throw an error message and continue.
-                print("Error")
-                continue
+        for Failure in self.FailedDownloads:
+            print("failed to fetch " + Failure['Ticker'] + " after " + str(Failure['Attempts']) + " attempts: " + Failure['Error'])
 
         # merge list to single dataframe for return
-        return self.MergeDfs(ListOfTickerDfs)
+        with self.Profiler.Stage('merge') as Stage:
+            MergedDf = self.MergeDfs(ListOfTickerDfs)
+            # the values of dates off the calendar (e.g., weekends) are carried forward to the next date of the calendar
+            if self.Calendar != 'daily' and Dates is not None and not MergedDf.empty:
+                MergedDf = MergedDf[MergedDf['Date'].isin(Dates)].reset_index(drop = True)
+            Stage.Shape(MergedDf)
+
+        return MergedDf
   
+###########################################
+###########################################
+
+    def CalendarDates(self, StartDate, EndDate):
+        """
+        Synopsis: Return the dates of the calendar self.Calendar between StartDate and EndDate.
+        ---------
+
+        Parameters:
+        -----------
+        StartDate: datetime variable, the starting date of the data analysis
+        EndDate: datetime variable, the final date of the data analysis
+
+        Returns:
+        --------
+        Dates: pandas DatetimeIndex, the dates of the calendar (None for the 'observed' calendar, whose dates are the
+               ones of the data)
+        """
+
+        if self.Calendar == 'daily':
+            return pd.date_range(start = StartDate, end = EndDate)
+        if self.Calendar == 'business':
+            if self.Holidays:
+                return pd.bdate_range(start = StartDate, end = EndDate, freq = 'C', holidays = list(self.Holidays))
+            return pd.bdate_range(start = StartDate, end = EndDate)
+        if self.Calendar == 'observed':
+            return None
+
+        raise ValueError("unknown calendar '" + str(self.Calendar) + "', expected 'daily', 'business' or 'observed'")
+
+###########################################
+###########################################
+
+    def CalendarPeriodsPerYear(self, Dates = None):
+        """
+        Synopsis: Return the number of dates per year of the calendar self.Calendar (the annualization of the risk-free rate).
+        ---------
+
+        Parameters:
+        -----------
+        Dates: array-like, dates of the data (only used for the 'observed' calendar)
+
+        Returns:
+        --------
+        PeriodsPerYear: int, 365 for the 'daily' and 252 (trading days) for the 'business' calendar; for the 'observed'
+                        calendar, the average number of dates per year of Dates (252 with fewer than two dates)
+        """
+
+        if self.Calendar == 'daily':
+            return 365
+        if self.Calendar == 'business':
+            return 252
+        if self.Calendar == 'observed':
+            Dates = pd.DatetimeIndex([] if Dates is None else Dates)
+            if len(Dates) < 2 or Dates[-1] <= Dates[0]:
+                return 252
+            return int(round((len(Dates) - 1) / ((Dates[-1] - Dates[0]).days / 365.25)))
+
+        raise ValueError("unknown calendar '" + str(self.Calendar) + "', expected 'daily', 'business' or 'observed'")
+
+###########################################
+###########################################
+
+    def Resample(self, Df, Frequency):
+        """
+        Synopsis: Resample the data of a ticker to the frequency Frequency (last value of every period).
+        ---------
+
+        Parameters:
+        -----------
+        Df: pandas dataframe indexed by 'Date'
+        Frequency: str, pandas frequency, e.g., 'W-FRI' (weekly on Fridays) or 'M' (month ends)
+
+        Returns:
+        --------
+        Df: pandas dataframe indexed by the ends of the periods with data (a value becomes available at the end of its
+            period, never before)
+        """
+
+        Df = Df.resample(Frequency, label = 'right', closed = 'right').last()
+        Df.index.name = 'Date'
+
+        return Df.dropna(how = 'all')
+
+###########################################
+###########################################
+
+    def GetTickerData(self,
+                      ticker = None,
+                      StartDate = dt.datetime(2017,5,11),
+                      EndDate = dt.datetime(2021,1,4),
+                      UseCache = True,
+                      Offline = False):
+        """
+        Synopsis: Get the data of a single ticker, reading the local cache and downloading only the missing date ranges.
+        ---------
+
+        Parameters:
+        -----------
+        ticker: str, the ticker symbol of the desired fund
+        StartDate: datetime variable, the starting date of the data analysis
+        EndDate: datetime variable, the final date of the data analysis
+        UseCache: boolean, toggle to read the cached data (otherwise, the full range is downloaded)
+        Offline: boolean, toggle to use the cached data alone
+
+        Returns:
+        --------
+        df: pandas dataframe indexed by 'Date' with columns labeled <Symbol>_Open/_High/..., restricted to StartDate...EndDate
+            (None, if no data is available)
+        <file>: the cache file <CacheDirectory>/<Symbol>.csv, updated with the downloaded data, and the coverage file
+                <CacheDirectory>/<Symbol>.coverage.json, updated with the date ranges requested successfully
+        """
+
+        StartDate = pd.Timestamp(StartDate)
+        EndDate = pd.Timestamp(EndDate)
+
+        # (offline, the cache is not rewritten, so only the selected fields are parsed)
+        CachedDf = self.LoadCachedTickerData(ticker, Fields = self.Fields if Offline else None) if (UseCache or Offline) else None
+
+        if Offline:
+            if CachedDf is None:
+                print("no cached data for " + ticker)
+                return None
+            return CachedDf.loc[StartDate:EndDate]
+
+        # date ranges not requested yet: everything, or the ranges before and after the covered dates (these include the
+        # dates requested without data, e.g., before the inception of the fund, so that they are not requested again)
+        Coverage = self.LoadCoverage(ticker, CachedDf) if CachedDf is not None else None
+        if Coverage is None:
+            MissingRanges = [(StartDate, EndDate)]
+        else:
+            MissingRanges = []
+            if StartDate < Coverage[0]:
+                MissingRanges.append((StartDate, Coverage[0] - pd.Timedelta(days = 1)))
+            if EndDate > Coverage[1]:
+                MissingRanges.append((Coverage[1] + pd.Timedelta(days = 1), EndDate))
+        NewCoverage = Coverage
+
+        ListOfDfs = [] if CachedDf is None else [CachedDf]
+        for (RangeStart, RangeEnd) in MissingRanges:
+
+            # a range without business days holds no data
+            BusinessDays = len(pd.bdate_range(RangeStart, RangeEnd))
+            if BusinessDays == 0:
+                NewCoverage = self.ExtendCoverage(NewCoverage, RangeStart, RangeEnd)
+                continue
+
+            print("fetching historical data for " + ticker + " from " + RangeStart.strftime('%Y-%m-%d') + " to " + RangeEnd.strftime('%Y-%m-%d'))
+
+            # no data is a valid answer before the cached data (before the inception of the fund) and for a few days after
+            # it; otherwise, the download failed (yfinance returns an empty dataframe for a failed ticker instead of raising)
+            AllowEmpty = CachedDf is not None and not CachedDf.empty and (RangeEnd < CachedDf.index[0] or BusinessDays <= self.EmptyRangeDays)
+            df = self.DownloadTickerData(ticker, RangeStart, RangeEnd, AllowEmpty = AllowEmpty)
+            if df is None:
+                continue
+            NewCoverage = self.ExtendCoverage(NewCoverage, RangeStart, RangeEnd)
+            if not df.empty:
+                ListOfDfs.append(df)
+
+        if NewCoverage != Coverage:
+            self.SaveCoverage(ticker, NewCoverage)
+
+        if len(ListOfDfs) == 0:
+            return None
+
+        # combine cached and downloaded data (downloaded rows take precedence) and save it for later
+        df = pd.concat(ListOfDfs)
+        df = df[~df.index.duplicated(keep = 'last')].sort_index()
+        if len(ListOfDfs) > (0 if CachedDf is None else 1):
+            df.to_csv(os.path.join(self.CacheDirectory, '{}.csv'.format(ticker)))
+
+        return df.loc[StartDate:EndDate]
+
+###########################################
+###########################################
+
+    def DownloadTickerData(self, ticker, StartDate, EndDate, AllowEmpty = False):
+        """
+        Synopsis: Download the OHLCV data of a single ticker from the data source, retrying with an exponential backoff.
+        ---------
+
+        Parameters:
+        -----------
+        ticker: str, the ticker symbol of the desired fund
+        StartDate: datetime variable, the starting date of the download
+        EndDate: datetime variable, the final date of the download
+        AllowEmpty: boolean, toggle to accept an empty answer of the data source (otherwise, it counts as a failed attempt)
+
+        Returns:
+        --------
+        df: pandas dataframe indexed by 'Date' with columns labeled <Symbol>_Open/_High/... (empty, if the data source has no
+            data and AllowEmpty is set; None, if all attempts fail, the failure is then added to self.FailedDownloads)
+        """
+
+        if self.DataSource is None:
+            self.DataSource = YahooDataSource()
+
+        for Attempt in range(1, max(1, self.Retries) + 1):
+
+            try:
+                df = self.DataSource.GetData(ticker, StartDate, EndDate)
+                if df is None:
+                    df = pd.DataFrame()
+                if df.empty and not AllowEmpty:
+                    raise LookupError('no data returned for ' + ticker)
+                self.AddColumnPrefix(df,ticker) # add ticker label as prefix to data
+                return df
+
+            except Exception as Error: # if the above fails, wait and try again
+                LastError = Error
+                if Attempt < self.Retries:
+                    time.sleep(self.RetryDelay * 2 ** (Attempt - 1))
+
+        # report the failure (list.append is thread-safe) and continue
+        self.FailedDownloads.append({'Ticker': ticker,
+                                     'StartDate': pd.Timestamp(StartDate).strftime('%Y-%m-%d'),
+                                     'EndDate': pd.Timestamp(EndDate).strftime('%Y-%m-%d'),
+                                     'Attempts': Attempt,
+                                     'Error': type(LastError).__name__ + ': ' + str(LastError)})
+
+        return None
+
+###########################################
+###########################################
+
+    def LoadCachedTickerData(self, ticker, Fields = None):
+        """
+        Synopsis: Read the data of a single ticker from the local cache <CacheDirectory>/<Symbol>.csv.
+        ---------
+
+        Parameters:
+        -----------
+        ticker: str, the ticker symbol of the desired fund
+        Fields: list of str, OHLCV fields to read (all fields by default)
+
+        Returns:
+        --------
+        df: pandas dataframe indexed by 'Date' with columns labeled <Symbol>_Open/_High/... (None, if nothing is cached)
+        """
+
+        FileName = os.path.join(self.CacheDirectory, '{}.csv'.format(ticker))
+        if not os.path.exists(FileName):
+            return None
+
+        if Fields is None:
+            Columns = None
+        else:
+            Columns = lambda Column: Column == 'Date' or Column[len(ticker) + 1:] in Fields
+
+        return pd.read_csv(FileName, index_col = 'Date', usecols = Columns, parse_dates = True, float_precision = 'round_trip').sort_index()
+
+###########################################
+###########################################
+
+    def LoadCoverage(self, ticker, CachedDf = None):
+        """
+        Synopsis: Read the date range already requested for a single ticker from <CacheDirectory>/<Symbol>.coverage.json.
+        ---------
+
+        Parameters:
+        -----------
+        ticker: str, the ticker symbol of the desired fund
+        CachedDf: pandas dataframe indexed by 'Date', the cached data of the ticker (its dates are covered in any case,
+                  e.g., for a cache written before the coverage files)
+
+        Returns:
+        --------
+        Coverage: tuple of pandas Timestamps, (first, last) date requested (None, if nothing is covered)
+        """
+
+        Coverage = None
+        FileName = os.path.join(self.CacheDirectory, '{}.coverage.json'.format(ticker))
+        if os.path.exists(FileName):
+            with open(FileName) as CoverageFile:
+                Values = json.load(CoverageFile)
+            Coverage = (pd.Timestamp(Values['StartDate']), pd.Timestamp(Values['EndDate']))
+
+        if CachedDf is not None and not CachedDf.empty:
+            Coverage = self.ExtendCoverage(Coverage, CachedDf.index[0], CachedDf.index[-1])
+
+        return Coverage
+
+###########################################
+###########################################
+
+    def ExtendCoverage(self, Coverage, StartDate, EndDate):
+        """
+        Synopsis: Extend the covered date range Coverage by the adjacent range StartDate...EndDate.
+        ---------
+
+        The dates from today on are not covered, since their data may not be published or final yet.
+
+        Returns:
+        --------
+        Coverage: tuple of pandas Timestamps, (first, last) covered date (unchanged, if nothing before today is added)
+        """
+
+        StartDate = pd.Timestamp(StartDate)
+        EndDate = min(pd.Timestamp(EndDate), pd.Timestamp(dt.date.today()) - pd.Timedelta(days = 1))
+        if EndDate < StartDate:
+            return Coverage
+        if Coverage is None:
+            return (StartDate, EndDate)
+
+        return (min(Coverage[0], StartDate), max(Coverage[1], EndDate))
+
+###########################################
+###########################################
+
+    def SaveCoverage(self, ticker, Coverage):
+        """
+        Synopsis: Write the date range already requested for a single ticker to <CacheDirectory>/<Symbol>.coverage.json.
+        ---------
+        """
+
+        with open(os.path.join(self.CacheDirectory, '{}.coverage.json'.format(ticker)), 'w') as CoverageFile:
+            json.dump({'StartDate': Coverage[0].strftime('%Y-%m-%d'), 'EndDate': Coverage[1].strftime('%Y-%m-%d')}, CoverageFile)
+
+        return
+
 ###########################################
 ###########################################
       
@@ -135,28 +585,35 @@ class DataExtractionAndPreprocessing():
         Returns:
         ----
 
-        MergedDf: pandas dataframe containing all columns of all dataframes in the list ListOfDfs
+        MergedDf: pandas dataframe containing all columns of all dataframes in the list ListOfDfs, with one row for every date
+                  in any of the dataframes (sorted), missing values filled forward in time
         """
 
-        # for initialization of output dataframe, the first iteration is used
-        FirstIteration=True
+        if len(ListOfDfs) == 0:
+            return pd.DataFrame()
+
+        # use the reference column (or index level) of every dataframe as its index
+        ListOfIndexedDfs = []
+        for j, Df in enumerate(ListOfDfs):
+            Label = ColLabelLeft if j == 0 else ColLabelRight
+            if Label in Df.columns:
+                Df = Df.set_index(Label)
+            # a date has to appear only once for the alignment
+            ListOfIndexedDfs.append(Df[~Df.index.duplicated(keep = 'last')])
 
-        # loop through dataframes in ListOfDfs
-        for Ticker in ListOfDfs:
+        # build the union of all dates once ...
+        AllDates = ListOfIndexedDfs[0].index
+        for Df in ListOfIndexedDfs[1:]:
+            AllDates = AllDates.union(Df.index)
+        AllDates = AllDates.sort_values()
 
-            if FirstIteration: # initialize output
+        # ... align the columns of every dataframe to it, and fill forward in time (never backward) in one pass
+        MergedDf = pd.concat([Df.reindex(AllDates) for Df in ListOfIndexedDfs], axis = 1).ffill()
 
-                MergedDf = Ticker       # initialize the output dataframe with the first element of the list
-                FirstIteration=False    # initialization is done
+        # return the dates as a column, as for the other dataframes
+        MergedDf.index.name = ColLabelLeft
+        MergedDf = MergedDf.reset_index()
 
-            else:
-                # merge keeping all dates in all data frames (how = 'outer') and filling forward in time (fill_method = 'ffill')
-                MergedDf = pd.merge_ordered(left=MergedDf, 
-                                            right=Ticker, 
-                                            left_on=ColLabelLeft, 
-                                            right_on=ColLabelRight,
-                                            fill_method='ffill', 
-                                            how='outer')
         return MergedDf
 
 ###########################################
@@ -0,0 +1,129 @@
+"""
+Synopsis:
+---------
+Data sources for the class DataExtractionAndPreprocessing.
+
+A data source implements GetData(Ticker, StartDate, EndDate), which returns the daily OHLCV data of one ticker as a
+pandas dataframe indexed by 'Date' with the plain columns Open/High/Low/Close/Adj Close/Volume, and raises an
+exception if the data cannot be obtained. Any object with such a method can be passed to DataExtractionAndPreprocessing.
+An empty dataframe is a valid answer for a range without trading days; where data is expected, DataExtractionAndPreprocessing
+treats it as a failed download.
+"""
+
+import os
+import pandas as pd
+
+###########################################
+###########################################
+
+class DataSource():
+    """
+    Synopsis: Base class of the data sources.
+    ---------
+
+    Methods:
+    --------
+    GetData: method to return the OHLCV data of one ticker (to be implemented by the derived classes)
+    """
+
+    def GetData(self, Ticker, StartDate, EndDate):
+        """
+        Synopsis: Return the OHLCV data of one ticker between StartDate and EndDate.
+        ---------
+
+        Parameters:
+        -----------
+        Ticker: str, the ticker symbol of the desired fund
+        StartDate: datetime variable, the starting date of the data
+        EndDate: datetime variable, the final date of the data
+
+        Returns:
+        --------
+        df: pandas dataframe indexed by 'Date' with columns Open/High/Low/Close/Adj Close/Volume
+        """
+
+        raise NotImplementedError('GetData has to be implemented by the data source')
+
+###########################################
+###########################################
+
+class YahooDataSource(DataSource):
+    """
+    Synopsis: Data source that downloads the data from Yahoo finance (through yfinance).
+    ---------
+
+    The tickers may be downloaded from several threads at once: every call fetches the history of its own
+    yfinance.Ticker instance. (The former route, pandas-datareader patched by yfinance.pdr_override(), ends in
+    yfinance.download, which collects its results in module-level state that is cleared by every call, so that
+    concurrent downloads overwrite each other's results.)
+    """
+
+    def GetData(self, Ticker, StartDate, EndDate):
+        """
+        Synopsis: Download the OHLCV data of one ticker between StartDate and EndDate (included) from Yahoo finance.
+        ---------
+
+        Returns:
+        --------
+        df: see DataSource.GetData (empty, if Yahoo finance has no data for the ticker in the range; yfinance reports
+            most failures that way instead of raising)
+        """
+
+        # imported here, so that the other data sources can be used without this package
+        import yfinance as yf
+
+        # the end date of yfinance is excluded
+        df = yf.Ticker(Ticker).history(start = pd.Timestamp(StartDate).to_pydatetime(),
+                                       end = (pd.Timestamp(EndDate) + pd.Timedelta(days = 1)).to_pydatetime(),
+                                       auto_adjust = False,
+                                       actions = False)
+
+        # plain (time zone naive) dates, as in the cache files
+        if getattr(df.index, 'tz', None) is not None:
+            df.index = df.index.tz_localize(None)
+        df.index = pd.DatetimeIndex(df.index).normalize()
+        df.index.name = 'Date'
+
+        return df[[j for j in ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'] if j in df.columns]]
+
+###########################################
+###########################################
+
+class CsvDataSource(DataSource):
+    """
+    Synopsis: Data source that serves the data from a directory of <Symbol>.csv files, as written to 'fund_details/'.
+    ---------
+
+    For tests and benchmarks without network access.
+
+    Properties:
+    -----------
+    self.Directory: str, directory with the .csv files
+    """
+
+    def __init__(self, Directory = 'fund_details'):
+        """
+        Synopsis: Set the directory to read the .csv files from.
+        ---------
+        """
+
+        self.Directory = Directory
+
+        return
+
+    def GetData(self, Ticker, StartDate, EndDate):
+        """
+        Synopsis: Read the OHLCV data of one ticker between StartDate and EndDate from <Directory>/<Ticker>.csv.
+        ---------
+        """
+
+        FileName = os.path.join(self.Directory, '{}.csv'.format(Ticker))
+        if not os.path.exists(FileName):
+            raise FileNotFoundError('no data for ' + Ticker + ' in ' + self.Directory)
+
+        df = pd.read_csv(FileName, index_col = 'Date', parse_dates = True, float_precision = 'round_trip').sort_index()
+
+        # the files store the columns prefixed with the ticker symbol
+        df.columns = [j[len(Ticker) + 1:] if j.startswith(Ticker + '_') else j for j in df.columns]
+
+        return df.loc[pd.Timestamp(StartDate):pd.Timestamp(EndDate)]
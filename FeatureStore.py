@@ -0,0 +1,316 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+class FeatureStore():
+    """
+    Synopsis: Class that implements a binary, columnar store of prices and features on disk (numpy memory maps).
+    ---------
+
+    A store is a directory holding a date index, a list of tickers and any number of fields. Every field is one
+    (dates x tickers) numpy .npy file that is memory-mapped on loading, so that selected tickers, fields and date
+    ranges are read without parsing text and (mostly) without copies. The column <Ticker>_<Field> of a dataframe
+    corresponds to the column Ticker of the field Field, e.g.,
+    * raw data: field 'Close' of ticker 'GADGX' <-> column 'GADGX_Close' of DataExtractionAndPreprocessing.AllData
+    * features: field '^DJI_IR_92' of ticker 'GADGX' <-> column 'GADGX_^DJI_IR_92' of InformationRatio.AllData
+
+    Layout of the directory:
+    * Index.json: tickers, fields (with their file names), data type and number of dates
+    * Dates.npy: the dates (numpy datetime64[ns], sorted)
+    * Field_<k>.npy: the (dates x tickers) array of the k-th field
+
+    Properties:
+    -----------
+    self.Directory: str, directory of the store
+    self.Tickers: list of str, ticker symbols (columns of every field)
+    self.Fields: list of str, names of the fields
+    self.Dates: numpy array, (dates,) datetime64[ns] dates (rows of every field)
+
+    Methods:
+    --------
+    __init__: open an existing store (or prepare an empty one)
+    Write: method to (over)write the store with the given dates, tickers and fields
+    AddFields: method to add fields on the dates and tickers of the store
+    AllocateFields: method to add fields as writable memory maps, to be filled block by block (e.g., out-of-core results)
+    FromDataFrame: alternative constructor that writes the <Ticker>_<Field> columns of a dataframe to a store
+    Load: method to load selected tickers, fields and a date range as memory-mapped arrays
+    LoadDataFrame: method to load a selection as a dataframe with <Ticker>_<Field> columns and a 'Date' column
+    """
+
+    IndexFileName = 'Index.json'
+    DatesFileName = 'Dates.npy'
+
+###########################################
+###########################################
+
+    def __init__(self, Directory = 'feature_store'):
+        """
+        Synopsis: Open the store in Directory (if it exists).
+        ---------
+
+        Parameters:
+        -----------
+        Directory: str, directory of the store
+
+        Returns:
+        --------
+        Nothing, but initializes self.Tickers, self.Fields and self.Dates (empty, if there is no store yet)
+        """
+
+        self.Directory = Directory
+        self.Tickers = []
+        self.Fields = []
+        self.FileNames = {}
+        self.DType = 'float64'
+        self.Dates = np.array([], dtype = 'datetime64[ns]')
+
+        if os.path.exists(os.path.join(Directory, self.IndexFileName)):
+            with open(os.path.join(Directory, self.IndexFileName)) as IndexFile:
+                Index = json.load(IndexFile)
+            self.Tickers = Index['Tickers']
+            self.Fields = Index['Fields']
+            self.FileNames = Index['FileNames']
+            self.DType = Index['DType']
+            self.Dates = np.load(os.path.join(Directory, self.DatesFileName), mmap_mode = 'r')
+
+        return
+
+###########################################
+###########################################
+
+    def Write(self, Dates = None, Tickers = None, Fields = None, DType = 'float64'):
+        """
+        Synopsis: (Over)write the store with the given dates, tickers and fields.
+        ---------
+
+        Parameters:
+        -----------
+        Dates: array-like, (dates,) sorted dates of the rows
+        Tickers: list of str, ticker symbols of the columns
+        Fields: dict of str -> array-like, (dates x tickers) arrays of the fields
+        DType: str, numpy data type the fields are stored with (e.g., 'float32' to halve the size)
+
+        Returns:
+        --------
+        <files>: Index.json, Dates.npy and one .npy file per field in self.Directory
+        """
+
+        if not os.path.exists(self.Directory):
+            os.makedirs(self.Directory)
+
+        # remove the fields of a previous store
+        for FileName in self.FileNames.values():
+            if os.path.exists(os.path.join(self.Directory, FileName)):
+                os.remove(os.path.join(self.Directory, FileName))
+
+        self.Dates = np.asarray(pd.DatetimeIndex(Dates).values, dtype = 'datetime64[ns]')
+        self.Tickers = [str(j) for j in Tickers]
+        self.Fields = []
+        self.FileNames = {}
+        self.DType = str(np.dtype(DType))
+
+        np.save(os.path.join(self.Directory, self.DatesFileName), self.Dates)
+
+        self.AddFields(Fields)
+
+        return
+
+###########################################
+###########################################
+
+    def AddFields(self, Fields = None):
+        """
+        Synopsis: Add (or replace) fields on the dates and tickers of the store.
+        ---------
+
+        Parameters:
+        -----------
+        Fields: dict of str -> array-like, (dates x tickers) arrays of the fields
+
+        Returns:
+        --------
+        <files>: one .npy file per field and the updated Index.json in self.Directory
+        """
+
+        for Name, Values in Fields.items():
+
+            Values = np.asarray(Values)
+            if Values.shape != (len(self.Dates), len(self.Tickers)):
+                raise ValueError('field ' + Name + ' has shape ' + str(Values.shape) + ', expected (dates x tickers) = '
+                                 + str((len(self.Dates), len(self.Tickers))))
+
+            if Name not in self.FileNames:
+                self.FileNames[Name] = 'Field_' + str(len(self.FileNames)) + '.npy'
+                self.Fields.append(Name)
+
+            np.save(os.path.join(self.Directory, self.FileNames[Name]), Values.astype(self.DType, copy = False))
+
+        self.WriteIndex()
+
+        return
+
+###########################################
+###########################################
+
+    def AllocateFields(self, Names = None, FillValue = np.nan):
+        """
+        Synopsis: Add (or replace) fields as writable memory maps, to be filled block by block (no field is held in memory).
+        ---------
+
+        Parameters:
+        -----------
+        Names: list of str, names of the fields
+        FillValue: float, initial value of the fields
+
+        Returns:
+        --------
+        Fields: dict of str -> numpy memory map, writable (dates x tickers) array of every field (flush it when done)
+        <files>: one .npy file per field and the updated Index.json in self.Directory
+        """
+
+        Fields = {}
+        for Name in Names:
+
+            if Name not in self.FileNames:
+                self.FileNames[Name] = 'Field_' + str(len(self.FileNames)) + '.npy'
+                self.Fields.append(Name)
+
+            Fields[Name] = np.lib.format.open_memmap(os.path.join(self.Directory, self.FileNames[Name]), mode = 'w+',
+                                                     dtype = self.DType, shape = (len(self.Dates), len(self.Tickers)))
+            Fields[Name][...] = FillValue
+
+        self.WriteIndex()
+
+        return Fields
+
+###########################################
+###########################################
+
+    def WriteIndex(self):
+        """
+        Synopsis: Write Index.json with the tickers, fields, data type and number of dates of the store.
+        ---------
+        """
+
+        with open(os.path.join(self.Directory, self.IndexFileName), 'w') as IndexFile:
+            json.dump({'Tickers': self.Tickers,
+                       'Fields': self.Fields,
+                       'FileNames': self.FileNames,
+                       'DType': self.DType,
+                       'NumberOfDates': len(self.Dates)}, IndexFile, indent = 1)
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromDataFrame(cls,
+                      Directory = 'feature_store',
+                      TickerDf = None,
+                      Tickers = ['GADGX','^DJI'],
+                      Fields = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume'],
+                      DType = 'float64'):
+        """
+        Synopsis: Write the columns <Ticker>_<Field> of a dataframe to a store.
+        ---------
+
+        Parameters:
+        -----------
+        Directory: str, directory of the store
+        TickerDf: pandas dataframe with a 'Date' column (or a date index) and columns labeled <Ticker>_<Field>
+        Tickers: list of str, ticker symbols to store
+        Fields: list of str, fields to store (e.g., the OHLCV fields, or '^DJI_IR_92' for the IRs against '^DJI')
+        DType: str, numpy data type the fields are stored with
+
+        Returns:
+        --------
+        FeatureStore instance (columns missing in TickerDf are stored as NaN)
+        """
+
+        Dates = TickerDf['Date'] if 'Date' in TickerDf.columns else TickerDf.index
+
+        FieldArrays = {}
+        for Field in Fields:
+            Labels = [j + '_' + Field for j in Tickers]
+            FieldArrays[Field] = TickerDf.reindex(columns = Labels).to_numpy(dtype = float)
+
+        Instance = cls(Directory)
+        Instance.Write(Dates = Dates, Tickers = Tickers, Fields = FieldArrays, DType = DType)
+
+        return Instance
+
+###########################################
+###########################################
+
+    def Load(self, Tickers = None, Fields = None, StartDate = None, EndDate = None):
+        """
+        Synopsis: Load selected tickers and fields over a date range.
+        ---------
+
+        Parameters:
+        -----------
+        Tickers: list of str, ticker symbols to load (default: all)
+        Fields: list of str, fields to load (default: all)
+        StartDate: str or datetime variable, first date to load (default: first date of the store)
+        EndDate: str or datetime variable, last date to load (default: last date of the store)
+
+        Returns:
+        --------
+        Dates: numpy array, (dates,) selected dates
+        Tickers: list of str, selected ticker symbols
+        Data: dict of str -> numpy array, (dates x tickers) array of every selected field; a read-only view on the memory
+              map, if the selected tickers are adjacent in the store (in particular, for all tickers), otherwise a copy of
+              the selected columns only
+        """
+
+        # the dates are sorted, so the date range is a slice of the rows
+        FirstRow = 0 if StartDate is None else int(np.searchsorted(self.Dates, pd.Timestamp(StartDate).to_datetime64(), side = 'left'))
+        LastRow = len(self.Dates) if EndDate is None else int(np.searchsorted(self.Dates, pd.Timestamp(EndDate).to_datetime64(), side = 'right'))
+        Rows = slice(FirstRow, LastRow)
+
+        # adjacent tickers are a slice of the columns as well
+        if Tickers is None:
+            Tickers = list(self.Tickers)
+            Columns = slice(None)
+        else:
+            Tickers = list(Tickers)
+            Positions = [self.Tickers.index(j) for j in Tickers]
+            if len(Positions) > 0 and Positions == list(range(Positions[0], Positions[0] + len(Positions))):
+                Columns = slice(Positions[0], Positions[0] + len(Positions))
+            else:
+                Columns = Positions
+
+        Data = {}
+        for Field in (self.Fields if Fields is None else Fields):
+            Values = np.load(os.path.join(self.Directory, self.FileNames[Field]), mmap_mode = 'r')
+            Data[Field] = Values[Rows][:, Columns]
+
+        return self.Dates[Rows], Tickers, Data
+
+###########################################
+###########################################
+
+    def LoadDataFrame(self, Tickers = None, Fields = None, StartDate = None, EndDate = None):
+        """
+        Synopsis: Load selected tickers and fields over a date range as a dataframe (for use with the other classes).
+        ---------
+
+        Parameters:
+        -----------
+        see Load
+
+        Returns:
+        --------
+        Df: pandas dataframe with a 'Date' column and the columns <Ticker>_<Field>, ordered ticker by ticker
+        """
+
+        Dates, Tickers, Data = self.Load(Tickers = Tickers, Fields = Fields, StartDate = StartDate, EndDate = EndDate)
+
+        Columns = {'Date': pd.DatetimeIndex(Dates)}
+        for k, Ticker in enumerate(Tickers):
+            for Field, Values in Data.items():
+                Columns[Ticker + '_' + Field] = np.asarray(Values[:, k])
+
+        return pd.DataFrame(Columns)
@@ -1,103 +1,286 @@
 """
 Main routine:
 -------------
-* instantiate classes DataExtractionAndPreProcessing and InformationRatio to download data and calculate information ratios
-* create a few plots stored in the folder ./plots/
+* command line entry point that runs the selected stages of the analysis:
+  * fetch: download the data (only the dates missing in the folder './fund_details/<Symbol>.csv') and store it there
+  * compute: calculate the information ratios (from the data of the fetch stage, or from './fund_details/' alone)
+  * plot: create a few plots stored in the folder ./plots/
+  * export: write the information ratios to a .csv file or a FeatureStore directory
+* the configuration (universe, benchmark(s), window, ...) is taken from Input.py, optionally overridden by a .json file
+  with the same names (e.g., {"SymbolList": ["GADGX", "^DJI"], "Window": 92}) and by the command line options
+* every stage imports its modules only when it runs, so that, e.g., a compute-only run from the cached data neither
+  imports the download packages nor matplotlib
+
+Examples:
+    python FundsInformationRatioAnalysis.py                                  # the Stages of Input.py (fetch, compute, plot)
+    python FundsInformationRatioAnalysis.py compute export --config universe.json
+    python FundsInformationRatioAnalysis.py compute --window 30 92 --benchmark ^GSPC
 """
 
+import argparse
+import json
+import os
+import sys
 
+# all stages in the order they run
+Stages = ['fetch', 'compute', 'plot', 'export']
 
+###########################################
+###########################################
 
-from Input import BenchmarkLabel
-import matplotlib.pyplot as plt
-import os
+def LoadConfiguration(FileName = None, Overrides = None):
+    """
+    Synopsis: Assemble the configuration from Input.py, a .json file and the command line options (in increasing priority).
+    ---------
+
+    Parameters:
+    -----------
+    FileName: str, .json file with configuration values named as in Input.py (None: Input.py alone)
+    Overrides: dict, configuration values set on the command line (None values are ignored)
+
+    Returns:
+    --------
+    Configuration: dict with all the names of Input.py
+    """
+
+    import Input
+    Configuration = {j: getattr(Input, j) for j in dir(Input) if not j.startswith('_')}
+
+    if FileName is not None:
+        with open(FileName) as ConfigurationFile:
+            Values = json.load(ConfigurationFile)
+        Unknown = [j for j in Values if j not in Configuration]
+        if len(Unknown) > 0:
+            raise ValueError('unknown configuration values in ' + FileName + ': ' + ', '.join(Unknown))
+        Configuration.update(Values)
+
+    Configuration.update({j: Value for j, Value in (Overrides or {}).items() if Value is not None})
+
+    return Configuration
+
+###########################################
+###########################################
+
+def SymbolsWithBenchmarks(Configuration):
+    """
+    Synopsis: List the symbols of the configuration, extended by the benchmarks of the mapping (these are needed as well).
+    ---------
+    """
+
+    SymbolList = list(Configuration['SymbolList'])
+    for Benchmarks in (Configuration['BenchmarkMap'] or {}).values():
+        SymbolList += [j for j in ([Benchmarks] if isinstance(Benchmarks, str) else Benchmarks) if j not in SymbolList]
+
+    return SymbolList
+
+###########################################
+###########################################
+
+def Fetch(Configuration, Offline = False, Profiler = None):
+    """
+    Synopsis: Build the merged data of all symbols, downloading the missing dates (or from the cache alone, if Offline).
+    ---------
+
+    Returns:
+    --------
+    DataExInstance: DataExtractionAndPreprocessing instance, with the data in DataExInstance.AllData
+    """
+
+    # get data extraction class (the download packages are only imported by a download)
+    from DataExtractionAndPreprocessing import DataExtractionAndPreprocessing as DataEx
+
+    return DataEx(SymbolList = SymbolsWithBenchmarks(Configuration),
+                  StartDate = Configuration['StartDate'],
+                  Offline = Offline or Configuration['Offline'],
+                  Fields = ['Close', 'Adj Close'] if Configuration['Lean'] else None,
+                  DType = Configuration['DType'],
+                  Calendar = Configuration['Calendar'],
+                  ReportingFrequencies = Configuration['ReportingFrequencies'],
+                  Profiler = Profiler) # default for EndDate is today.
+
+###########################################
+###########################################
+
+def Compute(Configuration, AllData, PeriodsPerYear = 365, Profiler = None):
+    """
+    Synopsis: Calculate the information ratios of all funds against their benchmark(s).
+    ---------
+
+    Parameters:
+    -----------
+    PeriodsPerYear: int, number of dates per year of the calendar of AllData (see DataExtractionAndPreprocessing.PeriodsPerYear)
+
+    Returns:
+    --------
+    IRInstance: InformationRatio instance, with the information ratios in IRInstance.AllData
+    """
 
-if __name__ == "__main__":
-    # get input
-    import Input as inp
     # get functions to add information ratios to dataframe
     from InformationRatio import InformationRatio as IR
-    # get data extraction class
-    from DataExtractionAndPreprocessing import DataExtractionAndPreprocessing as DataEx
 
-    # download data and store it in the folder './fund_details/<Symbol>.csv'
-    DataExInstance=DataEx(SymbolList = inp.SymbolList,
-                          StartDate = inp.StartDate) # default for EndDate is today.
-
-    # instantiate information ratio class
-    IRInstance=IR(SymbolList = inp.SymbolList,
-                  BenchmarkLabel = inp.BenchmarkLabel,
-                  Window = inp.Window,
-                  RiskFreeRate = inp.RiskFreeRate,
-                  AllData=DataExInstance.AllData)
-    
-    # now, the information ratios are available in IRInstance.AllData 
-    # for efficiency reasons, it's likely better to get the IRs as numpy arrays with pandas builtin .to_numpy() method (depends largely on what's the type of predictive modeling)
-
-    # if the output directory does not exist, create it
-    if not os.path.exists('plots'):
-        os.makedirs('plots')
-
-    # plot IRs as histograms and as line plots
-    for j in inp.SymbolList:
-        if j != inp.BenchmarkLabel:
-
-            #### IR based on Bare returns 
-            #### IR based on Bare returns 
-
-            # assemble column label (should make that a function...)
-            ColumnLabel = j + "_" + inp.BenchmarkLabel + "_" + "IR" + "_" + str(inp.Window)
-            # use pandas dataframe plot method
-            ax = IRInstance.AllData[ColumnLabel].plot.hist(bins=12, alpha=0.5)
-            # set title
-            ax.set_title("Information ratio for " + j + " vs " + inp.BenchmarkLabel)
-            # set axes label
-            ax.set_xlabel("IR, bare returns")
-            # save figure to png
-            plt.savefig('plots/IR_bare_'+ j + "_vs_" + inp.BenchmarkLabel + "_hist.png")
-            # clear/close figure
-            plt.clf
-            plt.close()
-
-            # use pandas dataframe plot method
-            ax = IRInstance.AllData[[ColumnLabel,'Date']].plot(x='Date',y=ColumnLabel)
-            # set title
-            ax.set_title("Information ratio for " + j + " vs " + inp.BenchmarkLabel)
-            # set title
-            ax.set_ylabel("IR, bare returns")
-            ax.set_xlabel("Date")
-            # save figure to png
-            plt.savefig('plots/IR_bare_'+ j + "_vs_" + inp.BenchmarkLabel + ".png")
-            # clear/close figure
-            plt.clf
-            plt.close()
-
-            #### IR based on risk-adjusted returns 
-            #### IR based on risk-adjusted returns 
-
-            # assemble column label (should make that a function...)
-            ColumnLabel = j + "_" + inp.BenchmarkLabel + "_" + "IRA" + "_" + str(inp.Window)
-            # use pandas dataframe plot method
-            ax = IRInstance.AllData[ColumnLabel].plot.hist(bins=12, alpha=0.5)
-            # set title
-            ax.set_title("Information ratio for " + j + " vs " + inp.BenchmarkLabel)
-            # set axes label
-            ax.set_xlabel("IR, adjusted returns")
-            # save figure to png
-            plt.savefig('plots/IR_adjusted_'+ j + "_vs_" + inp.BenchmarkLabel + "_hist.png")
-            # clear/close figure
-            plt.clf
-            plt.close()
-
-            # use pandas dataframe plot method
-            ax = IRInstance.AllData[[ColumnLabel,'Date']].plot(x='Date',y=ColumnLabel)
-            # set title
-            ax.set_title("Information ratio for " + j + " vs " + inp.BenchmarkLabel)
-            # set title
-            ax.set_ylabel("IR, adjusted returns")
-            ax.set_xlabel("Date")
-            # save figure to png
-            plt.savefig('plots/IR_adjusted_'+ j + "_vs_" + inp.BenchmarkLabel + ".png")
-            # clear/close figure
-            plt.clf
-            plt.close()
\ No newline at end of file
+    return IR(SymbolList = SymbolsWithBenchmarks(Configuration),
+              BenchmarkLabel = Configuration['BenchmarkLabel'],
+              BenchmarkMap = Configuration['BenchmarkMap'],
+              Window = Configuration['Window'],
+              RiskFreeRate = Configuration['RiskFreeRate'],
+              AllData = AllData,
+              Lean = Configuration['Lean'],
+              DType = Configuration['DType'],
+              MaxWorkers = Configuration['MaxWorkers'],
+              PeriodsPerYear = PeriodsPerYear,
+              Profiler = Profiler)
+
+###########################################
+###########################################
+
+def Plot(Configuration, IRInstance, Profiler = None):
+    """
+    Synopsis: Plot the IRs as histograms and as line plots (in parallel, skipping figures whose data did not change), benchmark by benchmark.
+    ---------
+
+    Returns:
+    --------
+    <files>: .png images in ./plots/ (for a list of windows, in ./plots/Window_<Window>/ for every window)
+    """
+
+    # get plotting class (matplotlib itself is only imported by the processes rendering the figures)
+    from InformationRatioPlots import InformationRatioPlots as IRPlots
+
+    Window = Configuration['Window']
+    for ThisWindow in ([Window] if isinstance(Window, int) else list(Window)):
+        for Benchmark, Funds in IRInstance.Engine.Groups.items():
+            IRPlots(AllData = IRInstance.AllData,
+                    SymbolList = Funds,
+                    BenchmarkLabel = Benchmark,
+                    Window = ThisWindow,
+                    PlotDirectory = 'plots' if isinstance(Window, int) else os.path.join('plots', 'Window_' + str(ThisWindow)),
+                    IndividualPlots = Configuration['IndividualPlots'],
+                    SummaryPlots = Configuration['SummaryPlots'],
+                    Profiler = Profiler)
+
+    return
+
+###########################################
+###########################################
+
+def Export(Configuration, IRInstance):
+    """
+    Synopsis: Write the information ratios to the file (or directory) Configuration['ExportFile'].
+    ---------
+
+    Returns:
+    --------
+    <file>: a .csv file with the 'Date' column and the IR columns <InvestmentLabel>_<BenchmarkLabel>_<IR_label>_<Window>, or
+            (for a name without the extension .csv) a FeatureStore directory with the fields <BenchmarkLabel>_<IR_label>_<Window>
+    """
+
+    FileName = Configuration['ExportFile']
+    AllData = IRInstance.AllData
+
+    if FileName.endswith('.csv'):
+        IRLabels = [j for j in AllData.columns if '_IR_' in j or '_IRA_' in j]
+        AllData[[j for j in ['Date'] if j in AllData.columns] + IRLabels].to_csv(FileName, index = False)
+    else:
+        from FeatureStore import FeatureStore
+        Windows = [IRInstance.Engine.Window] if isinstance(IRInstance.Engine.Window, int) else list(IRInstance.Engine.Window)
+        Funds = []
+        Fields = []
+        for Benchmark, GroupFunds in IRInstance.Engine.Groups.items():
+            Funds += [j for j in GroupFunds if j not in Funds]
+            Fields += [Benchmark + Label + str(Window) for Label in ['_IR_', '_IRA_'] for Window in Windows]
+        FeatureStore.FromDataFrame(Directory = FileName, TickerDf = AllData, Tickers = Funds, Fields = Fields,
+                                   DType = Configuration['DType'] or 'float64')
+
+    print('information ratios written to ' + FileName)
+
+    return
+
+###########################################
+###########################################
+
+def Main(CommandLine = None):
+    """
+    Synopsis: Parse the command line and run the selected stages.
+    ---------
+
+    Parameters:
+    -----------
+    CommandLine: list of str, command line arguments (defaults to sys.argv[1:])
+
+    Returns:
+    --------
+    Results: dict with the instances created by the stages ('DataEx': DataExtractionAndPreprocessing, 'IR': InformationRatio)
+    """
+
+    Parser = argparse.ArgumentParser(description = 'Calculate (and plot/export) the information ratios of funds against their benchmarks.')
+    Parser.add_argument('stages', nargs = '*', metavar = 'stage',
+                        help = 'stages to run: ' + ', '.join(Stages) + ' (default: Stages of the configuration); plot and export include compute')
+    Parser.add_argument('--config', default = None, help = '.json file with configuration values named as in Input.py')
+    Parser.add_argument('--symbols', nargs = '+', default = None, help = 'ticker symbols of the funds and the benchmark')
+    Parser.add_argument('--benchmark', default = None, help = 'ticker symbol of the benchmark')
+    Parser.add_argument('--window', nargs = '+', type = int, default = None, help = 'window(s) of the information ratios')
+    Parser.add_argument('--start-date', default = None, help = 'first date of the data, e.g., 2017-01-01')
+    Parser.add_argument('--offline', action = 'store_const', const = True, default = None, help = 'use the cached data alone, also in the fetch stage')
+    Parser.add_argument('--export-file', default = None, help = '.csv file or FeatureStore directory written by the export stage')
+    Parser.add_argument('--profile', action = 'store_const', const = True, default = None, help = 'record and report time and memory of every stage')
+    Arguments = Parser.parse_args(CommandLine)
+
+    Unknown = [j for j in Arguments.stages if j not in Stages]
+    if len(Unknown) > 0:
+        Parser.error('unknown stage(s) ' + ', '.join(Unknown) + ' (choose from ' + ', '.join(Stages) + ')')
+
+    Configuration = LoadConfiguration(Arguments.config,
+                                      {'SymbolList': Arguments.symbols,
+                                       'BenchmarkLabel': Arguments.benchmark,
+                                       'Window': Arguments.window if Arguments.window is None or len(Arguments.window) > 1 else Arguments.window[0],
+                                       'StartDate': Arguments.start_date,
+                                       'Offline': Arguments.offline,
+                                       'ExportFile': Arguments.export_file,
+                                       'Profile': Arguments.profile})
+
+    Selected = set(Arguments.stages or Configuration['Stages'])
+    if 'plot' in Selected or 'export' in Selected:
+        Selected.add('compute')
+
+    # record the stages of the run (without profiling, the stages run with the shared no-op profiler of Instrumentation)
+    ProfilerInstance = None
+    if Configuration['Profile']:
+        from Instrumentation import Profiler
+        ProfilerInstance = Profiler()
+
+    Results = {}
+    if 'fetch' in Selected or 'compute' in Selected:
+        # without the fetch stage, the data is built from the cache './fund_details/' alone
+        Results['DataEx'] = Fetch(Configuration, Offline = 'fetch' not in Selected, Profiler = ProfilerInstance)
+
+    if 'compute' in Selected:
+        Results['IR'] = Compute(Configuration, Results['DataEx'].AllData,
+                               PeriodsPerYear = Results['DataEx'].PeriodsPerYear,
+                               Profiler = ProfilerInstance)
+        # now, the information ratios are available in Results['IR'].AllData
+        # for efficiency reasons, it's likely better to get the IRs as numpy arrays with pandas builtin .to_numpy() method (depends largely on what's the type of predictive modeling)
+        # for sequence models, SequenceDataset.FromDataFrame(IRInstance.AllData, Lookback, Horizon) provides (samples x lookback x features) windows without copies
+        # for forecasting experiments, WalkForwardDataset.FromDataFrame(IRInstance.AllData, Lookback = ..., Horizon = 365) provides cached walk-forward train/validation folds
+        # for screening, InformationRatioRanking.FromDataFrame(IRInstance.AllData, BenchmarkLabel, Window) ranks the funds on every date (top-k sets, (fund, date) queries)
+
+    if 'plot' in Selected:
+        Plot(Configuration, Results['IR'], Profiler = ProfilerInstance)
+
+    if 'export' in Selected:
+        Export(Configuration, Results['IR'])
+
+    # write the time, memory and result shapes of every stage
+    if ProfilerInstance is not None:
+        print(ProfilerInstance.Summary())
+        if 'IR' in Results:
+            print('returns/Sharpe ratio cache: ' + str(Results['IR'].Cache.Statistics()))
+        ProfilerInstance.WriteReport(Configuration['RunReport'])
+
+    return Results
+
+###########################################
+###########################################
+
+if __name__ == "__main__":
+    Main()
+    sys.exit(0)
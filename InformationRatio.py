@@ -1,5 +1,8 @@
-import numpy as np
 import pandas as pd
+from RollingStatistics import RollingSharpeRatio, RollingInformationRatio
+from MultiBenchmarkInformationRatio import MultiBenchmarkInformationRatio
+from Instrumentation import DisabledProfiler
+from SeriesCache import SeriesCache
 
 class InformationRatio():
     """ 
@@ -9,10 +12,14 @@ class InformationRatio():
     Properties:
     -----------
     self.AllData: pandas dataframe that contains all the IRs added
+    self.Engine: MultiBenchmarkInformationRatio instance, holding the IRs of all funds, grouped by benchmark
+    self.Batch: BatchInformationRatio instance, holding the IRs of all funds against BenchmarkLabel as compact (dates x funds)
+                arrays (None, if no fund is compared with BenchmarkLabel)
+    self.Cache: SeriesCache instance, memoizing the returns and Sharpe ratios (e.g., of the benchmark) across funds and IR variants
 
     Methods:
     --------
-    __init__: initialize self.AllData with dataframe that contains the bare and risk-adjusted IR added
+    __init__: initialize self.AllData with dataframe that contains the bare and risk-adjusted IR added (computed for all funds at once)
     CalculateInformationRatio: method to compute information ratios and add them to a dataframe
     SharpeRatio: function to compute the Sharpe ratio (risk-adjusted returns) and add them to a dataframe
     Returns: method to compute the returns or log-returns and add them to a dataframe
@@ -27,7 +34,14 @@ class InformationRatio():
                  BenchmarkLabel = '^DJI', 
                  Window = 50,
                  RiskFreeRate = 0.01,
-                 AllData = None):
+                 AllData = None,
+                 BenchmarkMap = None,
+                 Lean = False,
+                 DType = None,
+                 Cache = None,
+                 MaxWorkers = 1,
+                 PeriodsPerYear = 365,
+                 Profiler = None):
         """ 
         Synopsis: Initialize self.AllData dataframe by adding IR data to the input dataframe AllData.
         ---------
@@ -38,8 +52,19 @@ class InformationRatio():
         AllData: pandas dataframe expected to contain OHLCV data of the assets/funds
         SymbolList: list of str, ticker symbols in dataframe AllData
         BenchmarkLabel: str, ticker symbol (per Yahoo finance standard) for use as the benchmark 
-        Window: int, number of time steps to use to evaluate the information ratio
+        Window: int, number of time steps to use to evaluate the information ratio (or list of int, to add the IRs for several windows in one pass)
         RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+        BenchmarkMap: dict of str -> str or list of str, benchmark(s) of every fund, e.g., {'GADGX': ['^DJI', '^GSPC']}
+                      (defaults to all funds in SymbolList against BenchmarkLabel); the benchmarks' series are computed
+                      once and the IRs of the funds of each benchmark in one block
+        Lean: boolean, toggle for the lean-memory mode: self.AllData only keeps the 'Date' column and the IRs (no OHLCV
+              data, returns or Sharpe ratios), and the returns and Sharpe ratios are released as soon as possible
+        DType: str, numpy data type the IRs are stored with (float64 by default; 'float32' halves their size, they are computed in float64 anyway)
+        Cache: SeriesCache instance, to share the returns and Sharpe ratios with other computations on the same data (a new cache by default)
+        MaxWorkers: int, number of processes the funds are sharded across (1: serial, None: number of processors; the IRs are identical)
+        PeriodsPerYear: int or float, number of time steps per year of the date grid of AllData, scaling the risk-free rate to
+                        the window (365 for calendar days, 252 for business days; see DataExtractionAndPreprocessing.PeriodsPerYear)
+        Profiler: Instrumentation.Profiler instance to record the stages 'returns', 'sharpe', 'ir' and 'ir_dataframe' (no recording by default)
 
         Returns:
         --------
@@ -47,26 +72,34 @@ class InformationRatio():
         self.AllData: pandas dataframe, containing additional columns with the bare and risk-adjusted IRs labeled <InvestmentLabel>_<BenchmarkLabel>_<IR_label>_<Window>.
         """
 
-        self.AllData = AllData
-        # loop to add bare information ratios
-        for ThisTicker in SymbolList:        
-            self.AllData = self.CalculateInformationRatio(TickerDf = self.AllData, 
-                                                          InvestmentLabel = ThisTicker, 
-                                                          BenchmarkLabel = BenchmarkLabel, 
-                                                          Window = Window,
-                                                          RiskAdjusted = False,
-                                                          RiskFreeRate = RiskFreeRate)
-  
-        # loop to add risk-adjusted information ratios
-        for ThisTicker in SymbolList:        
-            self.AllData=self.CalculateInformationRatio(TickerDf = self.AllData, 
-                                                        InvestmentLabel = ThisTicker, 
-                                                        BenchmarkLabel = BenchmarkLabel, 
-                                                        Window = Window,
-                                                        RiskAdjusted = True,
-                                                        RiskFreeRate = RiskFreeRate)
-
-        
+        if Profiler is None:
+            Profiler = DisabledProfiler
+        self.Cache = Cache if Cache is not None else SeriesCache()
+
+        if BenchmarkMap is None:
+            BenchmarkMap = {j: BenchmarkLabel for j in SymbolList if j != BenchmarkLabel}
+
+        # compute the IRs of all funds in one pass over a (dates x funds) array per benchmark
+        self.Engine = MultiBenchmarkInformationRatio.FromDataFrame(TickerDf = AllData,
+                                                                   BenchmarkMap = BenchmarkMap,
+                                                                   Window = Window,
+                                                                   RiskFreeRate = RiskFreeRate,
+                                                                   PeriodsPerYear = PeriodsPerYear,
+                                                                   Intermediates = not Lean,
+                                                                   DType = DType,
+                                                                   Cache = self.Cache,
+                                                                   MaxWorkers = MaxWorkers,
+                                                                   Profiler = Profiler)
+        self.Batch = self.Engine.Batches.get(BenchmarkLabel)
+
+        # add the results to the dataframe as columns <InvestmentLabel>_<BenchmarkLabel>_<IR_label>_<Window>
+        # (in the lean-memory mode, to the dates alone)
+        with Profiler.Stage('ir_dataframe') as Stage:
+            ResultDf = self.Engine.ToDataFrame(Index = AllData.index, Intermediates = not Lean)
+            if Lean:
+                AllData = AllData[[j for j in ['Date'] if j in AllData.columns]]
+            self.AllData = pd.concat([AllData.drop(columns = ResultDf.columns, errors = 'ignore'), ResultDf], axis = 1)
+            Stage.Shape(self.AllData)
 
         return
 
@@ -79,7 +112,8 @@ class InformationRatio():
                                   BenchmarkLabel = '^DJI', 
                                   Window = 50,
                                   RiskAdjusted = False,
-                                  RiskFreeRate = 0.01):
+                                  RiskFreeRate = 0.01,
+                                  PeriodsPerYear = 365):
         """ 
         Synopsis: Compute the information ratio (IR) using a window of values and a benchmark.
         ---------
@@ -127,28 +161,22 @@ class InformationRatio():
             InvestmentReturnLabel = self.SharpeRatio(TickerDf = TickerDf, 
                                                      ReturnsLabel = InvestmentBareReturnLabel, 
                                                      RiskFreeRate = RiskFreeRate, 
-                                                     Window = Window)
+                                                     Window = Window,
+                                                     PeriodsPerYear = PeriodsPerYear)
             BenchmarkReturnLabel = self.SharpeRatio(TickerDf = TickerDf, 
                                                     ReturnsLabel = BenchmarkBareReturnLabel, 
                                                     RiskFreeRate = RiskFreeRate, 
-                                                    Window = Window)
+                                                    Window = Window,
+                                                    PeriodsPerYear = PeriodsPerYear)
 
 
         
         # get difference/absolute returns, i.e., outperformance vs benchmark
         Alphas = TickerDf[InvestmentReturnLabel] - TickerDf[BenchmarkReturnLabel]
 
-        # get omegas root variance / std. dev. of outperformance
-        Omegas=Alphas.rolling(window=Window,min_periods = 0).std()
-
-        # get expectation of returns --> Alphas
-        Alphas=Alphas.rolling(window = Window, min_periods = 0).mean()
-
-        # add information ratio to dataframe 
-        TickerDf[IRLabel] = Alphas/Omegas
-
-        # fill undefined values (here, it's important to use method 'ffill', because otherwise, future information could become available in the training of the predictive model)
-        TickerDf.fillna(inplace=True,method='ffill')
+        # add information ratio, i.e., expectation over root variance / std. dev. of outperformance, to dataframe
+        # (it is forward filled, because otherwise, future information could become available in the training of the predictive model)
+        TickerDf[IRLabel] = RollingInformationRatio(Alphas.to_numpy(), Window)
 
         return TickerDf
 
@@ -159,7 +187,8 @@ class InformationRatio():
                     TickerDf = None, 
                     ReturnsLabel = None, 
                     RiskFreeRate = 0.01, 
-                    Window = 50):
+                    Window = 50,
+                    PeriodsPerYear = 365):
         """
         Compute/add Sharpe ratio to a pandas dataframe
 
@@ -169,7 +198,7 @@ class InformationRatio():
         ReturnsLabel: str, column label of column with returns
         RiskFreeRate: float, assumed risk-free return
         Window: int, number of steps to consider in the computation of the Sharpe ratio
-
+        PeriodsPerYear: int or float, number of time steps per year of the date grid
 
         Returns:
         ----
@@ -178,14 +207,18 @@ class InformationRatio():
 
         """        
 
-        # compute risk-free rate over sought window
-        RiskFreeRateWindow = RiskFreeRate * ( 365 / Window )
-
         # assemble label of column
         SR_Label = ReturnsLabel.replace('_R_','_SR_')
 
-        # assign Sharpe ratio to column
-        TickerDf[SR_Label] = TickerDf[ReturnsLabel].rolling(Window).apply(lambda x: (x.mean() - RiskFreeRateWindow) / x.std(), raw = True)
+        # assign Sharpe ratio to column (vectorized rolling mean/std, instead of a python call for every window);
+        # the label of the returns identifies ticker, field, window and log flag, so e.g. the benchmark's Sharpe
+        # ratios are computed once for all funds
+        SharpeRatios = self.Cache.Get(('SharpeRatios', ReturnsLabel, Window, RiskFreeRate, PeriodsPerYear, len(TickerDf)),
+                                      lambda: RollingSharpeRatio(TickerDf[ReturnsLabel].to_numpy(dtype = float),
+                                                                 Window = Window,
+                                                                 RiskFreeRate = RiskFreeRate,
+                                                                 PeriodsPerYear = PeriodsPerYear))
+        TickerDf[SR_Label] = SharpeRatios.copy()
 
         return SR_Label
 
@@ -220,6 +253,7 @@ class InformationRatio():
             return
 
         # attach '_Close' to ColumnLabel
+        Ticker = ColumnLabel
         ColumnLabel += '_Close'
 
         # assign label for returns
@@ -230,16 +264,14 @@ class InformationRatio():
 
         # catch if these returns were already added to the dataframe
         if RLabel in TickerDf.columns:
-            print('The returns required are already in the dataframe')
             return RLabel
 
-        # assign (log-)returns to column
-        if Log:
-            TickerDf[RLabel] = np.log( (TickerDf[ColumnLabel] - TickerDf[ColumnLabel].shift(Window))/TickerDf[ColumnLabel] )
-        else:
-            TickerDf[RLabel] = (TickerDf[ColumnLabel] - TickerDf[ColumnLabel].shift(Window))/TickerDf[ColumnLabel] 
-
-        # first window value will be nan, so we have to fill it
-        TickerDf[RLabel].fillna(0.0, inplace = True)
+        # assign (log-)returns to column (from the cache, e.g., the benchmark's are computed once for all funds;
+        # the first window values are undefined and set to 0.0)
+        TickerDf[RLabel] = self.Cache.Returns(TickerDf[ColumnLabel].to_numpy(dtype = float),
+                                              Ticker,
+                                              Window,
+                                              Field = 'Close',
+                                              Log = Log).copy()
 
         return RLabel
\ No newline at end of file
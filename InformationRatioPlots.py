@@ -0,0 +1,298 @@
+import hashlib
+import json
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from Instrumentation import DisabledProfiler
+
+# version of the plot layout, part of the hashes: change it to render all figures again after changing the layout
+PlotVersion = '1'
+
+class InformationRatioPlots():
+    """
+    Synopsis: Class that renders the plots of the information ratios (IRs) as .png images.
+    ---------
+
+    For every fund, four figures are rendered (bare/risk-adjusted IRs as histogram and line plot), optionally
+    replaced or complemented by summary figures with small multiples of many funds. The figures are rendered in a
+    process pool with the non-interactive 'Agg' backend, and figures whose input data did not change since the last
+    run (same hash as stored in <PlotDirectory>/PlotHashes.json) are skipped.
+
+    Properties:
+    -----------
+    self.PlotDirectory: str, directory the .png files are written to
+    self.Rendered: list of str, file names of the figures rendered in this run
+    self.Skipped: list of str, file names of the figures skipped, because their data did not change
+
+    Methods:
+    --------
+    __init__: assembles the figures from a dataframe with IR columns and renders the ones that changed
+    FundPlots: method to assemble the four figures of a fund
+    SummaryPlots: method to assemble the summary figures (small multiples of FundsPerPage funds each)
+    Render: method to render a list of figures in a process pool, skipping unchanged ones
+    """
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 AllData = None,
+                 SymbolList = ['GADGX','^DJI'],
+                 BenchmarkLabel = '^DJI',
+                 Window = 50,
+                 PlotDirectory = 'plots',
+                 IndividualPlots = True,
+                 SummaryPlots = False,
+                 FundsPerPage = 36,
+                 MaxWorkers = None,
+                 UseCache = True,
+                 Profiler = None):
+        """
+        Synopsis: Render the plots of the IRs of all funds in SymbolList.
+        ---------
+
+        Parameters:
+        -----------
+        AllData: pandas dataframe with a 'Date' column and the IR columns <Symbol>_<BenchmarkLabel>_<IR|IRA>_<Window>
+        SymbolList: list of str, ticker symbols of the funds (the benchmark, if contained, is skipped)
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Window: int, window of the IRs to plot
+        PlotDirectory: str, directory the .png files are written to
+        IndividualPlots: boolean, toggle to render the four figures of every fund
+        SummaryPlots: boolean, toggle to render summary figures with small multiples of FundsPerPage funds each
+        FundsPerPage: int, number of funds per summary figure
+        MaxWorkers: int, number of processes rendering figures (defaults to the number of processors)
+        UseCache: boolean, toggle to skip figures whose data did not change since the last run
+        Profiler: Instrumentation.Profiler instance to record the stages 'plots_assemble' and 'plots_render' (no recording by default)
+
+        Returns:
+        --------
+        <files>: .png images in PlotDirectory and the hashes of their data in PlotDirectory/PlotHashes.json
+        """
+
+        self.PlotDirectory = PlotDirectory
+
+        # if the output directory does not exist, create it
+        if not os.path.exists(PlotDirectory):
+            os.makedirs(PlotDirectory)
+
+        Funds = [j for j in SymbolList if j != BenchmarkLabel]
+
+        if Profiler is None:
+            Profiler = DisabledProfiler
+
+        with Profiler.Stage('plots_assemble') as Stage:
+            Plots = []
+            if IndividualPlots:
+                for ThisFund in Funds:
+                    Plots += self.FundPlots(AllData, ThisFund, BenchmarkLabel, Window)
+            if SummaryPlots:
+                Plots += self.SummaryPlots(AllData, Funds, BenchmarkLabel, Window, FundsPerPage)
+            Stage.Shape(Plots)
+
+        # the figures are rendered in other processes: the CPU time and memory of this stage are the ones of this process
+        with Profiler.Stage('plots_render') as Stage:
+            self.Render(Plots, MaxWorkers = MaxWorkers, UseCache = UseCache)
+            Stage.Shape(self.Rendered)
+
+        return
+
+###########################################
+###########################################
+
+    def FundPlots(self, AllData, Fund, BenchmarkLabel, Window):
+        """
+        Synopsis: Assemble the figures of a fund: bare and risk-adjusted IRs, each as histogram and line plot.
+        ---------
+
+        Returns:
+        --------
+        Plots: list of dict, description and data of every figure (see RenderPlot)
+        """
+
+        Plots = []
+        for IRLabel, Name, Description in [('IR', 'bare', 'bare returns'), ('IRA', 'adjusted', 'adjusted returns')]:
+
+            # assemble column label
+            ColumnLabel = Fund + "_" + BenchmarkLabel + "_" + IRLabel + "_" + str(Window)
+            Title = "Information ratio for " + Fund + " vs " + BenchmarkLabel
+            FileName = os.path.join(self.PlotDirectory, 'IR_' + Name + '_' + Fund + "_vs_" + BenchmarkLabel)
+
+            Plots.append({'Kind': 'hist',
+                          'FileName': FileName + "_hist.png",
+                          'Title': Title,
+                          'XLabel': "IR, " + Description,
+                          'Label': ColumnLabel,
+                          'Values': AllData[ColumnLabel].to_numpy(dtype = float)})
+
+            Plots.append({'Kind': 'line',
+                          'FileName': FileName + ".png",
+                          'Title': Title,
+                          'XLabel': "Date",
+                          'YLabel': "IR, " + Description,
+                          'Label': ColumnLabel,
+                          'Dates': AllData['Date'].to_numpy(),
+                          'Values': AllData[ColumnLabel].to_numpy(dtype = float)})
+
+        return Plots
+
+###########################################
+###########################################
+
+    def SummaryPlots(self, AllData, Funds, BenchmarkLabel, Window, FundsPerPage = 36):
+        """
+        Synopsis: Assemble summary figures with one small line plot (bare and risk-adjusted IRs) per fund.
+        ---------
+
+        Returns:
+        --------
+        Plots: list of dict, one per page of FundsPerPage funds (file names IR_summary_vs_<BenchmarkLabel>_<page>.png)
+        """
+
+        Plots = []
+        for Page, First in enumerate(range(0, len(Funds), FundsPerPage)):
+
+            PageFunds = Funds[First:First + FundsPerPage]
+
+            Plots.append({'Kind': 'summary',
+                          'FileName': os.path.join(self.PlotDirectory, 'IR_summary_vs_' + BenchmarkLabel + '_' + str(Page + 1) + '.png'),
+                          'Title': "Information ratios vs " + BenchmarkLabel + " (" + str(Window) + " days)",
+                          'Funds': PageFunds,
+                          'Dates': AllData['Date'].to_numpy(),
+                          'Values': np.stack([AllData[[j + "_" + BenchmarkLabel + "_IR_" + str(Window),
+                                                       j + "_" + BenchmarkLabel + "_IRA_" + str(Window)]].to_numpy(dtype = float)
+                                              for j in PageFunds])})
+
+        return Plots
+
+###########################################
+###########################################
+
+    def Render(self, Plots, MaxWorkers = None, UseCache = True):
+        """
+        Synopsis: Render the figures that changed since the last run in a process pool.
+        ---------
+
+        Parameters:
+        -----------
+        Plots: list of dict, description and data of the figures
+        MaxWorkers: int, number of processes (defaults to the number of processors)
+        UseCache: boolean, toggle to skip figures whose data did not change since the last run
+
+        Returns:
+        --------
+        self.Rendered / self.Skipped: lists of the file names rendered / skipped
+        <files>: the rendered .png images and the updated PlotHashes.json
+        """
+
+        HashFileName = os.path.join(self.PlotDirectory, 'PlotHashes.json')
+        Hashes = {}
+        if UseCache and os.path.exists(HashFileName):
+            with open(HashFileName) as HashFile:
+                Hashes = json.load(HashFile)
+
+        self.Rendered = []
+        self.Skipped = []
+        ToRender = []
+        for ThisPlot in Plots:
+            ThisHash = PlotHash(ThisPlot)
+            if UseCache and Hashes.get(ThisPlot['FileName']) == ThisHash and os.path.exists(ThisPlot['FileName']):
+                self.Skipped.append(ThisPlot['FileName'])
+            else:
+                ToRender.append(ThisPlot)
+                Hashes[ThisPlot['FileName']] = ThisHash
+
+        # a pool only pays off for more than one figure
+        if len(ToRender) > 1 and MaxWorkers != 1:
+            with ProcessPoolExecutor(max_workers = MaxWorkers) as Pool:
+                self.Rendered = list(Pool.map(RenderPlot, ToRender))
+        else:
+            self.Rendered = [RenderPlot(ThisPlot) for ThisPlot in ToRender]
+
+        with open(HashFileName, 'w') as HashFile:
+            json.dump(Hashes, HashFile, indent = 1, sort_keys = True)
+
+        return
+
+###########################################
+###########################################
+
+def PlotHash(Plot):
+    """
+    Synopsis: Hash of the description and data of a figure (and of the plot layout version).
+    ---------
+    """
+
+    Hash = hashlib.sha1(PlotVersion.encode())
+    for Key in sorted(Plot):
+        Hash.update(Key.encode())
+        if isinstance(Plot[Key], np.ndarray):
+            Hash.update(str(Plot[Key].dtype).encode() + str(Plot[Key].shape).encode())
+            Hash.update(np.ascontiguousarray(Plot[Key]).tobytes())
+        else:
+            Hash.update(repr(Plot[Key]).encode())
+
+    return Hash.hexdigest()
+
+###########################################
+###########################################
+
+def RenderPlot(Plot):
+    """
+    Synopsis: Render one figure to a .png file (runs in the worker processes).
+    ---------
+
+    Parameters:
+    -----------
+    Plot: dict, with the keys 'Kind' ('hist', 'line' or 'summary'), 'FileName', 'Title', 'Values' and, depending on
+          the kind, 'XLabel', 'YLabel', 'Label', 'Dates' and 'Funds'
+
+    Returns:
+    --------
+    Plot['FileName']: str, the file name of the rendered figure
+    """
+
+    # non-interactive backend, since the figures are only written to files
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    if Plot['Kind'] == 'hist':
+        # use pandas series plot method
+        ax = pd.Series(Plot['Values'], name = Plot['Label']).plot.hist(bins=12, alpha=0.5)
+        ax.set_xlabel(Plot['XLabel'])
+
+    elif Plot['Kind'] == 'line':
+        # use pandas dataframe plot method
+        ax = pd.DataFrame({'Date': Plot['Dates'], Plot['Label']: Plot['Values']}).plot(x='Date', y=Plot['Label'])
+        ax.set_ylabel(Plot['YLabel'])
+        ax.set_xlabel(Plot['XLabel'])
+
+    else:
+        # small multiples: one panel per fund with the bare and the risk-adjusted IRs
+        Columns = int(np.ceil(np.sqrt(len(Plot['Funds']))))
+        Rows = int(np.ceil(len(Plot['Funds']) / Columns))
+        Figure, Axes = plt.subplots(Rows, Columns, figsize = (3 * Columns, 2 * Rows + 0.5), sharex = True, squeeze = False, constrained_layout = True)
+        for k, ax in enumerate(Axes.flat):
+            if k >= len(Plot['Funds']):
+                ax.set_axis_off()
+                continue
+            ax.plot(Plot['Dates'], Plot['Values'][k, :, 0], linewidth = 0.8, label = 'IR')
+            ax.plot(Plot['Dates'], Plot['Values'][k, :, 1], linewidth = 0.8, label = 'IRA')
+            ax.set_title(Plot['Funds'][k], fontsize = 8)
+            # the dates are rotated per panel (Figure.autofmt_xdate adjusts the subplots, which the constrained layout does not allow)
+            ax.tick_params(labelsize = 6)
+            ax.tick_params(axis = 'x', labelrotation = 30)
+        Axes.flat[0].legend(fontsize = 6)
+        Figure.suptitle(Plot['Title'])
+
+    if Plot['Kind'] != 'summary':
+        # set title
+        ax.set_title(Plot['Title'])
+
+    # save figure to png and close it
+    plt.savefig(Plot['FileName'])
+    plt.close('all')
+
+    return Plot['FileName']
@@ -0,0 +1,309 @@
+import numpy as np
+import pandas as pd
+
+class InformationRatioRanking():
+    """
+    Synopsis: Class to rank the information ratios (IRs) of many funds cross-sectionally, i.e., on every date.
+    ---------
+
+    The ranks and percentiles of all funds on all dates are computed vectorized from one sort of the (dates x funds) IRs
+    along the funds (block of dates by block of dates); top-k / bottom-k sets use a partial sort (numpy.argpartition), so only the k selected funds of
+    every date are ordered. Point queries (fund, date) -> (IR, rank, percentile) go through a precomputed index of the
+    funds (dict) and the sorted dates (binary search), so that they take microseconds.
+
+    Funds without an IR on a date (NaN) are not ranked on that date.
+
+    Properties:
+    -----------
+    self.Values: numpy array, (dates x funds) IRs
+    self.FundLabels: list of str, ticker symbols of the funds (columns of self.Values)
+    self.Dates: numpy array, (dates,) sorted datetime64[ns] dates (rows of self.Values; None, if not given)
+    self.Label: str, description of the IRs, e.g., '^DJI_IR_92'
+    self.Ranks: numpy array, (dates x funds) rank of every fund on every date (1: highest IR; tied funds share the
+                best rank; NaN without IR)
+    self.Percentiles: numpy array, (dates x funds) percentile rank in (0, 1] (fraction of the funds with a lower or the
+                      same IR, ties averaged as in pandas' rank(pct = True); 1: highest IR; NaN without IR)
+    self.Counts: numpy array, (dates,) number of ranked funds of every date
+    self.FundIndex: dict of str -> int, column of every fund
+
+    Methods:
+    --------
+    __init__: compute the ranks and percentiles of all dates
+    FromDataFrame: alternative constructor that takes the IR columns <Fund>_<BenchmarkLabel>_<IR_label>_<Window> of a dataframe
+    FromBatch: alternative constructor that takes the IRs of a BatchInformationRatio
+    RankRows: method to rank the IRs of every row of an array
+    TopK: method to select the k funds with the highest (or lowest) IRs on every date
+    Screen: method to list the k best (or worst) funds of one date as a dataframe
+    Query: method to look up IR, rank and percentile of a fund on a date
+    Row: method to find the row of a date (the last date up to it, as the IRs are forward filled)
+    """
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 Values = None,
+                 FundLabels = None,
+                 Dates = None,
+                 Label = 'IR',
+                 ChunkSize = 1024):
+        """
+        Synopsis: Compute the ranks and percentiles of the IRs of all funds on all dates.
+        ---------
+
+        Parameters:
+        -----------
+        Values: array-like, (dates x funds) IRs
+        FundLabels: list of str, ticker symbols of the columns of Values
+        Dates: array-like, (dates,) sorted dates of the rows of Values
+        Label: str, description of the IRs
+        ChunkSize: int, number of dates ranked at once (bounds the memory of the temporary arrays)
+
+        Returns:
+        --------
+        Nothing, but initializes self.Ranks, self.Percentiles, self.Counts and the indices of funds and dates
+        """
+
+        self.Values = np.asarray(Values, dtype = float)
+        NumberOfFunds = self.Values.shape[1]
+        self.FundLabels = list(FundLabels) if FundLabels is not None else [str(j) for j in range(NumberOfFunds)]
+        self.Dates = np.asarray(pd.DatetimeIndex(Dates).values, dtype = 'datetime64[ns]') if Dates is not None else None
+        self.Label = Label
+        self.FundIndex = {j: k for k, j in enumerate(self.FundLabels)}
+
+        self.Counts = (~np.isnan(self.Values)).sum(axis = 1)
+        self.Ranks = np.empty(self.Values.shape)
+        self.Percentiles = np.empty(self.Values.shape)
+        for First in range(0, self.Values.shape[0], ChunkSize):
+            Rows = slice(First, First + ChunkSize)
+            self.Ranks[Rows], self.Percentiles[Rows] = self.RankRows(self.Values[Rows])
+
+        return
+
+###########################################
+###########################################
+
+    def RankRows(self, Values):
+        """
+        Synopsis: Rank the IRs of every row (date) of Values with one sort along the funds.
+        ---------
+
+        Parameters:
+        -----------
+        Values: numpy array, (dates x funds) IRs
+
+        Returns:
+        --------
+        Ranks / Percentiles: numpy arrays, (dates x funds) descending ranks and percentile ranks (see the class properties)
+        """
+
+        NumberOfFunds = Values.shape[1]
+        Valid = ~np.isnan(Values)
+
+        # one sort along the funds (NaN last); tied IRs form runs in the sorted rows
+        Order = np.argsort(Values, axis = 1, kind = 'stable')
+        Sorted = np.take_along_axis(Values, Order, axis = 1)
+        Positions = np.arange(NumberOfFunds)
+        RunStarts = np.ones(Sorted.shape, dtype = bool)
+        RunStarts[:, 1:] = Sorted[:, 1:] != Sorted[:, :-1]
+        RunEnds = np.ones(Sorted.shape, dtype = bool)
+        RunEnds[:, :-1] = RunStarts[:, 1:]
+
+        # first and last sorted position of the run of every value
+        First = np.maximum.accumulate(np.where(RunStarts, Positions, 0), axis = 1)
+        Last = np.minimum.accumulate(np.where(RunEnds, Positions, NumberOfFunds)[:, ::-1], axis = 1)[:, ::-1]
+
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            Counts = Valid.sum(axis = 1, keepdims = True).astype(float)
+            # descending rank: 1 + number of funds with a higher IR
+            Ranks = np.empty(Values.shape)
+            np.put_along_axis(Ranks, Order, Counts - Last, axis = 1)
+            # ascending average rank over the number of ranked funds
+            Percentiles = np.empty(Values.shape)
+            np.put_along_axis(Percentiles, Order, ((First + Last) / 2 + 1) / Counts, axis = 1)
+
+        Ranks[~Valid] = np.nan
+        Percentiles[~Valid] = np.nan
+
+        return Ranks, Percentiles
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromDataFrame(cls,
+                      Df = None,
+                      BenchmarkLabel = '^DJI',
+                      Window = 50,
+                      RiskAdjusted = False):
+        """
+        Synopsis: Rank the IR columns <Fund>_<BenchmarkLabel>_<IR_label>_<Window> of a dataframe (e.g., InformationRatio.AllData).
+        ---------
+
+        Parameters:
+        -----------
+        Df: pandas dataframe with the IR columns (and a 'Date' column, or dates as index)
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Window: int, window of the IRs
+        RiskAdjusted: boolean, toggle to rank the risk-adjusted (IR_label=='IRA') instead of the bare (IR_label=='IR') IRs
+
+        Returns:
+        --------
+        InformationRatioRanking instance
+        """
+
+        Suffix = '_' + BenchmarkLabel + ('_IRA_' if RiskAdjusted else '_IR_') + str(Window)
+        Columns = [j for j in Df.columns if isinstance(j, str) and j.endswith(Suffix)]
+        if len(Columns) == 0:
+            raise ValueError('no columns labeled <Fund>' + Suffix + ' in the dataframe')
+
+        return cls(Values = Df[Columns].to_numpy(dtype = float),
+                   FundLabels = [j[:-len(Suffix)] for j in Columns],
+                   Dates = Df['Date'] if 'Date' in Df.columns else Df.index,
+                   Label = Suffix[1:])
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromBatch(cls, Batch = None, Dates = None, RiskAdjusted = False, Window = None):
+        """
+        Synopsis: Rank the IRs of a BatchInformationRatio (or of one group of a MultiBenchmarkInformationRatio).
+        ---------
+
+        Parameters:
+        -----------
+        Batch: BatchInformationRatio instance
+        Dates: array-like, (dates,) dates of the rows of the IRs
+        RiskAdjusted: boolean, toggle to rank the risk-adjusted instead of the bare IRs
+        Window: int, window of the IRs, if the batch holds several windows (defaults to the first)
+
+        Returns:
+        --------
+        InformationRatioRanking instance
+        """
+
+        Values = Batch.IRA if RiskAdjusted else Batch.IR
+        Window = Batch.Windows[0] if Window is None else Window
+        if np.ndim(Batch.Window) != 0:
+            Values = Values[Batch.Windows.index(Window)]
+
+        return cls(Values = Values,
+                   FundLabels = Batch.FundLabels,
+                   Dates = Dates,
+                   Label = Batch.BenchmarkLabel + ('_IRA_' if RiskAdjusted else '_IR_') + str(Window))
+
+###########################################
+###########################################
+
+    def TopK(self, K = 10, Bottom = False, Rows = None):
+        """
+        Synopsis: Select the K funds with the highest (or lowest) IRs on every date, with a partial sort.
+        ---------
+
+        Parameters:
+        -----------
+        K: int, number of funds per date
+        Bottom: boolean, toggle to select the lowest instead of the highest IRs
+        Rows: slice or array of int, rows (dates) to evaluate (defaults to all)
+
+        Returns:
+        --------
+        Funds: numpy array, (dates x K) columns of the selected funds, best first (worst first for Bottom); -1 where a
+               date has fewer than K ranked funds
+        Values: numpy array, (dates x K) IRs of the selected funds (NaN where Funds is -1)
+        """
+
+        Values = self.Values if Rows is None else self.Values[Rows]
+        K = min(K, Values.shape[1])
+
+        # sort keys: the selected funds come first; funds without IR keep NaN as key, which numpy orders after any
+        # number (also after an IR of -inf / +inf), so they come last
+        Keys = Values if Bottom else -Values
+
+        Selected = np.argpartition(Keys, K - 1, axis = 1)[:, :K] if K < Values.shape[1] else np.tile(np.arange(K), (Values.shape[0], 1))
+        # order the K selected funds of every date
+        SelectedKeys = np.take_along_axis(Keys, Selected, axis = 1)
+        Selected = np.take_along_axis(Selected, np.argsort(SelectedKeys, axis = 1, kind = 'stable'), axis = 1)
+
+        SelectedValues = np.take_along_axis(Values, Selected, axis = 1)
+        Missing = np.isnan(SelectedValues)
+        Selected[Missing] = -1
+
+        return Selected, SelectedValues
+
+###########################################
+###########################################
+
+    def Screen(self, Date = None, K = 10, Bottom = False):
+        """
+        Synopsis: List the K best (or worst) funds of a date with their IRs, ranks and percentiles.
+        ---------
+
+        Parameters:
+        -----------
+        Date: str or datetime variable, date of the screen (the last date up to it; the row number, without dates)
+        K: int, number of funds
+        Bottom: boolean, toggle to list the worst instead of the best funds
+
+        Returns:
+        --------
+        ScreenDf: pandas dataframe with the columns 'Fund', 'IR', 'Rank' and 'Percentile', best first (worst first for Bottom)
+        """
+
+        Row = self.Row(Date)
+        Funds, Values = self.TopK(K = K, Bottom = Bottom, Rows = slice(Row, Row + 1))
+        Funds = Funds[0][Funds[0] >= 0]
+
+        return pd.DataFrame({'Fund': [self.FundLabels[j] for j in Funds],
+                             'IR': self.Values[Row, Funds],
+                             'Rank': self.Ranks[Row, Funds],
+                             'Percentile': self.Percentiles[Row, Funds]})
+
+###########################################
+###########################################
+
+    def Query(self, Fund = None, Date = None):
+        """
+        Synopsis: Look up the IR, rank and percentile of a fund on a date.
+        ---------
+
+        Parameters:
+        -----------
+        Fund: str, ticker symbol of the fund
+        Date: str or datetime variable, date (the last date up to it; the row number, without dates)
+
+        Returns:
+        --------
+        (IR, Rank, Percentile): tuple of float (NaN, if the fund has no IR on the date)
+        """
+
+        Row, Column = self.Row(Date), self.FundIndex[Fund]
+
+        return float(self.Values[Row, Column]), float(self.Ranks[Row, Column]), float(self.Percentiles[Row, Column])
+
+###########################################
+###########################################
+
+    def Row(self, Date = None):
+        """
+        Synopsis: Find the row of a date, i.e., of the last date up to it (the IRs are forward filled).
+        ---------
+
+        Parameters:
+        -----------
+        Date: str or datetime variable (int row number, if the ranking has no dates)
+
+        Returns:
+        --------
+        Row: int, row of self.Values
+        """
+
+        if self.Dates is None:
+            return int(Date)
+
+        Row = int(np.searchsorted(self.Dates, pd.Timestamp(Date).to_datetime64(), side = 'right')) - 1
+        if Row < 0:
+            raise KeyError('no IRs up to ' + str(Date))
+
+        return Row
@@ -6,6 +6,19 @@ SymbolList = ['0P00000UWV.F',   # pension
             '^DJI' ]            # Dow Jones (benchmark)]
 
 BenchmarkLabel = '^DJI'         # specify label of the benchmark
+BenchmarkMap = None             # benchmark(s) of every fund, e.g., {'GADGX': ['^DJI', '^GSPC'], 'ESP0.DE': '^GDAXI'} (None: all funds vs BenchmarkLabel)
 RiskFreeRate = 0.01             # return rate of risk free investment
 StartDate = '2017-01-01'
 Window = 92                    # number of days for which to evaluate the information ratios
+Calendar = 'daily'              # date grid: 'daily' (calendar days), 'business' (Monday to Friday, i.e., Window counts trading days) or 'observed' (dates with data of any ticker)
+ReportingFrequencies = None     # resampling of irregularly reporting funds, e.g., {'0P00000UWV.F': 'W-FRI'} (last value of every week)
+Offline = False                 # build the data from the local cache in 'fund_details/' alone (no download)
+IndividualPlots = True          # plot histogram and line plot of the bare and risk-adjusted IRs of every fund
+SummaryPlots = False            # plot summary figures with the IRs of many funds each (small multiples)
+Lean = False                    # keep only the dates and the IRs (and load only the close prices), to save memory for large universes
+DType = None                    # data type of prices and IRs (None: float64; 'float32' halves their memory, at 7 significant digits)
+MaxWorkers = 1                  # processes the funds are sharded across to compute the IRs (None: one per processor; identical results)
+Profile = False                 # record time, memory and result shapes of every stage of the run
+RunReport = 'run_report.json'   # file of the run report, if Profile is True (.json or .csv)
+Stages = ['fetch', 'compute', 'plot']   # stages run by FundsInformationRatioAnalysis.py without stages on the command line (fetch, compute, plot, export)
+ExportFile = 'information_ratios.csv'  # file of the export stage (.csv, or a FeatureStore directory for a name without extension)
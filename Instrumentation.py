@@ -0,0 +1,281 @@
+"""
+Synopsis:
+---------
+Instrumentation of the pipeline stages (fetch, merge, returns, Sharpe ratios, IRs, plots).
+
+A Profiler records, for every stage (and, where applicable, every ticker), the wall time, the CPU time, the peak of
+the memory allocated during the stage (traced with tracemalloc) and the number of rows/columns of its result. The
+records are passed to any number of hooks (callables taking the record) as soon as a stage ends, and can be written
+as a .json or .csv run report at the end.
+
+A disabled profiler hands out one shared no-op stage, so instrumented code runs at (almost) no extra cost; the classes
+of the pipeline use such a profiler unless one is passed to them.
+
+Example:
+    Profiler = Profiler(Hooks = [print])
+    with Profiler.Stage('merge') as Stage:
+        AllData = MergeDfs(ListOfDfs)
+        Stage.Shape(AllData)
+    Profiler.WriteReport('run_report.json')
+"""
+
+import json
+import threading
+import time
+import tracemalloc
+import pandas as pd
+
+###########################################
+###########################################
+
+class Profiler():
+    """
+    Synopsis: Class that records wall time, CPU time, peak memory and result shapes of the stages of a run.
+    ---------
+
+    Properties:
+    -----------
+    self.Enabled: boolean, toggle to record stages (a disabled profiler records nothing)
+    self.TraceMemory: boolean, toggle to trace the peak memory of the stages (tracing slows allocations down)
+    self.Hooks: list of callables, each called with the record of every stage that ends
+    self.Records: list of dict, one record per stage with the keys 'Stage', 'Ticker', 'Start' (s since the profiler
+                  was created), 'WallTime', 'CPUTime' (s), 'PeakMemoryMB', 'Rows', 'Columns', 'ResultMB' (size of the
+                  result) and 'Thread'
+
+    Methods:
+    --------
+    __init__: set up the profiler
+    Stage: method returning a context manager that records one stage
+    AddHook: method to add a hook
+    Summary: method to aggregate the records per stage
+    WriteReport: method to write the records as .json or .csv run report
+    """
+
+###########################################
+###########################################
+
+    def __init__(self, Enabled = True, TraceMemory = True, Hooks = None):
+        """
+        Synopsis: Set up the profiler.
+        ---------
+
+        Parameters:
+        -----------
+        Enabled: boolean, toggle to record stages
+        TraceMemory: boolean, toggle to trace the peak memory of the stages (only for stages of the main thread)
+        Hooks: list of callables, each called with the record (dict) of every stage that ends
+
+        Returns:
+        --------
+        Nothing, but initializes the empty list self.Records
+        """
+
+        self.Enabled = Enabled
+        self.TraceMemory = TraceMemory
+        self.Hooks = list(Hooks) if Hooks is not None else []
+        self.Records = []
+        self.StartTime = time.perf_counter()
+        # open stages of the main thread, the innermost last (for the peak memory of nested stages)
+        self.OpenStages = []
+
+        return
+
+###########################################
+###########################################
+
+    def Stage(self, Name, Ticker = None):
+        """
+        Synopsis: Return a context manager that records the stage Name (of the ticker Ticker).
+        ---------
+
+        Parameters:
+        -----------
+        Name: str, name of the stage (e.g., 'fetch', 'merge', 'returns')
+        Ticker: str, ticker symbol, for stages run per ticker
+
+        Returns:
+        --------
+        Stage instance (a shared no-op stage, if the profiler is disabled); its method Shape(Object) records the
+        number of rows/columns of the result of the stage
+        """
+
+        if not self.Enabled:
+            return NullStage
+
+        return Stage(self, Name, Ticker)
+
+###########################################
+###########################################
+
+    def AddHook(self, Hook):
+        """
+        Synopsis: Add a hook, called with the record (dict) of every stage that ends.
+        ---------
+        """
+
+        self.Hooks.append(Hook)
+
+        return
+
+###########################################
+###########################################
+
+    def Summary(self):
+        """
+        Synopsis: Aggregate the records per stage.
+        ---------
+
+        Returns:
+        --------
+        SummaryDf: pandas dataframe indexed by stage with the number of records ('Calls'), the total wall and CPU time,
+                   the maximal peak memory and the total size of the results, in the order the stages started
+        """
+
+        if len(self.Records) == 0:
+            return pd.DataFrame(columns = ['Calls', 'WallTime', 'CPUTime', 'PeakMemoryMB', 'ResultMB'])
+
+        RecordsDf = pd.DataFrame(self.Records)
+
+        return RecordsDf.groupby('Stage', sort = False).agg(Calls = ('WallTime', 'size'),
+                                                            WallTime = ('WallTime', 'sum'),
+                                                            CPUTime = ('CPUTime', 'sum'),
+                                                            PeakMemoryMB = ('PeakMemoryMB', 'max'),
+                                                            ResultMB = ('ResultMB', lambda Sizes: Sizes.sum(min_count = 1)))
+
+###########################################
+###########################################
+
+    def WriteReport(self, FileName = 'run_report.json'):
+        """
+        Synopsis: Write the records as run report.
+        ---------
+
+        Parameters:
+        -----------
+        FileName: str, name of the report; a .csv file gets one line per record, any other file the records and the
+                  summary per stage as .json
+
+        Returns:
+        --------
+        <file>: the run report
+        """
+
+        if FileName.endswith('.csv'):
+            pd.DataFrame(self.Records).to_csv(FileName, index = False)
+            return
+
+        Summary = self.Summary()
+        with open(FileName, 'w') as ReportFile:
+            json.dump({'Stages': self.Records,
+                       'Summary': {Name: {Key: (None if pd.isna(Value) else float(Value)) for Key, Value in Row.items()}
+                                   for Name, Row in Summary.iterrows()}},
+                      ReportFile, indent = 1)
+
+        return
+
+###########################################
+###########################################
+
+class Stage():
+    """
+    Synopsis: Context manager that records one stage for a Profiler (see Profiler.Stage).
+    ---------
+    """
+
+    def __init__(self, Profiler, Name, Ticker = None):
+
+        self.Profiler = Profiler
+        self.Record = {'Stage': Name, 'Ticker': Ticker, 'Rows': None, 'Columns': None, 'ResultMB': None}
+
+        return
+
+    def Shape(self, Object):
+        """
+        Synopsis: Record the number of rows/columns and the size of Object (a dataframe or an array; for a list, its length).
+        ---------
+        """
+
+        Shape = getattr(Object, 'shape', (len(Object),) if isinstance(Object, (list, tuple)) else ())
+        self.Record['Rows'] = int(Shape[0]) if len(Shape) > 0 else None
+        self.Record['Columns'] = int(Shape[1]) if len(Shape) > 1 else None
+
+        if isinstance(Object, pd.DataFrame):
+            self.Record['ResultMB'] = float(Object.memory_usage(index = True).sum()) / 2**20
+        elif hasattr(Object, 'nbytes'):
+            self.Record['ResultMB'] = float(Object.nbytes) / 2**20
+
+        return
+
+    def __enter__(self):
+
+        # the CPU time of the process includes the worker threads of a stage, but stages run in a worker thread only
+        # count their own; likewise, the memory is only traced on the main thread (tracemalloc is process-wide)
+        self.MainThread = threading.current_thread() is threading.main_thread()
+        self.CPUClock = time.process_time if self.MainThread else time.thread_time
+        self.TraceMemory = self.Profiler.TraceMemory and self.MainThread
+
+        if self.TraceMemory:
+            self.StartedTracing = not tracemalloc.is_tracing()
+            if self.StartedTracing:
+                tracemalloc.start()
+            # the peak is reset for every stage, so the peak of an enclosing stage is kept in its PeakMemory
+            self.StartMemory = tracemalloc.get_traced_memory()[0]
+            if len(self.Profiler.OpenStages) > 0:
+                Parent = self.Profiler.OpenStages[-1]
+                Parent.PeakMemory = max(Parent.PeakMemory, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            self.PeakMemory = 0
+            self.Profiler.OpenStages.append(self)
+
+        self.Record['Start'] = time.perf_counter() - self.Profiler.StartTime
+        self.StartWallTime = time.perf_counter()
+        self.StartCPUTime = self.CPUClock()
+
+        return self
+
+    def __exit__(self, *Exception):
+
+        self.Record['WallTime'] = time.perf_counter() - self.StartWallTime
+        self.Record['CPUTime'] = self.CPUClock() - self.StartCPUTime
+        self.Record['PeakMemoryMB'] = None
+        self.Record['Thread'] = threading.current_thread().name
+
+        if self.TraceMemory:
+            self.PeakMemory = max(self.PeakMemory, tracemalloc.get_traced_memory()[1])
+            self.Record['PeakMemoryMB'] = (self.PeakMemory - self.StartMemory) / 2**20
+            self.Profiler.OpenStages.pop()
+            if len(self.Profiler.OpenStages) > 0:
+                Parent = self.Profiler.OpenStages[-1]
+                Parent.PeakMemory = max(Parent.PeakMemory, self.PeakMemory)
+            if self.StartedTracing:
+                tracemalloc.stop()
+
+        self.Profiler.Records.append(self.Record)
+        for Hook in self.Profiler.Hooks:
+            Hook(self.Record)
+
+        # exceptions of the stage are not suppressed
+        return False
+
+###########################################
+###########################################
+
+class DisabledStage():
+    """
+    Synopsis: No-op stage handed out by disabled profilers.
+    ---------
+    """
+
+    def Shape(self, Object):
+        return
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *Exception):
+        return False
+
+NullStage = DisabledStage()
+
+# profiler used by the classes of the pipeline, unless one is passed to them
+DisabledProfiler = Profiler(Enabled = False)
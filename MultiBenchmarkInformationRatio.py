@@ -0,0 +1,272 @@
+import numpy as np
+import pandas as pd
+from RollingStatistics import WindowReturns, RollingSharpeRatio
+from BatchInformationRatio import BatchInformationRatio
+from ParallelInformationRatio import ParallelInformationRatio
+from Instrumentation import DisabledProfiler
+from SeriesCache import SeriesCache
+
+class MultiBenchmarkInformationRatio():
+    """
+    Synopsis: Class to compute the information ratios (IRs) of many funds, each against one or several benchmarks.
+    ---------
+
+    A fund->benchmark mapping assigns every fund its benchmark(s), e.g.,
+        {'GADGX': '^DJI', 'MCSMX': ['^DJI', '^N225'], 'ESP0.DE': '^GDAXI'}
+    The funds are grouped by benchmark. The returns and Sharpe ratios of all funds are computed once as a single
+    (dates x funds) panel, the ones of every distinct benchmark once (through a SeriesCache), and the IRs of each group
+    as one vectorized block (a BatchInformationRatio on the columns of the group). Thus, the cost of the returns and
+    Sharpe ratios grows with the number of funds and benchmarks, not with the number of fund/benchmark pairs.
+
+    With several workers, the funds of every group are split into shards computed by a pool of processes over shared
+    memory (see ParallelInformationRatio); the results are identical to the serial ones.
+
+    Properties:
+    -----------
+    self.FundLabels: list of str, ticker symbols of the funds (columns of the panels)
+    self.BenchmarkLabels: list of str, ticker symbols of the distinct benchmarks
+    self.Groups: dict of str -> list of str, the funds of every benchmark (in the order of self.FundLabels)
+    self.Batches: dict of str -> BatchInformationRatio instance, the IRs of the funds of every benchmark
+                  (self.Batches[Benchmark].IR / .IRA are (dates x funds of the group) arrays)
+    self.Returns / self.SharpeRatios: numpy arrays, (dates x funds) returns and Sharpe ratios of all funds (None, if the
+                                      intermediates are not kept or the groups are computed by several workers)
+
+    Methods:
+    --------
+    __init__: computes all of the above from the close prices
+    FromDataFrame: alternative constructor that reads the close prices from a dataframe with <Symbol>_Close columns
+    GroupByBenchmark: method to group the funds of a mapping by benchmark
+    ToDataFrame: method to assemble the results as columns labeled like the ones of the class InformationRatio
+    """
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 Prices = None,
+                 BenchmarkPrices = None,
+                 FundLabels = None,
+                 BenchmarkLabels = None,
+                 BenchmarkMap = None,
+                 Window = 50,
+                 RiskFreeRate = 0.01,
+                 PeriodsPerYear = 365,
+                 Intermediates = True,
+                 DType = None,
+                 Cache = None,
+                 MaxWorkers = 1,
+                 Profiler = None):
+        """
+        Synopsis: Compute the returns and Sharpe ratios of all funds and benchmarks once, and the IRs group by group.
+        ---------
+
+        Parameters:
+        -----------
+        Prices: array-like, (dates x funds) close prices of the funds (forward filled onto a common date grid)
+        BenchmarkPrices: array-like, (dates x benchmarks) close prices of the benchmarks on the same date grid
+        FundLabels: list of str, ticker symbols of the columns of Prices
+        BenchmarkLabels: list of str, ticker symbols of the columns of BenchmarkPrices
+        BenchmarkMap: dict of str -> str or list of str, benchmark(s) of every fund (defaults to all funds against the
+                      first benchmark)
+        Window: int or list of int, number of time steps to use to evaluate the information ratio
+        RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+        PeriodsPerYear / Intermediates / DType: see BatchInformationRatio
+        Cache: SeriesCache instance for the series of the benchmarks (a new cache by default)
+        MaxWorkers: int, number of processes computing the funds' series and IRs (1: serial, None: number of processors)
+        Profiler: Instrumentation.Profiler instance to record the stages 'returns', 'sharpe' and 'ir' (one per group;
+                  'ir_parallel' with several workers)
+
+        Returns:
+        --------
+        Nothing, but initializes self.Groups and self.Batches
+        """
+
+        Prices = np.asarray(Prices, dtype = float)
+        if Prices.ndim == 1:
+            Prices = Prices[:, np.newaxis]
+        BenchmarkPrices = np.asarray(BenchmarkPrices, dtype = float)
+        if BenchmarkPrices.ndim == 1:
+            BenchmarkPrices = BenchmarkPrices[:, np.newaxis]
+
+        self.FundLabels = list(FundLabels)
+        self.BenchmarkLabels = list(BenchmarkLabels)
+        self.Window = Window
+
+        if BenchmarkMap is None:
+            BenchmarkMap = {j: self.BenchmarkLabels[0] for j in self.FundLabels}
+        self.Groups = self.GroupByBenchmark(BenchmarkMap, self.FundLabels, self.BenchmarkLabels)
+
+        if Profiler is None:
+            Profiler = DisabledProfiler
+        if Cache is None:
+            Cache = SeriesCache()
+
+        # returns and Sharpe ratios of every fund and every benchmark, computed once (the funds' ones in the workers,
+        # if there are several)
+        Serial = MaxWorkers == 1
+        with Profiler.Stage('returns') as Stage:
+            Returns = WindowReturns(Prices, Window) if Serial else None
+            BenchmarkReturns = {j: Cache.Returns(BenchmarkPrices[:, k], j, Window) for k, j in enumerate(self.BenchmarkLabels) if j in self.Groups}
+            Stage.Shape(Returns)
+
+        with Profiler.Stage('sharpe') as Stage:
+            SharpeRatios = RollingSharpeRatio(Returns, Window, RiskFreeRate, PeriodsPerYear) if Serial else None
+            BenchmarkSharpeRatios = {j: Cache.SharpeRatios(BenchmarkPrices[:, k], j, Window, RiskFreeRate, PeriodsPerYear = PeriodsPerYear) for k, j in enumerate(self.BenchmarkLabels) if j in self.Groups}
+            Stage.Shape(SharpeRatios)
+
+        # the IRs of every group as one block; adjacent funds are a view on the panels, others a copy of their columns
+        self.Batches = {}
+        for Benchmark, Funds in self.Groups.items():
+
+            Positions = [self.FundLabels.index(j) for j in Funds]
+            if Positions == list(range(Positions[0], Positions[0] + len(Positions))):
+                Columns = slice(Positions[0], Positions[0] + len(Positions))
+            else:
+                Columns = Positions
+
+            if not Serial:
+                self.Batches[Benchmark] = ParallelInformationRatio(Prices = Prices[:, Columns],
+                                                                   BenchmarkReturns = BenchmarkReturns[Benchmark],
+                                                                   BenchmarkSharpeRatios = BenchmarkSharpeRatios[Benchmark],
+                                                                   FundLabels = Funds,
+                                                                   BenchmarkLabel = Benchmark,
+                                                                   Window = Window,
+                                                                   RiskFreeRate = RiskFreeRate,
+                                                                   PeriodsPerYear = PeriodsPerYear,
+                                                                   Intermediates = Intermediates,
+                                                                   DType = DType,
+                                                                   MaxWorkers = MaxWorkers,
+                                                                   Profiler = Profiler)
+                continue
+
+            self.Batches[Benchmark] = BatchInformationRatio.FromSeries(Returns = Returns[..., Columns],
+                                                                       SharpeRatios = SharpeRatios[..., Columns],
+                                                                       BenchmarkReturns = BenchmarkReturns[Benchmark],
+                                                                       BenchmarkSharpeRatios = BenchmarkSharpeRatios[Benchmark],
+                                                                       FundLabels = Funds,
+                                                                       BenchmarkLabel = Benchmark,
+                                                                       Window = Window,
+                                                                       Intermediates = Intermediates,
+                                                                       DType = DType,
+                                                                       Profiler = Profiler)
+
+        self.Returns = Returns if Intermediates else None
+        self.SharpeRatios = SharpeRatios if Intermediates else None
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromDataFrame(cls,
+                      TickerDf = None,
+                      BenchmarkMap = {'GADGX': '^DJI'},
+                      Window = 50,
+                      RiskFreeRate = 0.01,
+                      PeriodsPerYear = 365,
+                      Intermediates = True,
+                      DType = None,
+                      Cache = None,
+                      MaxWorkers = 1,
+                      Profiler = None):
+        """
+        Synopsis: Compute the information ratios from the <Symbol>_Close columns of a dataframe.
+        ---------
+
+        Parameters:
+        -----------
+        TickerDf: pandas dataframe expected to contain the columns <Symbol>_Close of all funds and benchmarks
+        BenchmarkMap: dict of str -> str or list of str, benchmark(s) of every fund (funds or benchmarks without close
+                      prices are skipped)
+        Window / RiskFreeRate / PeriodsPerYear / Intermediates / DType / Cache / MaxWorkers / Profiler: see __init__
+
+        Returns:
+        --------
+        MultiBenchmarkInformationRatio instance
+        """
+
+        FundLabels = []
+        BenchmarkLabels = []
+        for ThisFund, Benchmarks in BenchmarkMap.items():
+            if ThisFund + '_Close' not in TickerDf.columns:
+                print('No close prices available for ' + ThisFund)
+                continue
+            FundLabels.append(ThisFund)
+            for ThisBenchmark in ([Benchmarks] if isinstance(Benchmarks, str) else Benchmarks):
+                if ThisBenchmark in BenchmarkLabels:
+                    continue
+                if ThisBenchmark + '_Close' not in TickerDf.columns:
+                    print('No close prices available for benchmark ' + ThisBenchmark)
+                    continue
+                BenchmarkLabels.append(ThisBenchmark)
+
+        return cls(Prices = TickerDf[[j + '_Close' for j in FundLabels]].to_numpy(dtype = float),
+                   BenchmarkPrices = TickerDf[[j + '_Close' for j in BenchmarkLabels]].to_numpy(dtype = float),
+                   FundLabels = FundLabels,
+                   BenchmarkLabels = BenchmarkLabels,
+                   BenchmarkMap = BenchmarkMap,
+                   Window = Window,
+                   RiskFreeRate = RiskFreeRate,
+                   PeriodsPerYear = PeriodsPerYear,
+                   Intermediates = Intermediates,
+                   DType = DType,
+                   Cache = Cache,
+                   MaxWorkers = MaxWorkers,
+                   Profiler = Profiler)
+
+###########################################
+###########################################
+
+    def GroupByBenchmark(self, BenchmarkMap, FundLabels, BenchmarkLabels):
+        """
+        Synopsis: Group the funds of a fund->benchmark(s) mapping by benchmark.
+        ---------
+
+        Parameters:
+        -----------
+        BenchmarkMap: dict of str -> str or list of str, benchmark(s) of every fund
+        FundLabels: list of str, funds with prices (others are skipped)
+        BenchmarkLabels: list of str, benchmarks with prices (others are skipped)
+
+        Returns:
+        --------
+        Groups: dict of str -> list of str, the funds of every benchmark, ordered as in FundLabels (benchmarks in the
+                order of BenchmarkLabels; a fund is not compared with itself, and benchmarks without funds are left out)
+        """
+
+        Groups = {j: [] for j in BenchmarkLabels}
+        for ThisFund in FundLabels:
+            Benchmarks = BenchmarkMap.get(ThisFund, [])
+            for ThisBenchmark in ([Benchmarks] if isinstance(Benchmarks, str) else Benchmarks):
+                if ThisBenchmark in Groups and ThisBenchmark != ThisFund and ThisFund not in Groups[ThisBenchmark]:
+                    Groups[ThisBenchmark].append(ThisFund)
+
+        return {j: Funds for j, Funds in Groups.items() if len(Funds) > 0}
+
+###########################################
+###########################################
+
+    def ToDataFrame(self, Index = None, Intermediates = True):
+        """
+        Synopsis: Assemble the results of all groups as a dataframe with the column labels used by the class InformationRatio.
+        ---------
+
+        Parameters:
+        -----------
+        Index: pandas index for the rows of the dataframe (defaults to a range index)
+        Intermediates: boolean, toggle to include the returns and Sharpe ratios (see BatchInformationRatio.ToDataFrame)
+
+        Returns:
+        --------
+        ResultDf: pandas dataframe, with columns labeled <InvestmentLabel>_<BenchmarkLabel>_<IR_label>_<Window>, benchmark
+                  by benchmark (the returns and Sharpe ratios of a fund appear once, even if it has several benchmarks)
+        """
+
+        ResultDfs = [ThisBatch.ToDataFrame(Index = Index, Intermediates = Intermediates) for ThisBatch in self.Batches.values()]
+        if len(ResultDfs) == 0:
+            return pd.DataFrame(index = Index)
+
+        ResultDf = pd.concat(ResultDfs, axis = 1)
+
+        return ResultDf.loc[:, ~ResultDf.columns.duplicated()]
@@ -0,0 +1,200 @@
+"""
+Synopsis:
+---------
+Multi-core computation of the information ratios (IRs) of many funds against a benchmark.
+
+The fund axis of the (dates x funds) price panel is split into shards that are processed by a pool of processes.
+The prices, the benchmark series and the result arrays live in shared memory (multiprocessing.shared_memory), so
+neither the inputs nor the results are pickled: every worker attaches to the blocks by name, computes the returns,
+Sharpe ratios and IRs of its columns, and writes them to its own columns of the result arrays.
+
+All kernels work column by column, so the result of a shard does not depend on the other columns: the merged result
+is identical (bit for bit) to the one of the serial BatchInformationRatio, whatever the number of shards or workers.
+"""
+
+import os
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from RollingStatistics import WindowReturns, RollingSharpeRatio
+from BatchInformationRatio import BatchInformationRatio
+from Instrumentation import DisabledProfiler
+
+###########################################
+###########################################
+
+def ParallelInformationRatio(Prices = None,
+                             BenchmarkReturns = None,
+                             BenchmarkSharpeRatios = None,
+                             FundLabels = None,
+                             BenchmarkLabel = '^DJI',
+                             Window = 50,
+                             RiskFreeRate = 0.01,
+                             PeriodsPerYear = 365,
+                             Intermediates = True,
+                             DType = None,
+                             MaxWorkers = None,
+                             ShardsPerWorker = 4,
+                             Profiler = None):
+    """
+    Synopsis: Compute the IRs of all funds in shards of funds on a pool of processes over shared memory.
+    ---------
+
+    Parameters:
+    -----------
+    Prices: array-like, (dates x funds) close prices of the funds
+    BenchmarkReturns / BenchmarkSharpeRatios: numpy arrays, (dates,) returns and Sharpe ratios of the benchmark
+                                              ((dates x windows) for a list of windows), e.g., from a SeriesCache
+    FundLabels / BenchmarkLabel / Window / RiskFreeRate / PeriodsPerYear / Intermediates / DType: see BatchInformationRatio
+    MaxWorkers: int, number of processes (defaults to the number of processors)
+    ShardsPerWorker: int, number of shards per process (more shards balance the load better)
+    Profiler: Instrumentation.Profiler instance to record the stage 'ir_parallel' (no recording by default)
+
+    Returns:
+    --------
+    Batch: BatchInformationRatio instance with the same arrays as the serial computation
+    """
+
+    if Profiler is None:
+        Profiler = DisabledProfiler
+
+    Prices = np.ascontiguousarray(Prices, dtype = float)
+    NumberOfFunds = Prices.shape[1]
+    MaxWorkers = MaxWorkers if MaxWorkers is not None else (os.cpu_count() or 1)
+
+    # shape of the results: (dates x funds), or (windows x dates x funds) for a list of windows
+    Shape = Prices.shape if np.ndim(Window) == 0 else (len(Window),) + Prices.shape
+    OutputNames = ['IR', 'IRA'] + (['Returns', 'SharpeRatios'] if Intermediates else [])
+    OutputTypes = {'IR': DType, 'IRA': DType, 'Returns': None, 'SharpeRatios': None}
+
+    with Profiler.Stage('ir_parallel') as Stage:
+
+        Blocks = {}
+        try:
+            # inputs and outputs in shared memory
+            Arrays = {}
+            for Name, Values in [('Prices', Prices),
+                                 ('BenchmarkReturns', np.ascontiguousarray(BenchmarkReturns, dtype = float)),
+                                 ('BenchmarkSharpeRatios', np.ascontiguousarray(BenchmarkSharpeRatios, dtype = float))]:
+                Blocks[Name], Arrays[Name] = CreateSharedArray(Values.shape, Values.dtype)
+                Arrays[Name][...] = Values
+            for Name in OutputNames:
+                Blocks[Name], Arrays[Name] = CreateSharedArray(Shape, np.dtype(OutputTypes[Name] or 'float64'))
+
+            # shards of adjacent funds
+            NumberOfShards = max(1, min(NumberOfFunds, MaxWorkers * ShardsPerWorker))
+            Bounds = np.linspace(0, NumberOfFunds, NumberOfShards + 1).astype(int)
+            Tasks = [{'Blocks': {Name: (Blocks[Name].name, Arrays[Name].shape, Arrays[Name].dtype.str) for Name in Blocks},
+                      'Outputs': OutputNames,
+                      'First': int(Bounds[k]),
+                      'Last': int(Bounds[k + 1]),
+                      'Window': Window,
+                      'RiskFreeRate': RiskFreeRate,
+                      'PeriodsPerYear': PeriodsPerYear,
+                      'Intermediates': Intermediates,
+                      'DType': DType}
+                     for k in range(NumberOfShards) if Bounds[k + 1] > Bounds[k]]
+
+            if MaxWorkers > 1:
+                with ProcessPoolExecutor(max_workers = MaxWorkers) as Pool:
+                    list(Pool.map(ComputeShard, Tasks))
+            else:
+                for Task in Tasks:
+                    ComputeShard(Task)
+
+            # copy the results out of shared memory, before it is released
+            Results = {Name: Arrays[Name].copy() for Name in OutputNames}
+
+        finally:
+            Arrays = None
+            for Block in Blocks.values():
+                Block.close()
+                Block.unlink()
+
+        Stage.Shape(Results['IR'])
+
+    # assemble a BatchInformationRatio, as the serial computation does
+    Batch = BatchInformationRatio.__new__(BatchInformationRatio)
+    Batch.FundLabels = list(FundLabels) if FundLabels is not None else [str(j) for j in range(NumberOfFunds)]
+    Batch.BenchmarkLabel = BenchmarkLabel
+    Batch.Window = Window
+    Batch.Windows = [Window] if np.ndim(Window) == 0 else list(Window)
+    Batch.IR = Results['IR']
+    Batch.IRA = Results['IRA']
+    Batch.Returns = Results.get('Returns')
+    Batch.SharpeRatios = Results.get('SharpeRatios')
+    Batch.BenchmarkReturns = BenchmarkReturns if Intermediates else None
+    Batch.BenchmarkSharpeRatios = BenchmarkSharpeRatios if Intermediates else None
+    if Intermediates and np.ndim(Window) != 0:
+        Batch.BenchmarkReturns = np.ascontiguousarray(np.moveaxis(BenchmarkReturns, 1, 0))
+        Batch.BenchmarkSharpeRatios = np.ascontiguousarray(np.moveaxis(BenchmarkSharpeRatios, 1, 0))
+
+    return Batch
+
+###########################################
+###########################################
+
+def CreateSharedArray(Shape, DType):
+    """
+    Synopsis: Create a block of shared memory and a numpy array on it.
+    ---------
+
+    Returns:
+    --------
+    Block: multiprocessing.shared_memory.SharedMemory instance (to be closed and unlinked by the caller)
+    Array: numpy array of shape Shape and data type DType on the block
+    """
+
+    Block = shared_memory.SharedMemory(create = True, size = max(1, int(np.prod(Shape)) * np.dtype(DType).itemsize))
+
+    return Block, np.ndarray(Shape, dtype = DType, buffer = Block.buf)
+
+###########################################
+###########################################
+
+def ComputeShard(Task):
+    """
+    Synopsis: Compute the IRs of the funds First...Last-1 and write them to the shared result arrays (runs in the workers).
+    ---------
+
+    Parameters:
+    -----------
+    Task: dict with the keys 'Blocks' (name, shape and data type of every shared array), 'Outputs' (names of the result
+          arrays), 'First'/'Last' (columns of the shard), 'Window', 'RiskFreeRate', 'PeriodsPerYear',
+          'Intermediates' and 'DType'
+
+    Returns:
+    --------
+    (First, Last): tuple of int, the columns written
+    """
+
+    Blocks = {}
+    Arrays = {}
+    for Name, (BlockName, Shape, DType) in Task['Blocks'].items():
+        Blocks[Name] = shared_memory.SharedMemory(name = BlockName)
+        Arrays[Name] = np.ndarray(Shape, dtype = DType, buffer = Blocks[Name].buf)
+
+    try:
+        Columns = slice(Task['First'], Task['Last'])
+
+        Returns = WindowReturns(Arrays['Prices'][:, Columns], Task['Window'])
+        SharpeRatios = RollingSharpeRatio(Returns, Task['Window'], Task['RiskFreeRate'], Task['PeriodsPerYear'])
+        Batch = BatchInformationRatio.FromSeries(Returns = Returns,
+                                                 SharpeRatios = SharpeRatios,
+                                                 BenchmarkReturns = Arrays['BenchmarkReturns'],
+                                                 BenchmarkSharpeRatios = Arrays['BenchmarkSharpeRatios'],
+                                                 FundLabels = [str(j) for j in range(Task['First'], Task['Last'])],
+                                                 Window = Task['Window'],
+                                                 Intermediates = Task['Intermediates'],
+                                                 DType = Task['DType'])
+
+        for Name in Task['Outputs']:
+            Arrays[Name][..., Columns] = getattr(Batch, Name)
+
+    finally:
+        Arrays = None
+        Batch = None
+        for Block in Blocks.values():
+            Block.close()
+
+    return Task['First'], Task['Last']
@@ -0,0 +1,271 @@
+"""
+Synopsis:
+---------
+Vectorized kernels (returns, forward fills, rolling moments) used by the information ratio computations.
+
+All functions operate on numpy arrays along axis 0 (time), so a single call handles one series (1-D) or a whole
+panel of series (2-D, dates x funds). Window sums are obtained from differences of cumulative sums, so the cost is
+O(n) in the number of time steps and independent of the window length.
+
+Instead of a single window, the kernels accept a sequence of windows: WindowReturns then adds an axis for the windows
+as axis 1 (dates x windows [x funds]) and the rolling kernels apply the k-th window to the k-th slice along axis 1.
+Thus, a sweep over several windows is evaluated with one cumulative sum per moment over the stacked array.
+
+Non-finite values (NaN, +/-inf) are treated as missing. For NaN, this is the behaviour of pandas' rolling windows;
+unlike pandas, which keeps +/-inf in the window (giving an infinite mean and a NaN deviation), an infinite value
+counts as missing as well, i.e., as if it were NaN.
+"""
+
+import numpy as np
+
+###########################################
+###########################################
+
+def BroadcastWindows(Window, NDim):
+    """
+    Synopsis: Reshape a sequence of windows to broadcast along axis 1 of an array with NDim dimensions.
+    ---------
+
+    Parameters:
+    -----------
+    Window: int or sequence of int, window(s) of the computation
+    NDim: int, number of dimensions of the array (dates x windows [x funds]) the windows are applied to
+
+    Returns:
+    --------
+    Window: int unchanged, or numpy array of shape (1, windows, 1, ...)
+    """
+
+    if np.ndim(Window) == 0:
+        return Window
+
+    return np.asarray(Window).reshape((1, -1) + (1,) * (NDim - 2))
+
+###########################################
+###########################################
+
+def WindowReturns(Prices, Window, Log = False):
+    """
+    Synopsis: Compute the returns (C_t - C_t-Window) / C_t or their logarithm along axis 0.
+    ---------
+
+    Parameters:
+    -----------
+    Prices: array-like (1-D or 2-D), (close) prices
+    Window: int or sequence of int, number of steps to consider for computing returns
+    Log: boolean, toggle for computing the returns or the log-returns
+
+    Returns:
+    --------
+    Returns: numpy array of the same shape as Prices (with the windows inserted as axis 1 for a sequence of windows);
+             undefined values (e.g., the first Window rows) are set to 0.0
+    """
+
+    Prices = np.asarray(Prices, dtype = float)
+    Windows = [Window] if np.ndim(Window) == 0 else list(Window)
+
+    # the first Window rows have no reference price
+    Returns = np.full((Prices.shape[0], len(Windows)) + Prices.shape[1:], np.nan)
+    for k, ThisWindow in enumerate(Windows):
+        Returns[ThisWindow:, k] = (Prices[ThisWindow:] - Prices[:-ThisWindow]) / Prices[ThisWindow:]
+
+    if np.ndim(Window) == 0:
+        Returns = Returns[:, 0]
+
+    if Log:
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            Returns = np.log(Returns)
+
+    # undefined values are filled with zeros
+    Returns[np.isnan(Returns)] = 0.0
+
+    return Returns
+
+###########################################
+###########################################
+
+def ForwardFill(Values):
+    """
+    Synopsis: Replace NaN values by the last preceding non-NaN value along axis 0 (as pandas' ffill).
+    ---------
+
+    Parameters:
+    -----------
+    Values: array-like (1-D or 2-D)
+
+    Returns:
+    --------
+    Filled: numpy array of the same shape as Values; leading NaN values are kept
+    """
+
+    Values = np.asarray(Values, dtype = float)
+
+    # row index of the last non-NaN value up to (and including) every row
+    Rows = np.arange(Values.shape[0]).reshape((-1,) + (1,) * (Values.ndim - 1))
+    LastValid = np.where(np.isnan(Values), 0, Rows)
+    np.maximum.accumulate(LastValid, axis = 0, out = LastValid)
+
+    return np.take_along_axis(Values, LastValid, axis = 0)
+
+###########################################
+###########################################
+
+def RollingSum(Values, Window):
+    """
+    Synopsis: Compute trailing window sums along axis 0 from differences of cumulative sums.
+    ---------
+
+    Parameters:
+    -----------
+    Values: numpy array (1-D or 2-D), values to sum; must not contain non-finite values
+    Window: int, number of time steps in the window (or sequence of int applied along axis 1)
+
+    Returns:
+    --------
+    Sums: numpy array of the same shape as Values; row i holds the sum over rows max(0,i-Window+1)...i
+    """
+
+    # the sum over a window is the difference of the prefix sums at its end and before its start
+    Sums = np.cumsum(Values, axis = 0)
+    if np.ndim(Window) == 0:
+        if Window < Values.shape[0]:
+            Sums[Window:] -= Sums[:-Window].copy()
+    else:
+        for k, ThisWindow in enumerate(Window):
+            if ThisWindow < Values.shape[0]:
+                Sums[ThisWindow:, k] -= Sums[:-ThisWindow, k].copy()
+
+    return Sums
+
+###########################################
+###########################################
+
+def RollingMoments(Values, Window, MinPeriods = None, Ddof = 0):
+    """
+    Synopsis: Compute the rolling mean and standard deviation along axis 0, treating non-finite values as missing.
+    ---------
+
+    NaN and +/-inf alike contribute neither to the sums nor to the counts (pandas only leaves out NaN).
+
+    Parameters:
+    -----------
+    Values: array-like (1-D or 2-D), the series to evaluate
+    Window: int, number of time steps in the window (or sequence of int applied along axis 1)
+    MinPeriods: int, minimum number of finite values in a window to yield a result (defaults to Window, as in pandas)
+    Ddof: int, delta degrees of freedom of the standard deviation (0 for numpy's .std(), 1 for pandas' .std())
+
+    Returns:
+    --------
+    Mean: numpy array, rolling mean (NaN where fewer than MinPeriods finite values are in the window)
+    Std: numpy array, rolling standard deviation (NaN where, in addition, the window holds no more than Ddof values)
+    """
+
+    Values = np.asarray(Values, dtype = float)
+
+    if MinPeriods is None:
+        MinPeriods = BroadcastWindows(Window, Values.ndim)
+
+    # missing values contribute neither to the sums nor to the counts
+    Finite = np.isfinite(Values)
+    if Finite.all():
+        # without missing values, the counts only depend on the window and are shared by all series
+        Clean = Values
+        Steps = np.arange(1, Values.shape[0] + 1, dtype = float).reshape((-1,) + (1,) * (Values.ndim - 1))
+        Count = np.minimum(Steps, BroadcastWindows(Window, Values.ndim))
+    else:
+        Clean = np.where(Finite, Values, 0.0)
+        Count = RollingSum(Finite.astype(float), Window)
+
+    Sum = RollingSum(Clean, Window)
+    SumOfSquares = RollingSum(Clean * Clean, Window)
+
+    return WindowMoments(Count, Sum, SumOfSquares, MinPeriods = MinPeriods, Ddof = Ddof)
+
+###########################################
+###########################################
+
+def WindowMoments(Count, Sum, SumOfSquares, MinPeriods = 1, Ddof = 0):
+    """
+    Synopsis: Compute the mean and standard deviation of windows from their counts, sums and sums of squares.
+    ---------
+
+    Parameters:
+    -----------
+    Count: array-like, number of finite values in every window
+    Sum: numpy array, sum of the finite values in every window
+    SumOfSquares: numpy array, sum of the squared finite values in every window
+    MinPeriods: int (or array broadcasting against Count), minimum number of finite values to yield a result
+    Ddof: int, delta degrees of freedom of the standard deviation
+
+    Returns:
+    --------
+    Mean: numpy array, mean of every window (NaN where fewer than MinPeriods finite values are in the window)
+    Std: numpy array, standard deviation of every window (NaN where, in addition, the window holds no more than Ddof values)
+    """
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        Mean = Sum / Count
+        # clip the round-off of the cancellation at zero, so that constant windows give a zero deviation
+        Variance = np.maximum(SumOfSquares - Sum * Mean, 0.0) / (Count - Ddof)
+
+    Valid = np.broadcast_to(Count >= np.maximum(MinPeriods, 1), Mean.shape)
+    Mean[~Valid] = np.nan
+    Variance[~Valid | np.broadcast_to(Count <= Ddof, Variance.shape)] = np.nan
+
+    return Mean, np.sqrt(Variance)
+
+###########################################
+###########################################
+
+def RollingSharpeRatio(Returns, Window, RiskFreeRate = 0.01, PeriodsPerYear = 365):
+    """
+    Synopsis: Compute the rolling Sharpe ratio (mean excess return over the population standard deviation).
+    ---------
+
+    Parameters:
+    -----------
+    Returns: array-like (1-D or 2-D), (log-)returns
+    Window: int, number of time steps to consider in the computation of the Sharpe ratio (or sequence of int applied along axis 1)
+    RiskFreeRate: float, assumed annual risk-free return
+    PeriodsPerYear: int or float, number of time steps per year of the date grid (365 for calendar days, 252 for business
+                    days; see DataExtractionAndPreprocessing.PeriodsPerYear)
+
+    Returns:
+    --------
+    SharpeRatio: numpy array of the same shape as Returns; NaN unless the window holds Window finite returns (an
+                 infinite return counts as missing, as NaN does)
+    """
+
+    # compute risk-free rate over sought window
+    Returns = np.asarray(Returns, dtype = float)
+    RiskFreeRateWindow = RiskFreeRate * ( PeriodsPerYear / BroadcastWindows(Window, Returns.ndim) )
+
+    Mean, Std = RollingMoments(Returns, Window, Ddof = 0)
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return (Mean - RiskFreeRateWindow) / Std
+
+###########################################
+###########################################
+
+def RollingInformationRatio(Alphas, Window):
+    """
+    Synopsis: Compute the rolling information ratio, i.e., the mean over the standard deviation of the excess returns.
+    ---------
+
+    Parameters:
+    -----------
+    Alphas: array-like (1-D or 2-D), (bare or risk-adjusted) excess returns of the investment over the benchmark
+    Window: int, number of time steps to evaluate the information ratio (or sequence of int applied along axis 1)
+
+    Returns:
+    --------
+    InformationRatio: numpy array of the same shape as Alphas, forward filled in time (never backward, so that no
+                      future information becomes available in the training of a predictive model)
+    """
+
+    # windows are evaluated from the first value on (min_periods = 0) with the sample standard deviation
+    Mean, Std = RollingMoments(Alphas, Window, MinPeriods = 0, Ddof = 1)
+
+    with np.errstate(divide = 'ignore', invalid = 'ignore'):
+        return ForwardFill(Mean / Std)
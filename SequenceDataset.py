@@ -0,0 +1,257 @@
+import os
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+
+class SequenceDataset():
+    """
+    Synopsis: Class that exposes feature columns (e.g., the IRs) as (samples x lookback x features) windows for sequence models.
+    ---------
+
+    The windows are a strided view on the (dates x features) array, i.e., no value is copied however long the lookback
+    is; copies are only made for the (small) batches handed to a trainer, or chunk by chunk when the samples are written
+    to .npy files on disk. The features may themselves be a memory map (e.g., from FeatureStore.Load), so that datasets
+    larger than the memory can be processed.
+
+    Sample i covers the rows i ... i+Lookback-1; its time t is the last of them (self.Dates[i]), and its target is the
+    value of the target columns at t+Horizon (e.g., the IR a year later), so the features never contain the target.
+
+    Properties:
+    -----------
+    self.Features: numpy array, (dates x features) array the windows are taken from
+    self.FeatureLabels / self.TargetLabels: list of str, labels of the feature / target columns
+    self.Lookback / self.Horizon: int, number of rows of every window / number of rows between t and the target
+    self.Windows: numpy array, (samples x lookback x features) read-only strided view on self.Features
+    self.Targets: numpy array, (samples x targets) view on the target columns at t+Horizon (None without targets)
+    self.Dates: numpy array, (samples,) time t of every sample (None without dates)
+    self.Valid: numpy array, (samples,) boolean mask of the samples without NaN in their window and target
+
+    Methods:
+    --------
+    __init__: set up the views
+    FromDataFrame: alternative constructor that takes the feature and target columns from a dataframe
+    ValidSamples: method to mask the samples without NaN
+    Batches: generator of (features, targets) batches
+    ToNpy: method to write the samples chunk by chunk to .npy files (for memory-mapped training data)
+    """
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 Features = None,
+                 Lookback = 92,
+                 Horizon = 365,
+                 TargetColumns = None,
+                 FeatureLabels = None,
+                 Dates = None):
+        """
+        Synopsis: Set up the sliding-window views on the features and the targets.
+        ---------
+
+        Parameters:
+        -----------
+        Features: array-like, (dates x features) values, e.g., IR columns (a numpy memory map is not loaded)
+        Lookback: int, number of rows of every window
+        Horizon: int, number of rows between the time of a sample and its target (None for features only)
+        TargetColumns: list of int, columns of Features used as targets (defaults to all of them)
+        FeatureLabels: list of str, labels of the columns of Features
+        Dates: array-like, (dates,) dates of the rows of Features
+
+        Returns:
+        --------
+        Nothing, but initializes self.Windows, self.Targets, self.Dates and self.Valid
+        """
+
+        self.Features = Features if isinstance(Features, np.ndarray) else np.asarray(Features, dtype = float)
+        if self.Features.ndim == 1:
+            self.Features = self.Features[:, np.newaxis]
+
+        self.Lookback = Lookback
+        self.Horizon = Horizon
+        self.FeatureLabels = list(FeatureLabels) if FeatureLabels is not None else [str(j) for j in range(self.Features.shape[1])]
+        TargetColumns = list(range(self.Features.shape[1])) if TargetColumns is None else list(TargetColumns)
+        self.TargetLabels = [self.FeatureLabels[j] for j in TargetColumns] if Horizon is not None else []
+
+        # the last Horizon rows have no target yet
+        NumberOfSamples = max(0, self.Features.shape[0] - Lookback + 1 - (Horizon or 0))
+
+        # samples x lookback x features view: sample i starts at row i, i.e., one row stride further than sample i-1
+        # (read-only, as the windows of neighbouring samples share their values)
+        RowStride, ColumnStride = self.Features.strides
+        self.Windows = as_strided(self.Features,
+                                  shape = (NumberOfSamples, Lookback, self.Features.shape[1]),
+                                  strides = (RowStride, RowStride, ColumnStride),
+                                  writeable = False)
+
+        if Horizon is not None:
+            # contiguous target columns are a view as well
+            if TargetColumns == list(range(TargetColumns[0], TargetColumns[0] + len(TargetColumns))):
+                Columns = slice(TargetColumns[0], TargetColumns[0] + len(TargetColumns))
+            else:
+                Columns = TargetColumns
+            First = Lookback - 1 + Horizon
+            self.Targets = self.Features[First:First + NumberOfSamples][:, Columns]
+        else:
+            self.Targets = None
+
+        self.Dates = np.asarray(Dates)[Lookback - 1:Lookback - 1 + NumberOfSamples] if Dates is not None else None
+
+        self.Valid = self.ValidSamples()
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromDataFrame(cls,
+                      Df = None,
+                      Columns = None,
+                      Lookback = 92,
+                      Horizon = 365,
+                      TargetColumns = None,
+                      DType = 'float64'):
+        """
+        Synopsis: Set up the dataset from the columns of a dataframe (e.g., InformationRatio.AllData).
+        ---------
+
+        Parameters:
+        -----------
+        Df: pandas dataframe with the feature columns (and optionally a 'Date' column)
+        Columns: list of str, feature columns (defaults to all IR columns, i.e., labels containing '_IR_' or '_IRA_')
+        Lookback / Horizon: see __init__
+        TargetColumns: list of str, target columns (defaults to all feature columns)
+        DType: str, numpy data type of the features (one copy of the columns is made to get a contiguous array)
+
+        Returns:
+        --------
+        SequenceDataset instance
+        """
+
+        if Columns is None:
+            Columns = [j for j in Df.columns if '_IR_' in j or '_IRA_' in j]
+        Columns = list(Columns)
+
+        return cls(Features = Df[Columns].to_numpy(dtype = DType),
+                   Lookback = Lookback,
+                   Horizon = Horizon,
+                   TargetColumns = None if TargetColumns is None else [Columns.index(j) for j in TargetColumns],
+                   FeatureLabels = Columns,
+                   Dates = Df['Date'].to_numpy() if 'Date' in Df.columns else None)
+
+###########################################
+###########################################
+
+    def ValidSamples(self, ChunkSize = 65536):
+        """
+        Synopsis: Mask of the samples without NaN in their window and their target.
+        ---------
+
+        Parameters:
+        -----------
+        ChunkSize: int, number of rows of the features checked at once
+
+        Returns:
+        --------
+        Valid: numpy array, (samples,) boolean mask
+        """
+
+        # a window is valid, if no row in it holds a NaN: a rolling count of the rows with NaN (chunk by chunk,
+        # so that a memory-mapped source is read in pieces)
+        RowHasNaN = np.zeros(self.Features.shape[0], dtype = bool)
+        for First in range(0, self.Features.shape[0], ChunkSize):
+            RowHasNaN[First:First + ChunkSize] = np.isnan(self.Features[First:First + ChunkSize]).any(axis = 1)
+
+        NaNCount = np.concatenate([[0], np.cumsum(RowHasNaN)])
+        NumberOfSamples = self.Windows.shape[0]
+        Valid = (NaNCount[self.Lookback:self.Lookback + NumberOfSamples] - NaNCount[:NumberOfSamples]) == 0
+
+        if self.Targets is not None:
+            Valid &= ~np.isnan(self.Targets).any(axis = 1)
+
+        return Valid
+
+###########################################
+###########################################
+
+    def Batches(self, BatchSize = 256, Shuffle = False, Seed = 0, ValidOnly = True):
+        """
+        Synopsis: Generate (features, targets) batches; only the samples of a batch are copied.
+        ---------
+
+        Parameters:
+        -----------
+        BatchSize: int, number of samples per batch
+        Shuffle: boolean, toggle to visit the samples in random order (otherwise, in time order)
+        Seed: int, seed of the random order
+        ValidOnly: boolean, toggle to skip the samples with NaN in their window or target
+
+        Returns:
+        --------
+        generator of (X, y): numpy arrays, (batch x lookback x features) and (batch x targets) (y is None without targets)
+        """
+
+        Samples = np.flatnonzero(self.Valid) if ValidOnly else np.arange(self.Windows.shape[0])
+        if Shuffle:
+            Samples = np.random.default_rng(Seed).permutation(Samples)
+
+        for First in range(0, len(Samples), BatchSize):
+            Batch = Samples[First:First + BatchSize]
+            yield self.Windows[Batch], (self.Targets[Batch] if self.Targets is not None else None)
+
+###########################################
+###########################################
+
+    def ToNpy(self, Directory = 'sequences', ChunkSize = 4096, ValidOnly = True, DType = None, Samples = None):
+        """
+        Synopsis: Write the samples to .npy files chunk by chunk, so that a trainer can memory-map them.
+        ---------
+
+        Parameters:
+        -----------
+        Directory: str, output directory
+        ChunkSize: int, number of samples copied at once (bounds the memory used)
+        ValidOnly: boolean, toggle to skip the samples with NaN in their window or target
+        DType: str, numpy data type of the files (defaults to the one of the features)
+        Samples: array-like of int, samples to write, e.g., the ones of a train/validation fold (defaults to all)
+
+        Returns:
+        --------
+        FileNames: dict with the file names of 'X' ((samples x lookback x features)), 'y' ((samples x targets), if any)
+                   and 'Dates' ((samples,), if any)
+        <files>: X.npy, y.npy and Dates.npy in Directory
+        """
+
+        if not os.path.exists(Directory):
+            os.makedirs(Directory)
+
+        Samples = np.arange(self.Windows.shape[0]) if Samples is None else np.asarray(Samples, dtype = int)
+        if ValidOnly:
+            Samples = Samples[self.Valid[Samples]]
+        DType = self.Features.dtype if DType is None else np.dtype(DType)
+
+        FileNames = {'X': os.path.join(Directory, 'X.npy')}
+        X = np.lib.format.open_memmap(FileNames['X'], mode = 'w+', dtype = DType,
+                                      shape = (len(Samples),) + self.Windows.shape[1:])
+        if self.Targets is not None:
+            FileNames['y'] = os.path.join(Directory, 'y.npy')
+            y = np.lib.format.open_memmap(FileNames['y'], mode = 'w+', dtype = DType,
+                                          shape = (len(Samples), self.Targets.shape[1]))
+
+        for First in range(0, len(Samples), ChunkSize):
+            Chunk = Samples[First:First + ChunkSize]
+            X[First:First + len(Chunk)] = self.Windows[Chunk]
+            if self.Targets is not None:
+                y[First:First + len(Chunk)] = self.Targets[Chunk]
+
+        X.flush()
+        del X
+        if self.Targets is not None:
+            y.flush()
+            del y
+
+        if self.Dates is not None:
+            FileNames['Dates'] = os.path.join(Directory, 'Dates.npy')
+            np.save(FileNames['Dates'], self.Dates[Samples])
+
+        return FileNames
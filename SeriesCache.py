@@ -0,0 +1,186 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from RollingStatistics import WindowReturns, RollingSharpeRatio
+
+class SeriesCache():
+    """
+    Synopsis: Class that memoizes the returns and Sharpe ratios of price series, with least-recently-used eviction.
+    ---------
+
+    The series of a ticker are computed once per run and reused by all funds and IR variants (bare and risk-adjusted,
+    several windows) that refer to it, e.g., the benchmark. Entries are keyed by (ticker, price field, window, log flag)
+    for the returns and additionally by the risk-free rate and the periods per year for the Sharpe ratios; the number of dates is part of the
+    key as well. A cache assumes that a ticker always comes with the same prices, so it belongs to one dataset (one run).
+
+    The cached arrays are read-only, so that no caller can alter the series handed out to the others.
+
+    Properties:
+    -----------
+    self.MaxEntries: int, maximal number of cached series (the least recently used one is evicted beyond)
+    self.Hits / self.Misses / self.Evictions: int, counters of the lookups served from the cache, the lookups that
+                                              computed their series and the series evicted
+
+    Methods:
+    --------
+    __init__: set up an empty cache
+    Get: method to return the cached value of a key, computing (and caching) it on a miss
+    Returns: method to return the (cached) returns of a price series
+    SharpeRatios: method to return the (cached) Sharpe ratios of a price series
+    Statistics: method to return the counters as dict
+    Clear: method to empty the cache (and reset the counters)
+    """
+
+###########################################
+###########################################
+
+    def __init__(self, MaxEntries = 256):
+        """
+        Synopsis: Set up an empty cache.
+        ---------
+
+        Parameters:
+        -----------
+        MaxEntries: int, maximal number of cached series
+
+        Returns:
+        --------
+        Nothing
+        """
+
+        self.MaxEntries = MaxEntries
+        self.Entries = OrderedDict()
+        # lookups may come from several threads
+        self.Lock = threading.RLock()
+        self.Hits = 0
+        self.Misses = 0
+        self.Evictions = 0
+
+        return
+
+###########################################
+###########################################
+
+    def Get(self, Key, Compute):
+        """
+        Synopsis: Return the cached value of Key, computing it with Compute() on a miss.
+        ---------
+
+        Parameters:
+        -----------
+        Key: hashable, key of the value
+        Compute: callable without arguments, returning the value (a numpy array is made read-only before it is cached)
+
+        Returns:
+        --------
+        Value: the cached or computed value
+        """
+
+        with self.Lock:
+
+            if Key in self.Entries:
+                self.Hits += 1
+                self.Entries.move_to_end(Key)
+                return self.Entries[Key]
+
+            self.Misses += 1
+            Value = Compute()
+            if isinstance(Value, np.ndarray):
+                Value.flags.writeable = False
+
+            self.Entries[Key] = Value
+            while len(self.Entries) > self.MaxEntries:
+                self.Entries.popitem(last = False)
+                self.Evictions += 1
+
+        return Value
+
+###########################################
+###########################################
+
+    def Returns(self, Prices, Ticker, Window, Field = 'Close', Log = False):
+        """
+        Synopsis: Return the returns of the price series Prices of Ticker (see RollingStatistics.WindowReturns).
+        ---------
+
+        Parameters:
+        -----------
+        Prices: array-like, (dates,) prices of the ticker (only used on a miss)
+        Ticker: str, ticker symbol
+        Window: int or list of int, number of steps to consider for computing returns
+        Field: str, price field of Prices (e.g., 'Close' or 'Adj Close')
+        Log: boolean, toggle for computing the returns or the log-returns
+
+        Returns:
+        --------
+        Returns: read-only numpy array, (dates,) returns ((dates x windows) for a list of windows)
+        """
+
+        Key = ('Returns', Ticker, Field, self.WindowKey(Window), Log, len(Prices))
+
+        return self.Get(Key, lambda: WindowReturns(Prices, Window, Log = Log))
+
+###########################################
+###########################################
+
+    def SharpeRatios(self, Prices, Ticker, Window, RiskFreeRate = 0.01, Field = 'Close', Log = False, PeriodsPerYear = 365):
+        """
+        Synopsis: Return the Sharpe ratios of the returns of the price series Prices of Ticker (reusing cached returns).
+        ---------
+
+        Parameters:
+        -----------
+        Prices / Ticker / Window / Field / Log: see Returns
+        RiskFreeRate: float, assumed annual risk-free return
+        PeriodsPerYear: int or float, number of time steps per year of the date grid (see RollingStatistics.RollingSharpeRatio)
+
+        Returns:
+        --------
+        SharpeRatios: read-only numpy array, (dates,) Sharpe ratios ((dates x windows) for a list of windows)
+        """
+
+        Key = ('SharpeRatios', Ticker, Field, self.WindowKey(Window), Log, len(Prices), RiskFreeRate, PeriodsPerYear)
+
+        return self.Get(Key, lambda: RollingSharpeRatio(self.Returns(Prices, Ticker, Window, Field = Field, Log = Log),
+                                                        Window, RiskFreeRate, PeriodsPerYear))
+
+###########################################
+###########################################
+
+    def WindowKey(self, Window):
+        """
+        Synopsis: Hashable form of a window or a list of windows.
+        ---------
+        """
+
+        return int(Window) if np.ndim(Window) == 0 else tuple(int(j) for j in Window)
+
+###########################################
+###########################################
+
+    def Statistics(self):
+        """
+        Synopsis: Return the counters of the cache.
+        ---------
+
+        Returns:
+        --------
+        Statistics: dict with the keys 'Hits', 'Misses', 'Evictions' and 'Entries' (number of cached series)
+        """
+
+        return {'Hits': self.Hits, 'Misses': self.Misses, 'Evictions': self.Evictions, 'Entries': len(self.Entries)}
+
+###########################################
+###########################################
+
+    def Clear(self):
+        """
+        Synopsis: Remove all cached series and reset the counters.
+        ---------
+        """
+
+        with self.Lock:
+            self.Entries.clear()
+            self.Hits = self.Misses = self.Evictions = 0
+
+        return
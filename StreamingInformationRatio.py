@@ -0,0 +1,389 @@
+import numpy as np
+from RollingStatistics import ForwardFill, WindowMoments
+from BatchInformationRatio import BatchInformationRatio
+
+class StreamingInformationRatio():
+    """
+    Synopsis: Class to update the bare and risk-adjusted information ratios (IRs) of many funds one price row at a time.
+    ---------
+
+    Instead of recomputing the full history every day, the rolling state of every fund/benchmark pair is kept:
+    ring buffers with the prices and the prefix sums (count, sum, sum of squares) of the last Window steps for the
+    returns and the excess returns, plus the last IRs for forward filling. Every update costs O(1) per fund.
+
+    Window sums are obtained as differences of running prefix sums, exactly as in the cumulative-sum kernels of
+    RollingStatistics, so that the streamed IRs are identical to the ones of BatchInformationRatio on the full history.
+
+    Properties:
+    -----------
+    self.FundLabels: list of str, ticker symbols of the funds
+    self.BenchmarkLabel: str, ticker symbol of the benchmark
+    self.Window: int, number of time steps used to evaluate the IRs
+    self.RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+    self.PeriodsPerYear: int or float, number of time steps per year of the date grid (365 for calendar days, 252 for business days)
+    self.Step: int, number of price rows processed so far
+    self.LastDate: str, date of the last price row processed (if provided)
+    self.IR / self.IRA: numpy arrays, (funds,) current bare and risk-adjusted IRs
+
+    Methods:
+    --------
+    __init__: initialize an empty state (no history processed)
+    FromHistory: alternative constructor that seeds the state from (dates x funds) price arrays
+    FromDataFrame: alternative constructor that seeds the state from a dataframe with <Symbol>_Close columns
+    Update: method to process one new price row and return the updated IRs
+    Save: method to write the state to a numpy .npz file
+    Load: alternative constructor that reads the state from a numpy .npz file
+    """
+
+    # names of the arrays that make up the state (written by Save and read by Load)
+    StateArrays = ['LastPrices', 'PriceRing',
+                   'ReturnsPrefix', 'ReturnsRing',
+                   'BareAlphasPrefix', 'BareAlphasRing',
+                   'AdjustedAlphasPrefix', 'AdjustedAlphasRing',
+                   'IR', 'IRA']
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 FundLabels = ['GADGX'],
+                 BenchmarkLabel = '^DJI',
+                 Window = 50,
+                 RiskFreeRate = 0.01,
+                 PeriodsPerYear = 365):
+        """
+        Synopsis: Initialize the state of the rolling windows without any history.
+        ---------
+
+        Parameters:
+        -----------
+        FundLabels: list of str, ticker symbols of the funds (order of the prices passed to Update)
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Window: int, number of time steps to use to evaluate the information ratio
+        RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+        PeriodsPerYear: int or float, number of time steps per year of the date grid, scaling the risk-free rate to the window
+
+        Returns:
+        --------
+        Nothing, but initializes the state
+        """
+
+        self.FundLabels = list(FundLabels)
+        self.BenchmarkLabel = BenchmarkLabel
+        self.Window = int(Window)
+        self.RiskFreeRate = float(RiskFreeRate)
+        self.PeriodsPerYear = PeriodsPerYear
+        self.Step = 0
+        self.LastDate = None
+
+        # the benchmark is kept as the last column of the prices and returns
+        NumberOfFunds = len(self.FundLabels)
+        self.LastPrices = np.full(NumberOfFunds + 1, np.nan)
+        self.PriceRing = np.full((self.Window, NumberOfFunds + 1), np.nan)
+
+        # prefix sums (count, sum, sum of squares) and ring buffers with the prefix sums of the last Window steps
+        self.ReturnsPrefix = np.zeros((3, NumberOfFunds + 1))
+        self.ReturnsRing = np.zeros((self.Window, 3, NumberOfFunds + 1))
+        self.BareAlphasPrefix = np.zeros((3, NumberOfFunds))
+        self.BareAlphasRing = np.zeros((self.Window, 3, NumberOfFunds))
+        self.AdjustedAlphasPrefix = np.zeros((3, NumberOfFunds))
+        self.AdjustedAlphasRing = np.zeros((self.Window, 3, NumberOfFunds))
+
+        # last IRs (forward filled)
+        self.IR = np.full(NumberOfFunds, np.nan)
+        self.IRA = np.full(NumberOfFunds, np.nan)
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromHistory(cls,
+                    Prices = None,
+                    BenchmarkPrices = None,
+                    FundLabels = None,
+                    BenchmarkLabel = '^DJI',
+                    Window = 50,
+                    RiskFreeRate = 0.01,
+                    PeriodsPerYear = 365,
+                    LastDate = None):
+        """
+        Synopsis: Seed the state from the price history (vectorized, without replaying it row by row).
+        ---------
+
+        Parameters:
+        -----------
+        Prices: array-like, (dates x funds) close prices of the funds
+        BenchmarkPrices: array-like, (dates,) close prices of the benchmark on the same date grid
+        FundLabels: list of str, ticker symbols of the columns of Prices (defaults to their column index)
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Window: int, number of time steps to use to evaluate the information ratio
+        RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+        PeriodsPerYear: int or float, number of time steps per year of the date grid
+        LastDate: str, date of the last row of the history
+
+        Returns:
+        --------
+        StreamingInformationRatio instance, ready to Update with the row following the history
+        """
+
+        Prices = np.asarray(Prices, dtype = float)
+        if Prices.ndim == 1:
+            Prices = Prices[:, np.newaxis]
+        AllPrices = ForwardFill(np.column_stack([Prices, np.asarray(BenchmarkPrices, dtype = float)]))
+
+        Batch = BatchInformationRatio(Prices = AllPrices[:, :-1],
+                                      BenchmarkPrices = AllPrices[:, -1],
+                                      FundLabels = FundLabels,
+                                      BenchmarkLabel = BenchmarkLabel,
+                                      Window = Window,
+                                      RiskFreeRate = RiskFreeRate,
+                                      PeriodsPerYear = PeriodsPerYear)
+
+        Instance = cls(FundLabels = Batch.FundLabels,
+                       BenchmarkLabel = BenchmarkLabel,
+                       Window = Window,
+                       RiskFreeRate = RiskFreeRate,
+                       PeriodsPerYear = PeriodsPerYear)
+
+        NumberOfSteps = AllPrices.shape[0]
+        if NumberOfSteps == 0:
+            return Instance
+
+        # rows of the history that are still inside the last window, and their slots in the ring buffers
+        Rows = np.arange(max(0, NumberOfSteps - Instance.Window), NumberOfSteps)
+        Slots = Rows % Instance.Window
+
+        Instance.Step = NumberOfSteps
+        Instance.LastDate = LastDate
+        Instance.LastPrices = AllPrices[-1].copy()
+        Instance.PriceRing[Slots] = AllPrices[Rows]
+
+        with np.errstate(invalid = 'ignore'):
+            Series = {'Returns': np.column_stack([Batch.Returns, Batch.BenchmarkReturns]),
+                      'BareAlphas': Batch.Returns - Batch.BenchmarkReturns[:, np.newaxis],
+                      'AdjustedAlphas': Batch.SharpeRatios - Batch.BenchmarkSharpeRatios[:, np.newaxis]}
+
+        for Name, Values in Series.items():
+            Prefix = cls.PrefixSums(Values)
+            getattr(Instance, Name + 'Ring')[Slots] = Prefix[Rows]
+            setattr(Instance, Name + 'Prefix', Prefix[-1].copy())
+
+        Instance.IR = Batch.IR[-1].copy()
+        Instance.IRA = Batch.IRA[-1].copy()
+
+        return Instance
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromDataFrame(cls,
+                      TickerDf = None,
+                      SymbolList = ['GADGX','^DJI'],
+                      BenchmarkLabel = '^DJI',
+                      Window = 50,
+                      RiskFreeRate = 0.01,
+                      PeriodsPerYear = 365):
+        """
+        Synopsis: Seed the state from the <Symbol>_Close columns of a dataframe (e.g., DataExtractionAndPreprocessing.AllData).
+        ---------
+
+        Parameters:
+        -----------
+        TickerDf: pandas dataframe expected to contain the columns <Symbol>_Close of all symbols and the benchmark
+        SymbolList: list of str, ticker symbols in dataframe TickerDf (the benchmark, if contained, is skipped)
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Window: int, number of time steps to use to evaluate the information ratio
+        RiskFreeRate: float, return rate of risk-free investment used to compute Sharpe ratio
+        PeriodsPerYear: int or float, number of time steps per year of the date grid
+
+        Returns:
+        --------
+        StreamingInformationRatio instance
+        """
+
+        FundLabels = [j for j in SymbolList if j != BenchmarkLabel]
+        LastDate = str(TickerDf['Date'].iloc[-1])[:10] if ('Date' in TickerDf.columns and len(TickerDf) > 0) else None
+
+        return cls.FromHistory(Prices = TickerDf[[j + '_Close' for j in FundLabels]].to_numpy(dtype = float),
+                               BenchmarkPrices = TickerDf[BenchmarkLabel + '_Close'].to_numpy(dtype = float),
+                               FundLabels = FundLabels,
+                               BenchmarkLabel = BenchmarkLabel,
+                               Window = Window,
+                               RiskFreeRate = RiskFreeRate,
+                               PeriodsPerYear = PeriodsPerYear,
+                               LastDate = LastDate)
+
+###########################################
+###########################################
+
+    def Update(self, Prices = None, BenchmarkPrice = None, Date = None):
+        """
+        Synopsis: Process one new row of close prices and update the IRs of all funds.
+        ---------
+
+        Parameters:
+        -----------
+        Prices: array-like, (funds,) close prices in the order of self.FundLabels (NaN, if a fund did not report)
+        BenchmarkPrice: float, close price of the benchmark (NaN, if it did not report)
+        Date: str, date of the row (kept as self.LastDate)
+
+        Returns:
+        --------
+        self.IR: numpy array, (funds,) updated IRs based on bare returns
+        self.IRA: numpy array, (funds,) updated IRs based on risk-adjusted returns
+        """
+
+        # forward fill missing prices with the last reported ones
+        NewPrices = np.append(np.asarray(Prices, dtype = float), float(BenchmarkPrice))
+        NewPrices = np.where(np.isnan(NewPrices), self.LastPrices, NewPrices)
+
+        # the ring buffer slot of this step holds the values of Window steps ago
+        Slot = self.Step % self.Window
+
+        # returns over Window steps (0.0 where undefined)
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            Returns = (NewPrices - self.PriceRing[Slot]) / NewPrices
+        Returns[np.isnan(Returns)] = 0.0
+        self.PriceRing[Slot] = NewPrices
+        self.LastPrices = NewPrices
+
+        # Sharpe ratios of the funds and the benchmark
+        Mean, Std = WindowMoments(*self.RollWindow('Returns', Returns, Slot), MinPeriods = self.Window, Ddof = 0)
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            SharpeRatios = (Mean - self.RiskFreeRate * ( self.PeriodsPerYear / self.Window )) / Std
+
+        # IRs of the bare and risk-adjusted excess returns, forward filled
+        with np.errstate(divide = 'ignore', invalid = 'ignore'):
+            Mean, Std = WindowMoments(*self.RollWindow('BareAlphas', Returns[:-1] - Returns[-1], Slot), MinPeriods = 0, Ddof = 1)
+            IR = Mean / Std
+            Mean, Std = WindowMoments(*self.RollWindow('AdjustedAlphas', SharpeRatios[:-1] - SharpeRatios[-1], Slot), MinPeriods = 0, Ddof = 1)
+            IRA = Mean / Std
+
+        self.IR = np.where(np.isnan(IR), self.IR, IR)
+        self.IRA = np.where(np.isnan(IRA), self.IRA, IRA)
+
+        self.Step += 1
+        self.LastDate = Date if Date is not None else self.LastDate
+
+        return self.IR, self.IRA
+
+###########################################
+###########################################
+
+    def RollWindow(self, Name, Values, Slot):
+        """
+        Synopsis: Add new values to the prefix sums of a series and return the sums over the last Window steps.
+        ---------
+
+        Parameters:
+        -----------
+        Name: str, name of the series ('Returns', 'BareAlphas' or 'AdjustedAlphas')
+        Values: numpy array, new values of the series (non-finite values count as missing)
+        Slot: int, slot of the ring buffer that holds the prefix sums of Window steps ago
+
+        Returns:
+        --------
+        Count, Sum, SumOfSquares: numpy arrays, number, sum and sum of squares of the finite values in the window
+        """
+
+        Prefix = getattr(self, Name + 'Prefix')
+        Ring = getattr(self, Name + 'Ring')
+
+        # same order of operations as the cumulative sums of RollingStatistics.RollingSum
+        Finite = np.isfinite(Values)
+        Clean = np.where(Finite, Values, 0.0)
+        Prefix += np.stack([Finite.astype(float), Clean, Clean * Clean])
+
+        WindowSums = Prefix - Ring[Slot]
+        Ring[Slot] = Prefix
+
+        return WindowSums[0], WindowSums[1], WindowSums[2]
+
+###########################################
+###########################################
+
+    @staticmethod
+    def PrefixSums(Values):
+        """
+        Synopsis: Compute the prefix sums of the count, the sum and the sum of squares of the finite values along axis 0.
+        ---------
+
+        Parameters:
+        -----------
+        Values: numpy array, (dates x columns) series
+
+        Returns:
+        --------
+        Prefix: numpy array, (dates x 3 x columns) prefix sums
+        """
+
+        Finite = np.isfinite(Values)
+        Clean = np.where(Finite, Values, 0.0)
+
+        return np.cumsum(np.stack([Finite.astype(float), Clean, Clean * Clean], axis = 1), axis = 0)
+
+###########################################
+###########################################
+
+    def Save(self, FileName):
+        """
+        Synopsis: Write the state to a numpy .npz file, so that a later run can resume without replaying the history.
+        ---------
+
+        Parameters:
+        -----------
+        FileName: str, path of the .npz file
+
+        Returns:
+        --------
+        <file>: the state saved to FileName
+        """
+
+        np.savez(FileName,
+                 FundLabels = np.array(self.FundLabels, dtype = str),
+                 BenchmarkLabel = np.array(self.BenchmarkLabel),
+                 Window = np.array(self.Window),
+                 RiskFreeRate = np.array(self.RiskFreeRate),
+                 PeriodsPerYear = np.array(self.PeriodsPerYear),
+                 Step = np.array(self.Step),
+                 LastDate = np.array('' if self.LastDate is None else self.LastDate),
+                 **{Name: getattr(self, Name) for Name in self.StateArrays})
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def Load(cls, FileName):
+        """
+        Synopsis: Read the state from a numpy .npz file written by Save.
+        ---------
+
+        Parameters:
+        -----------
+        FileName: str, path of the .npz file
+
+        Returns:
+        --------
+        StreamingInformationRatio instance
+        """
+
+        with np.load(FileName, allow_pickle = False) as State:
+
+            Instance = cls(FundLabels = [str(j) for j in State['FundLabels']],
+                           BenchmarkLabel = str(State['BenchmarkLabel']),
+                           Window = int(State['Window']),
+                           RiskFreeRate = float(State['RiskFreeRate']),
+                           # (states saved before the periods per year were kept refer to calendar days)
+                           PeriodsPerYear = State['PeriodsPerYear'].item() if 'PeriodsPerYear' in State.files else 365)
+
+            Instance.Step = int(State['Step'])
+            Instance.LastDate = str(State['LastDate']) or None
+            for Name in cls.StateArrays:
+                setattr(Instance, Name, State[Name].copy())
+
+        return Instance
@@ -0,0 +1,149 @@
+import os
+import numpy as np
+import pandas as pd
+
+class SyntheticUniverse():
+    """
+    Synopsis: Class that generates a synthetic universe of fund prices for benchmarks and tests.
+    ---------
+
+    The benchmark follows a geometric random walk on exchange business days, and every fund follows the benchmark
+    with a random beta plus idiosyncratic noise. To mimic real data, funds
+    * start at random dates after the first day (inception),
+    * miss a fraction of the trading days (missing-day pattern), and
+    * optionally report only every few days with some jitter (irregular reporting, like NAV funds such as '0P00000UWV.F').
+
+    Properties:
+    -----------
+    self.SymbolList: list of str, ticker symbols of the funds and (last) the benchmark
+    self.BenchmarkLabel: str, ticker symbol of the benchmark
+    self.Dates: pandas DatetimeIndex, all business days of the universe
+    self.TickerDfs: dict of str -> pandas dataframe, OHLCV data of every ticker indexed by 'Date' with columns labeled
+                    <Symbol>_Open/_High/... (as returned by DataExtractionAndPreprocessing.GetTickerData)
+
+    Methods:
+    --------
+    __init__: generate the universe
+    WriteCsv: method to write one <Symbol>.csv file per ticker (the layout of 'fund_details/')
+    """
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 NumberOfFunds = 100,
+                 NumberOfDays = 5000,
+                 StartDate = '2001-01-01',
+                 MissingDayFraction = 0.02,
+                 IrregularFraction = 0.1,
+                 ReportingInterval = 5,
+                 LateStartFraction = 0.2,
+                 BenchmarkLabel = '^BENCH',
+                 Seed = 0):
+        """
+        Synopsis: Generate the prices of the benchmark and the funds.
+        ---------
+
+        Parameters:
+        -----------
+        NumberOfFunds: int, number of funds (besides the benchmark)
+        NumberOfDays: int, number of business days of the history
+        StartDate: str, the YYYY-MM-DD first date of the history
+        MissingDayFraction: float, fraction of the business days a (regularly reporting) fund does not report
+        IrregularFraction: float, fraction of the funds that report irregularly
+        ReportingInterval: int, mean number of business days between two reports of an irregularly reporting fund
+        LateStartFraction: float, fraction of the funds starting at a random date after StartDate
+        BenchmarkLabel: str, ticker symbol of the benchmark
+        Seed: int, seed of the random number generator
+
+        Returns:
+        --------
+        Nothing, but initializes self.TickerDfs and self.SymbolList
+        """
+
+        Generator = np.random.default_rng(Seed)
+
+        self.BenchmarkLabel = BenchmarkLabel
+        self.Dates = pd.bdate_range(start = StartDate, periods = NumberOfDays, name = 'Date')
+
+        # daily log-returns of the benchmark and the funds (beta to the benchmark plus idiosyncratic noise)
+        BenchmarkLogReturns = Generator.normal(0.0003, 0.01, NumberOfDays)
+        Betas = Generator.uniform(0.3, 1.3, NumberOfFunds)
+        FundLogReturns = (BenchmarkLogReturns[:, np.newaxis] * Betas
+                          + Generator.normal(0.0001, 0.008, (NumberOfDays, NumberOfFunds)))
+
+        BenchmarkPrices = 10000.0 * np.exp(np.cumsum(BenchmarkLogReturns))
+        FundPrices = Generator.uniform(5.0, 200.0, NumberOfFunds) * np.exp(np.cumsum(FundLogReturns, axis = 0))
+
+        self.SymbolList = ['SYN' + str(j).zfill(len(str(NumberOfFunds))) for j in range(NumberOfFunds)] + [BenchmarkLabel]
+        self.TickerDfs = {}
+
+        for j in range(NumberOfFunds):
+
+            Reported = np.ones(NumberOfDays, dtype = bool)
+
+            # inception after the first date
+            if Generator.random() < LateStartFraction:
+                Reported[:Generator.integers(0, NumberOfDays // 2)] = False
+
+            if Generator.random() < IrregularFraction:
+                # report every ReportingInterval days on average, with a jitter
+                ReportingDays = np.cumsum(np.maximum(1, Generator.poisson(ReportingInterval, NumberOfDays)))
+                Irregular = np.zeros(NumberOfDays, dtype = bool)
+                Irregular[ReportingDays[ReportingDays < NumberOfDays]] = True
+                Reported &= Irregular
+            else:
+                Reported &= Generator.random(NumberOfDays) >= MissingDayFraction
+
+            self.TickerDfs[self.SymbolList[j]] = self.OHLCV(self.SymbolList[j], FundPrices[Reported, j], self.Dates[Reported], Generator, Volume = False)
+
+        self.TickerDfs[BenchmarkLabel] = self.OHLCV(BenchmarkLabel, BenchmarkPrices, self.Dates, Generator, Volume = True)
+
+        return
+
+###########################################
+###########################################
+
+    def OHLCV(self, Ticker, Close, Dates, Generator, Volume = True):
+        """
+        Synopsis: Assemble an OHLCV dataframe around the close prices.
+        ---------
+
+        Returns:
+        --------
+        df: pandas dataframe indexed by 'Date' with columns <Ticker>_Open/_High/_Low/_Close/_Adj Close/_Volume
+        """
+
+        Spread = np.abs(Generator.normal(0.0, 0.005, len(Close))) * Close
+
+        df = pd.DataFrame({'Open': Close + Generator.normal(0.0, 0.5, len(Close)) * Spread,
+                           'High': Close + Spread,
+                           'Low': Close - Spread,
+                           'Close': Close,
+                           'Adj Close': Close,
+                           'Volume': Generator.integers(10**5, 10**8, len(Close)) if Volume else np.zeros(len(Close), dtype = int)},
+                          index = pd.DatetimeIndex(Dates, name = 'Date'))
+        df.columns = [Ticker + '_' + j for j in df.columns]
+
+        return df
+
+###########################################
+###########################################
+
+    def WriteCsv(self, Directory = 'fund_details'):
+        """
+        Synopsis: Write one <Symbol>.csv file per ticker to Directory (as DataExtractionAndPreprocessing does).
+        ---------
+
+        Returns:
+        --------
+        <files>: one .csv file per ticker in Directory
+        """
+
+        if not os.path.exists(Directory):
+            os.makedirs(Directory)
+
+        for Ticker, df in self.TickerDfs.items():
+            df.to_csv(os.path.join(Directory, '{}.csv'.format(Ticker)))
+
+        return
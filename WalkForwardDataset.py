@@ -0,0 +1,282 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from SequenceDataset import SequenceDataset
+
+class WalkForwardDataset():
+    """
+    Synopsis: Class that builds walk-forward train/validation folds of (features, label) samples, e.g., for forecasting the IRs.
+    ---------
+
+    The samples are the ones of a SequenceDataset: the window of the Lookback dates up to t as features and the target
+    columns at t+Horizon as labels (shifted vectorized, as a view). The samples are split in time order into folds:
+    * 'expanding': the training set of every fold holds all samples before its validation set
+    * 'rolling': the training set of every fold holds the TrainSize samples before its validation set
+    The validation sets of the folds are adjacent blocks of ValidationSize samples ending with the last sample. Between
+    the training and the validation set of a fold, Horizon samples are left out: the label of the last training sample
+    is only known Horizon dates after its time, so that no future information leaks into the training set.
+
+    The arrays of every fold are written to .npy files in a cache directory named after a key of the parameters (feature
+    and target columns, i.e., the funds, benchmarks and windows of the IRs; dates; lookback; horizon; fold layout) and of
+    a fingerprint of the data (sha1 of the features, hashed block by block), and are memory-mapped from there. An
+    experiment with the same parameters and data loads its folds from the cache without recomputing them; changed data
+    (e.g., revised prices or another risk-free rate) gets a new cache directory.
+
+    Properties:
+    -----------
+    self.Dataset: SequenceDataset instance, the samples (views on the features)
+    self.Mode: str, 'expanding' or 'rolling'
+    self.Folds: list of dict, the sample ranges of every fold, {'Train': (first, last + 1), 'Validation': (first, last + 1)}
+    self.Key: str, key of the parameters (name of the cache directory of the folds)
+    self.Directory: str, cache directory of the folds (None: the folds are not cached)
+
+    Methods:
+    --------
+    __init__: set up the samples and the sample ranges of the folds
+    FromDataFrame: alternative constructor that takes the feature and target columns from a dataframe
+    FoldRanges: method to compute the sample ranges of the folds
+    Fingerprint: method to hash the features (and dates), block by block
+    Fold: method to return the arrays of a fold (from the cache, if available)
+    Split: generator of the arrays of all folds
+    """
+
+    Modes = ['expanding', 'rolling']
+
+###########################################
+###########################################
+
+    def __init__(self,
+                 Features = None,
+                 Lookback = 92,
+                 Horizon = 365,
+                 TargetColumns = None,
+                 FeatureLabels = None,
+                 Dates = None,
+                 Mode = 'expanding',
+                 NumberOfFolds = 5,
+                 ValidationSize = 365,
+                 TrainSize = 730,
+                 CacheDirectory = 'folds'):
+        """
+        Synopsis: Set up the samples and the sample ranges of the walk-forward folds.
+        ---------
+
+        Parameters:
+        -----------
+        Features / Lookback / Horizon / TargetColumns / FeatureLabels / Dates: see SequenceDataset (a Horizon is required)
+        Mode: str, 'expanding' or 'rolling' training sets
+        NumberOfFolds: int, number of folds (folds without training samples are left out)
+        ValidationSize: int, number of samples of every validation set
+        TrainSize: int, number of samples of every training set in the 'rolling' mode
+        CacheDirectory: str, directory of the fold cache (None: the arrays are built in memory on every call)
+
+        Returns:
+        --------
+        Nothing, but initializes self.Dataset, self.Folds and self.Key
+        """
+
+        if Mode not in self.Modes:
+            raise ValueError('Mode must be one of ' + str(self.Modes) + ', not ' + str(Mode))
+        if Horizon is None:
+            raise ValueError('walk-forward folds require a Horizon for the labels')
+
+        self.Dataset = SequenceDataset(Features = Features,
+                                       Lookback = Lookback,
+                                       Horizon = Horizon,
+                                       TargetColumns = TargetColumns,
+                                       FeatureLabels = FeatureLabels,
+                                       Dates = Dates)
+        self.Mode = Mode
+        self.NumberOfFolds = NumberOfFolds
+        self.ValidationSize = ValidationSize
+        self.TrainSize = TrainSize
+        self.Folds = self.FoldRanges()
+
+        # the parameters that determine the arrays of the folds
+        Parameters = {'FeatureLabels': self.Dataset.FeatureLabels,
+                      'TargetLabels': self.Dataset.TargetLabels,
+                      'Lookback': Lookback,
+                      'Horizon': Horizon,
+                      'Mode': Mode,
+                      'NumberOfFolds': NumberOfFolds,
+                      'ValidationSize': ValidationSize,
+                      'TrainSize': TrainSize if Mode == 'rolling' else None,
+                      'DType': str(self.Dataset.Features.dtype),
+                      'NumberOfDates': int(self.Dataset.Features.shape[0]),
+                      'Dates': [str(j) for j in np.asarray(Dates)[[0, -1]]] if Dates is not None and len(Dates) > 0 else None,
+                      'Fingerprint': self.Fingerprint()}
+        self.Key = hashlib.sha1(json.dumps(Parameters, sort_keys = True).encode()).hexdigest()[:16]
+
+        self.Directory = None
+        if CacheDirectory is not None:
+            self.Directory = os.path.join(CacheDirectory, self.Key)
+            if not os.path.exists(self.Directory):
+                os.makedirs(self.Directory)
+            with open(os.path.join(self.Directory, 'Parameters.json'), 'w') as ParameterFile:
+                json.dump(Parameters, ParameterFile, indent = 1)
+
+        return
+
+###########################################
+###########################################
+
+    @classmethod
+    def FromDataFrame(cls,
+                      Df = None,
+                      Columns = None,
+                      TargetColumns = None,
+                      DType = 'float64',
+                      **Arguments):
+        """
+        Synopsis: Set up the folds from the columns of a dataframe (e.g., InformationRatio.AllData).
+        ---------
+
+        Parameters:
+        -----------
+        Df / Columns / TargetColumns / DType: see SequenceDataset.FromDataFrame
+        **Arguments: Lookback, Horizon, Mode, NumberOfFolds, ValidationSize, TrainSize and CacheDirectory (see __init__)
+
+        Returns:
+        --------
+        WalkForwardDataset instance
+        """
+
+        if Columns is None:
+            Columns = [j for j in Df.columns if '_IR_' in j or '_IRA_' in j]
+        Columns = list(Columns)
+
+        return cls(Features = Df[Columns].to_numpy(dtype = DType),
+                   TargetColumns = None if TargetColumns is None else [Columns.index(j) for j in TargetColumns],
+                   FeatureLabels = Columns,
+                   Dates = Df['Date'].to_numpy() if 'Date' in Df.columns else None,
+                   **Arguments)
+
+###########################################
+###########################################
+
+    def FoldRanges(self):
+        """
+        Synopsis: Compute the sample ranges of the training and validation sets of the folds.
+        ---------
+
+        Returns:
+        --------
+        Folds: list of dict, {'Train': (first, last + 1), 'Validation': (first, last + 1)} in time order
+        """
+
+        NumberOfSamples = self.Dataset.Windows.shape[0]
+
+        # adjacent validation sets ending with the last sample, with Horizon samples left out before each
+        ValidationEnds = NumberOfSamples - self.ValidationSize * np.arange(self.NumberOfFolds)[::-1]
+        ValidationStarts = ValidationEnds - self.ValidationSize
+        TrainEnds = ValidationStarts - self.Dataset.Horizon
+        TrainStarts = np.maximum(TrainEnds - self.TrainSize, 0) if self.Mode == 'rolling' else np.zeros_like(TrainEnds)
+
+        Folds = [{'Train': (int(TrainStarts[k]), int(TrainEnds[k])), 'Validation': (int(ValidationStarts[k]), int(ValidationEnds[k]))}
+                 for k in range(self.NumberOfFolds) if TrainEnds[k] > TrainStarts[k] and ValidationStarts[k] >= 0]
+
+        if len(Folds) < self.NumberOfFolds:
+            print('Only ' + str(len(Folds)) + ' of ' + str(self.NumberOfFolds) + ' folds have training samples')
+
+        return Folds
+
+###########################################
+###########################################
+
+    def Fingerprint(self, ChunkSize = 4096):
+        """
+        Synopsis: Hash the features and the dates of the dataset, ChunkSize rows at a time.
+        ---------
+
+        A memory-mapped feature array is read block by block, without a full copy in memory.
+
+        Parameters:
+        -----------
+        ChunkSize: int, number of rows hashed at once
+
+        Returns:
+        --------
+        Fingerprint: str, hexadecimal sha1 digest of the data
+        """
+
+        Hash = hashlib.sha1()
+        Features = self.Dataset.Features
+        for First in range(0, Features.shape[0], ChunkSize):
+            Hash.update(np.ascontiguousarray(Features[First:First + ChunkSize]).tobytes())
+        if self.Dataset.Dates is not None:
+            Hash.update(np.asarray(self.Dataset.Dates).astype(str).tobytes())
+
+        return Hash.hexdigest()
+
+###########################################
+###########################################
+
+    def Fold(self, Number = 0, ValidOnly = True):
+        """
+        Synopsis: Return the arrays of a fold, memory-mapped from the cache (written to it first, if not available).
+        ---------
+
+        Parameters:
+        -----------
+        Number: int, number of the fold (0: the earliest)
+        ValidOnly: boolean, toggle to skip the samples with NaN in their window or label
+
+        Returns:
+        --------
+        Arrays: dict with the keys 'Train' and 'Validation', each a dict with the arrays 'X' ((samples x lookback x
+                features)), 'y' ((samples x targets)) and 'Dates' ((samples,), if the dataset has dates)
+        """
+
+        Ranges = self.Folds[Number]
+
+        if self.Directory is None:
+            Arrays = {}
+            for Part, (First, Last) in Ranges.items():
+                Samples = np.arange(First, Last)
+                if ValidOnly:
+                    Samples = Samples[self.Dataset.Valid[Samples]]
+                Arrays[Part] = {'X': self.Dataset.Windows[Samples], 'y': self.Dataset.Targets[Samples]}
+                if self.Dataset.Dates is not None:
+                    Arrays[Part]['Dates'] = self.Dataset.Dates[Samples]
+            return Arrays
+
+        FoldDirectory = os.path.join(self.Directory, 'Fold_' + str(Number) + ('' if ValidOnly else '_All'))
+        if not os.path.exists(FoldDirectory):
+            # written to a temporary directory and renamed, so that an interrupted run leaves no partial fold behind
+            Temporary = FoldDirectory + '.tmp'
+            if os.path.exists(Temporary):
+                shutil.rmtree(Temporary)
+            for Part, (First, Last) in Ranges.items():
+                self.Dataset.ToNpy(Directory = os.path.join(Temporary, Part),
+                                   ValidOnly = ValidOnly,
+                                   Samples = np.arange(First, Last))
+            os.rename(Temporary, FoldDirectory)
+
+        Arrays = {}
+        for Part in Ranges:
+            Arrays[Part] = {}
+            for Name in ['X', 'y', 'Dates']:
+                FileName = os.path.join(FoldDirectory, Part, Name + '.npy')
+                if os.path.exists(FileName):
+                    Arrays[Part][Name] = np.load(FileName, mmap_mode = 'r' if Name != 'Dates' else None, allow_pickle = Name == 'Dates')
+
+        return Arrays
+
+###########################################
+###########################################
+
+    def Split(self, ValidOnly = True):
+        """
+        Synopsis: Generate the arrays of all folds in time order (see Fold).
+        ---------
+
+        Returns:
+        --------
+        generator of (Train, Validation): dicts with the arrays 'X', 'y' and 'Dates' of the training and validation set
+        """
+
+        for Number in range(len(self.Folds)):
+            Arrays = self.Fold(Number, ValidOnly = ValidOnly)
+            yield Arrays['Train'], Arrays['Validation']
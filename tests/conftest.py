@@ -0,0 +1,15 @@
+"""
+Synopsis:
+---------
+Configuration of the tests: the modules of the repository are plain top-level modules, so its root directory is put
+on the search path; the tests run against the bundled price cache in 'fund_details/'.
+"""
+
+import os
+import sys
+
+RootDirectory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RootDirectory)
+
+# the bundled price cache
+CacheDirectory = os.path.join(RootDirectory, 'fund_details')
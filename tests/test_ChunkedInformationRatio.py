@@ -0,0 +1,117 @@
+"""
+Synopsis:
+---------
+Tests that the out-of-core ChunkedInformationRatio gives the same IRs, bit for bit, as BatchInformationRatio on the
+full history, whatever the block size (in particular, blocks shorter than the window) and for lists of windows.
+"""
+
+import numpy as np
+import pytest
+from BatchInformationRatio import BatchInformationRatio
+from ChunkedInformationRatio import ChunkedInformationRatio
+from StreamingInformationRatio import StreamingInformationRatio
+
+FundLabels = ['F' + str(j) for j in range(5)]
+
+###########################################
+###########################################
+
+def RandomPrices(NumberOfDates = 400, NumberOfSeries = 6, Seed = 0):
+    """
+    Synopsis: Random-walk prices; some series start late (NaN before their inception), as funds do.
+    ---------
+    """
+
+    Generator = np.random.default_rng(Seed)
+    Prices = 100 * np.exp(np.cumsum(0.01 * Generator.standard_normal((NumberOfDates, NumberOfSeries)), axis = 0))
+    Prices[:120, 1] = np.nan
+    Prices[:45, 3] = np.nan
+
+    return Prices
+
+###########################################
+###########################################
+
+def ChunkSizes(Window):
+    """
+    Synopsis: Block sizes around the (shortest and longest) window: 1, Window - 1, Window and longer than the history.
+    ---------
+    """
+
+    Windows = [Window] if np.ndim(Window) == 0 else list(Window)
+
+    return sorted(set([1, 1000] + [j - 1 for j in Windows] + Windows))
+
+###########################################
+###########################################
+
+@pytest.mark.parametrize('Window', [30, [7, 30], [30, 7, 92]])
+def test_ChunkedInformationRatio_matches_batch(Window, tmp_path):
+    """
+    Synopsis: The IRs written to the FeatureStore match the ones of BatchInformationRatio for every block size.
+    ---------
+    """
+
+    Prices = RandomPrices()
+    Batch = BatchInformationRatio(Prices[:, :-1], Prices[:, -1], FundLabels, 'B', Window)
+    Windows = [Window] if np.ndim(Window) == 0 else list(Window)
+
+    for ChunkSize in ChunkSizes(Window):
+        Chunked = ChunkedInformationRatio(Prices[:, :-1], Prices[:, -1], FundLabels, 'B', Window,
+                                          ChunkSize = ChunkSize, Directory = str(tmp_path / ('store_' + str(ChunkSize))))
+        Dates, Tickers, Data = Chunked.Store.Load()
+        assert Tickers == FundLabels
+        for k, ThisWindow in enumerate(Windows):
+            for Label, Expected in [('_IR_', Batch.IR), ('_IRA_', Batch.IRA)]:
+                np.testing.assert_array_equal(Data['B' + Label + str(ThisWindow)], Expected if np.ndim(Window) == 0 else Expected[k],
+                                              err_msg = 'ChunkSize ' + str(ChunkSize) + Label + str(ThisWindow))
+
+###########################################
+###########################################
+
+@pytest.mark.parametrize('Window', [30, [7, 30]])
+def test_ChunkedInformationRatio_uneven_updates(Window):
+    """
+    Synopsis: Updates with blocks of varying size (shorter and longer than the windows) match BatchInformationRatio.
+    ---------
+    """
+
+    Prices = RandomPrices()
+    Batch = BatchInformationRatio(Prices[:, :-1], Prices[:, -1], FundLabels, 'B', Window)
+
+    Chunked = ChunkedInformationRatio(FundLabels = FundLabels, BenchmarkLabel = 'B', Window = Window, Directory = None)
+    Bounds = np.cumsum([0, 1, 5, 29, 30, 31, 2, 100, 1, 0, 60])
+    Bounds = np.append(Bounds, Prices.shape[0])
+    Results = [Chunked.Update(Prices[First:Last, :-1], Prices[First:Last, -1]) for First, Last in zip(Bounds[:-1], Bounds[1:])]
+
+    Axis = 0 if np.ndim(Window) == 0 else 1
+    np.testing.assert_array_equal(np.concatenate([j[0] for j in Results], axis = Axis), Batch.IR)
+    np.testing.assert_array_equal(np.concatenate([j[1] for j in Results], axis = Axis), Batch.IRA)
+
+###########################################
+###########################################
+
+def test_PeriodsPerYear_consistent():
+    """
+    Synopsis: With 252 dates per year (business days), the chunked and the streaming IRs still match the batch ones.
+    ---------
+    """
+
+    Prices = RandomPrices()
+    Window = 30
+    Batch = BatchInformationRatio(Prices[:, :-1], Prices[:, -1], FundLabels, 'B', Window, PeriodsPerYear = 252)
+    # the periods per year only enter the risk-adjusted IRs
+    np.testing.assert_array_equal(Batch.IR, BatchInformationRatio(Prices[:, :-1], Prices[:, -1], FundLabels, 'B', Window).IR)
+    assert not np.allclose(Batch.IRA, BatchInformationRatio(Prices[:, :-1], Prices[:, -1], FundLabels, 'B', Window).IRA, equal_nan = True)
+
+    Chunked = ChunkedInformationRatio(FundLabels = FundLabels, BenchmarkLabel = 'B', Window = Window, PeriodsPerYear = 252, Directory = None)
+    Results = [Chunked.Update(Prices[First:First + 7, :-1], Prices[First:First + 7, -1]) for First in range(0, Prices.shape[0], 7)]
+    np.testing.assert_array_equal(np.concatenate([j[1] for j in Results]), Batch.IRA)
+
+    History = 200
+    Streaming = StreamingInformationRatio.FromHistory(Prices = Prices[:History, :-1], BenchmarkPrices = Prices[:History, -1],
+                                                      FundLabels = FundLabels, BenchmarkLabel = 'B', Window = Window,
+                                                      PeriodsPerYear = 252)
+    for Row in range(History, Prices.shape[0]):
+        IR, IRA = Streaming.Update(Prices[Row, :-1], Prices[Row, -1])
+        np.testing.assert_allclose(IRA, Batch.IRA[Row], rtol = 1e-6, atol = 1e-9, equal_nan = True)
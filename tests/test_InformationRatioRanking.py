@@ -0,0 +1,54 @@
+"""
+Synopsis:
+---------
+Tests that the top-k / bottom-k selection of InformationRatioRanking ranks funds with an IR of -inf or +inf and
+leaves the funds without an IR (NaN) to the end.
+"""
+
+import numpy as np
+import pytest
+from InformationRatioRanking import InformationRatioRanking
+
+###########################################
+###########################################
+
+@pytest.mark.parametrize('K', [1, 2, 3, 4])
+def test_TopK_infinite_and_missing(K):
+    """
+    Synopsis: With the IRs [1, -inf, NaN, 2] (and +inf next to NaN), the infinite IRs are selected before the missing one.
+    ---------
+    """
+
+    Ranking = InformationRatioRanking(Values = [[1, -np.inf, np.nan, 2],
+                                                [np.nan, 1, np.inf, -1]])
+
+    Funds, Values = Ranking.TopK(K = K)
+    np.testing.assert_array_equal(Funds, np.array([[3, 0, 1, -1], [2, 1, 3, -1]])[:, :K])
+    np.testing.assert_array_equal(Values, np.array([[2, 1, -np.inf, np.nan], [np.inf, 1, -1, np.nan]])[:, :K])
+
+    Funds, Values = Ranking.TopK(K = K, Bottom = True)
+    np.testing.assert_array_equal(Funds, np.array([[1, 0, 3, -1], [3, 1, 2, -1]])[:, :K])
+    np.testing.assert_array_equal(Values, np.array([[-np.inf, 1, 2, np.nan], [-1, 1, np.inf, np.nan]])[:, :K])
+
+###########################################
+###########################################
+
+def test_TopK_matches_ranks():
+    """
+    Synopsis: The top-k funds of random IRs with infinite and missing values are the funds of rank 1 ... k.
+    ---------
+    """
+
+    Generator = np.random.default_rng(0)
+    Values = Generator.standard_normal((50, 12))
+    Values[Generator.random(Values.shape) < 0.2] = np.nan
+    Values[Generator.random(Values.shape) < 0.1] = np.inf
+    Values[Generator.random(Values.shape) < 0.1] = -np.inf
+    Ranking = InformationRatioRanking(Values = Values)
+
+    K = 5
+    Funds, Selected = Ranking.TopK(K = K)
+    for Row in range(Values.shape[0]):
+        Valid = Funds[Row][Funds[Row] >= 0]
+        assert len(Valid) == min(K, Ranking.Counts[Row])
+        np.testing.assert_array_equal(Selected[Row, :len(Valid)], np.sort(Values[Row][~np.isnan(Values[Row])])[::-1][:len(Valid)])
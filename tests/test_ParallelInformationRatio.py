@@ -0,0 +1,101 @@
+"""
+Synopsis:
+---------
+Tests that the sharded computation of ParallelInformationRatio (in this process or on a pool of processes) gives the
+same arrays, bit for bit, as the serial MultiBenchmarkInformationRatio.
+"""
+
+import numpy as np
+import pytest
+from RollingStatistics import WindowReturns, RollingSharpeRatio
+from MultiBenchmarkInformationRatio import MultiBenchmarkInformationRatio
+from ParallelInformationRatio import ParallelInformationRatio
+
+FundLabels = ['F' + str(j) for j in range(11)]
+BenchmarkLabels = ['B0', 'B1']
+# groups of 7 and 4 funds with interleaved columns, so that the shards are uneven
+BenchmarkMap = {j: ('B1' if k % 3 == 1 else 'B0') for k, j in enumerate(FundLabels)}
+Arrays = ['IR', 'IRA', 'Returns', 'SharpeRatios', 'BenchmarkReturns', 'BenchmarkSharpeRatios']
+
+###########################################
+###########################################
+
+def RandomPrices(NumberOfDates = 700, NumberOfSeries = 11, Seed = 0):
+    """
+    Synopsis: Random-walk prices; some series start late (NaN before their inception), as funds do.
+    ---------
+    """
+
+    Generator = np.random.default_rng(Seed)
+    Prices = 100 * np.exp(np.cumsum(0.01 * Generator.standard_normal((NumberOfDates, NumberOfSeries)), axis = 0))
+    for k in range(0, NumberOfSeries, 4):
+        Prices[:Generator.integers(50, 300), k] = np.nan
+
+    return Prices
+
+###########################################
+###########################################
+
+def AssertSameBatches(Batches, ExpectedBatches, Intermediates):
+    """
+    Synopsis: Assert that the batches of every group hold identical arrays.
+    ---------
+    """
+
+    assert list(Batches) == list(ExpectedBatches)
+    for Benchmark in ExpectedBatches:
+        assert Batches[Benchmark].FundLabels == ExpectedBatches[Benchmark].FundLabels
+        for Name in (Arrays if Intermediates else Arrays[:2]):
+            np.testing.assert_array_equal(getattr(Batches[Benchmark], Name), getattr(ExpectedBatches[Benchmark], Name), err_msg = Benchmark + ' ' + Name)
+
+###########################################
+###########################################
+
+@pytest.mark.parametrize('Window, Intermediates', [(30, False), (30, True), ([30, 92], True), ([30, 92], False)])
+@pytest.mark.parametrize('MaxWorkers', [1, 3])
+def test_ParallelInformationRatio_matches_serial(Window, Intermediates, MaxWorkers):
+    """
+    Synopsis: The shards of every group, computed in this process (MaxWorkers = 1) or by a pool, match the serial IRs.
+    ---------
+    """
+
+    Prices = RandomPrices()
+    BenchmarkPrices = RandomPrices(NumberOfSeries = 2, Seed = 1)
+
+    Serial = MultiBenchmarkInformationRatio(Prices, BenchmarkPrices, FundLabels, BenchmarkLabels, BenchmarkMap,
+                                            Window = Window, Intermediates = Intermediates, MaxWorkers = 1)
+
+    Batches = {}
+    for Benchmark, Funds in Serial.Groups.items():
+        Columns = [FundLabels.index(j) for j in Funds]
+        BenchmarkReturns = WindowReturns(BenchmarkPrices[:, BenchmarkLabels.index(Benchmark)], Window)
+        # 3 shards per worker: uneven shards of the 7 and 4 funds of the groups
+        Batches[Benchmark] = ParallelInformationRatio(Prices = Prices[:, Columns],
+                                                      BenchmarkReturns = BenchmarkReturns,
+                                                      BenchmarkSharpeRatios = RollingSharpeRatio(BenchmarkReturns, Window),
+                                                      FundLabels = Funds,
+                                                      BenchmarkLabel = Benchmark,
+                                                      Window = Window,
+                                                      Intermediates = Intermediates,
+                                                      MaxWorkers = MaxWorkers,
+                                                      ShardsPerWorker = 3)
+
+    AssertSameBatches(Batches, Serial.Batches, Intermediates)
+
+###########################################
+###########################################
+
+@pytest.mark.parametrize('Window', [30, [30, 92]])
+def test_MultiBenchmarkInformationRatio_workers(Window):
+    """
+    Synopsis: MultiBenchmarkInformationRatio with several workers gives the same batches as the serial computation.
+    ---------
+    """
+
+    Prices = RandomPrices()
+    BenchmarkPrices = RandomPrices(NumberOfSeries = 2, Seed = 1)
+
+    Serial = MultiBenchmarkInformationRatio(Prices, BenchmarkPrices, FundLabels, BenchmarkLabels, BenchmarkMap, Window = Window, MaxWorkers = 1)
+    Parallel = MultiBenchmarkInformationRatio(Prices, BenchmarkPrices, FundLabels, BenchmarkLabels, BenchmarkMap, Window = Window, MaxWorkers = 2)
+
+    AssertSameBatches(Parallel.Batches, Serial.Batches, Intermediates = True)
@@ -0,0 +1,144 @@
+"""
+Synopsis:
+---------
+Regression tests of the vectorized rolling Sharpe ratio against the former pandas implementation
+rolling(Window).apply(lambda x: (x.mean() - RiskFreeRateWindow) / x.std(), raw = True) on the bundled price cache.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from conftest import CacheDirectory
+from DataExtractionAndPreprocessing import DataExtractionAndPreprocessing as DataEx
+from RollingStatistics import WindowReturns, RollingMoments, RollingSharpeRatio
+
+Symbols = ['GADGX', 'MCSMX', '0P00000UWV.F', 'ESP0.DE', '^DJI']
+RiskFreeRate = 0.01
+
+###########################################
+###########################################
+
+@pytest.fixture(scope = 'module')
+def Prices():
+    """
+    Synopsis: Close prices of all bundled tickers on the calendar-daily grid, as used by the pipeline.
+    ---------
+    """
+
+    AllData = DataEx(StartDate = '2017-01-01',
+                     EndDate = '2021-07-02',
+                     SymbolList = Symbols,
+                     Offline = True,
+                     CacheDirectory = CacheDirectory).AllData
+
+    return AllData[[j + '_Close' for j in Symbols]].to_numpy(dtype = float)
+
+###########################################
+###########################################
+
+def PandasSharpeRatio(Returns, Window, PeriodsPerYear = 365):
+    """
+    Synopsis: Sharpe ratio of one series of returns as computed before the vectorization (a python call per window).
+    ---------
+    """
+
+    RiskFreeRateWindow = RiskFreeRate * ( PeriodsPerYear / Window )
+
+    return pd.Series(Returns).rolling(Window).apply(lambda x: (x.mean() - RiskFreeRateWindow) / x.std(), raw = True).to_numpy()
+
+###########################################
+###########################################
+
+@pytest.mark.parametrize('Window', [7, 30, 92, 365])
+def test_RollingSharpeRatio_matches_pandas(Prices, Window):
+    """
+    Synopsis: The vectorized Sharpe ratios of all tickers match the pandas ones to a relative tolerance of 1e-8.
+    ---------
+
+    The funds starting after the first date (0P00000UWV.F, ESP0.DE) have zero returns before their inception, i.e.,
+    windows with zero variance and a Sharpe ratio of -inf; these have to match exactly.
+    """
+
+    Returns = WindowReturns(Prices, Window)
+    SharpeRatios = RollingSharpeRatio(Returns, Window, RiskFreeRate)
+
+    for k, Symbol in enumerate(Symbols):
+        Expected = PandasSharpeRatio(Returns[:, k], Window)
+        np.testing.assert_array_equal(np.isnan(SharpeRatios[:, k]), np.isnan(Expected), err_msg = Symbol)
+        np.testing.assert_array_equal(np.isinf(SharpeRatios[:, k]), np.isinf(Expected), err_msg = Symbol)
+        np.testing.assert_allclose(SharpeRatios[:, k], Expected, rtol = 1e-8, atol = 0, equal_nan = True, err_msg = Symbol)
+
+    # the late-inception funds are covered by the comparison
+    assert np.isneginf(SharpeRatios[:, Symbols.index('ESP0.DE')]).sum() > 0
+    assert np.isneginf(SharpeRatios[:, Symbols.index('0P00000UWV.F')]).sum() > 0
+
+###########################################
+###########################################
+
+def test_RollingSharpeRatio_window_list(Prices):
+    """
+    Synopsis: A list of windows gives the same Sharpe ratios as the windows one by one.
+    ---------
+    """
+
+    Windows = [30, 92]
+    SharpeRatios = RollingSharpeRatio(WindowReturns(Prices, Windows), Windows, RiskFreeRate)
+
+    for k, Window in enumerate(Windows):
+        np.testing.assert_array_equal(SharpeRatios[:, k], RollingSharpeRatio(WindowReturns(Prices, Window), Window, RiskFreeRate))
+
+###########################################
+###########################################
+
+def test_RollingSharpeRatio_business_calendar():
+    """
+    Synopsis: On the business-day grid, the risk-free rate is scaled with 252 dates per year and matches pandas.
+    ---------
+    """
+
+    DataExInstance = DataEx(StartDate = '2017-01-01',
+                            EndDate = '2021-07-02',
+                            SymbolList = Symbols,
+                            Offline = True,
+                            CacheDirectory = CacheDirectory,
+                            Calendar = 'business')
+    assert DataExInstance.PeriodsPerYear == 252
+
+    Window = 30
+    Returns = WindowReturns(DataExInstance.AllData[[j + '_Close' for j in Symbols]].to_numpy(dtype = float), Window)
+    SharpeRatios = RollingSharpeRatio(Returns, Window, RiskFreeRate, DataExInstance.PeriodsPerYear)
+
+    for k, Symbol in enumerate(Symbols):
+        np.testing.assert_allclose(SharpeRatios[:, k], PandasSharpeRatio(Returns[:, k], Window, 252),
+                                   rtol = 1e-8, atol = 0, equal_nan = True, err_msg = Symbol)
+
+###########################################
+###########################################
+
+@pytest.mark.parametrize('Window', [7, 30])
+def test_RollingSharpeRatio_infinite_returns(Prices, Window):
+    """
+    Synopsis: Infinite returns (e.g., after a price of zero) count as missing, i.e., the results equal the ones with NaN instead.
+    ---------
+
+    pandas keeps +/-inf in its windows; the kernels deliberately do not, so this pins the NaN-like treatment.
+    """
+
+    Returns = WindowReturns(Prices, Window)
+    Returns[200, 0] = np.inf
+    Returns[500:503, 1] = -np.inf
+    WithNaN = np.where(np.isinf(Returns), np.nan, Returns)
+
+    SharpeRatios = RollingSharpeRatio(Returns, Window, RiskFreeRate)
+    np.testing.assert_array_equal(SharpeRatios, RollingSharpeRatio(WithNaN, Window, RiskFreeRate))
+    for k in range(2):
+        np.testing.assert_allclose(SharpeRatios[:, k], PandasSharpeRatio(WithNaN[:, k], Window),
+                                   rtol = 1e-8, atol = 0, equal_nan = True, err_msg = Symbols[k])
+    # every window containing an infinite return has no Sharpe ratio
+    assert np.isnan(SharpeRatios[200:200 + Window, 0]).all()
+    assert np.isnan(SharpeRatios[500:502 + Window, 1]).all()
+
+    # with fewer required values, the infinite value is left out of mean and deviation
+    Mean, Std = RollingMoments([1.0, 2.0, np.inf, 4.0, -np.inf, 6.0], 3, MinPeriods = 1)
+    np.testing.assert_allclose(Mean, [1.0, 1.5, 1.5, 3.0, 4.0, 5.0])
+    np.testing.assert_allclose(Std, [0.0, 0.5, 0.5, 1.0, 0.0, 1.0])
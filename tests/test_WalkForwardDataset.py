@@ -0,0 +1,53 @@
+"""
+Synopsis:
+---------
+Tests that the fold cache of WalkForwardDataset is keyed by the data as well as by the parameters, so that changed
+features never load the folds of the former ones.
+"""
+
+import numpy as np
+import pandas as pd
+from WalkForwardDataset import WalkForwardDataset
+
+Parameters = {'Lookback': 10, 'Horizon': 5, 'NumberOfFolds': 2, 'ValidationSize': 20}
+
+###########################################
+###########################################
+
+def RandomFeatures(NumberOfDates = 200, NumberOfFeatures = 3, Seed = 0):
+    """
+    Synopsis: Random features with dates, as the IR columns of a dataframe.
+    ---------
+    """
+
+    Features = np.random.default_rng(Seed).standard_normal((NumberOfDates, NumberOfFeatures))
+    Dates = pd.date_range('2020-01-01', periods = NumberOfDates).to_numpy()
+
+    return Features, Dates
+
+###########################################
+###########################################
+
+def test_WalkForwardDataset_key_follows_data(tmp_path):
+    """
+    Synopsis: The same data gives the same key (and the cached folds); changed values, also in blocks after the first, a new key.
+    ---------
+    """
+
+    Features, Dates = RandomFeatures()
+    First = WalkForwardDataset(Features = Features, Dates = Dates, CacheDirectory = str(tmp_path), **Parameters)
+    Train, Validation = next(First.Split())
+
+    Again = WalkForwardDataset(Features = Features.copy(), Dates = Dates, CacheDirectory = str(tmp_path), **Parameters)
+    assert Again.Key == First.Key
+
+    Changed = Features.copy()
+    Changed[150, 1] += 1e-9
+    Revised = WalkForwardDataset(Features = Changed, Dates = Dates, CacheDirectory = str(tmp_path), **Parameters)
+    assert Revised.Key != First.Key
+    assert Revised.Fingerprint(ChunkSize = 7) == Revised.Fingerprint()
+
+    # the folds of the revised data are built from it, not loaded from the former cache
+    RevisedTrain, RevisedValidation = next(Revised.Split())
+    np.testing.assert_array_equal(RevisedTrain['X'], Train['X'])
+    assert not np.array_equal(RevisedValidation['X'], Validation['X'])